@@ -0,0 +1,296 @@
+"""Encoder auto-tuning benchmark for the re-encode path."""
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from app.services.logging_service import logger
+from app.utils.ffmpeg_helper import get_hidden_window_kwargs
+
+
+class EncoderProfile:
+    """Re-encode settings used when stream copy is not possible."""
+
+    def __init__(
+        self,
+        codec: str = "libx264",
+        preset: str = "medium",
+        crf: int = 23,
+        audio_codec: str = "aac"
+    ):
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.audio_codec = audio_codec
+
+    def video_args(self) -> List[str]:
+        """Get FFmpeg video encoder arguments."""
+        return ["-c:v", self.codec, "-preset", self.preset, "-crf", str(self.crf)]
+
+    def output_args(self) -> List[str]:
+        """Get FFmpeg video + audio encoder arguments."""
+        return self.video_args() + ["-c:a", self.audio_codec]
+
+    def fingerprint(self) -> str:
+        """Get a stable string identifying these settings."""
+        return f"{self.codec}:{self.preset}:crf{self.crf}:{self.audio_codec}"
+
+    def to_dict(self) -> dict:
+        """Serialize profile for config storage."""
+        return {
+            "codec": self.codec,
+            "preset": self.preset,
+            "crf": self.crf,
+            "audio_codec": self.audio_codec
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "EncoderProfile":
+        """Create profile from config data (defaults for missing keys)."""
+        data = data or {}
+        return cls(
+            codec=data.get("codec", "libx264"),
+            preset=data.get("preset", "medium"),
+            crf=int(data.get("crf", 23)),
+            audio_codec=data.get("audio_codec", "aac")
+        )
+
+    def __str__(self) -> str:
+        return f"{self.codec} ({self.preset}, CRF {self.crf})"
+
+
+# Same output as the historical "-c:v libx264 -c:a aac" re-encode
+DEFAULT_ENCODER_PROFILE = EncoderProfile()
+
+# Encoder -> (presets to try, fastest first; CRF giving comparable visual quality)
+AUTOTUNE_MATRIX: Dict[str, Tuple[List[str], int]] = {
+    "libx264": (["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"], 23),
+    "libx265": (["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"], 28),
+}
+
+_SSIM_RE = re.compile(r"SSIM .*?All:([\d.]+)")
+_PSNR_RE = re.compile(r"PSNR .*?average:([\d.]+|inf)")
+_FRAME_RE = re.compile(r"frame=\s*(\d+)")
+
+
+class AutoTuneResult:
+    """Measured speed and quality of one candidate profile."""
+
+    def __init__(self, profile: EncoderProfile, elapsed: float, frames: int,
+                 ssim: Optional[float], psnr: Optional[float]):
+        self.profile = profile
+        self.elapsed = elapsed
+        self.frames = frames
+        self.ssim = ssim
+        self.psnr = psnr
+
+    @property
+    def fps(self) -> float:
+        """Encoding speed in frames per second."""
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    def score(self, metric: str) -> Optional[float]:
+        """Get quality score for the given metric ("ssim" or "psnr")."""
+        return self.ssim if metric == "ssim" else self.psnr
+
+
+class EncoderAutoTuner:
+    """
+    Benchmark encoder presets on a sample of the user's footage.
+
+    A short sample is cut (stream copy) from one of the input files, encoded
+    with every available profile in the matrix, and scored against the sample
+    with FFmpeg's ssim/psnr filters. The fastest profile whose score meets the
+    quality floor wins.
+    """
+
+    QUALITY_METRICS = ("ssim", "psnr")
+
+    def __init__(
+        self,
+        ffmpeg_path: Optional[str] = None,
+        quality_floor: float = 0.95,
+        quality_metric: str = "ssim",
+        sample_seconds: float = 5.0,
+        matrix: Optional[Dict[str, Tuple[List[str], int]]] = None
+    ):
+        if quality_metric not in self.QUALITY_METRICS:
+            raise ValueError(f"Unknown quality metric: {quality_metric}")
+        self.ffmpeg_path = ffmpeg_path or "ffmpeg"
+        self.quality_floor = quality_floor
+        self.quality_metric = quality_metric
+        self.sample_seconds = sample_seconds
+        self.matrix = matrix or AUTOTUNE_MATRIX
+
+    def _run(self, cmd: List[str], timeout: int = 600) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            **get_hidden_window_kwargs()
+        )
+
+    def available_encoders(self) -> set:
+        """Get the encoders from the matrix that this FFmpeg build supports."""
+        try:
+            result = self._run([self.ffmpeg_path, "-hide_banner", "-encoders"], timeout=30)
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.error(f"Could not list FFmpeg encoders: {e}")
+            return set()
+        return {name for name in self.matrix if re.search(rf"\s{re.escape(name)}\s", result.stdout)}
+
+    def candidates(self) -> List[EncoderProfile]:
+        """Get all candidate profiles supported by this FFmpeg build."""
+        available = self.available_encoders()
+        profiles = []
+        for codec, (presets, crf) in self.matrix.items():
+            if codec not in available:
+                logger.info(f"Auto-tune: encoder {codec} not available, skipping")
+                continue
+            profiles.extend(EncoderProfile(codec, preset, crf) for preset in presets)
+        return profiles
+
+    def _cut_sample(self, source: Path, sample_file: Path) -> bool:
+        """Cut the reference sample from source using stream copy."""
+        cmd = [
+            self.ffmpeg_path,
+            "-i", str(source),
+            "-t", str(self.sample_seconds),
+            "-map", "0:v:0",
+            "-c", "copy",
+            "-y",
+            str(sample_file)
+        ]
+        result = self._run(cmd)
+        if result.returncode != 0:
+            logger.error(f"Auto-tune: sample cut failed: {result.stderr}")
+            return False
+        return True
+
+    def _measure(self, profile: EncoderProfile, sample_file: Path, work_dir: Path) -> Optional[AutoTuneResult]:
+        """Encode the sample with profile and score it."""
+        encoded = work_dir / f"{profile.codec}_{profile.preset}.mp4"
+        cmd = [
+            self.ffmpeg_path,
+            "-i", str(sample_file),
+            *profile.video_args(),
+            "-an",
+            "-y",
+            str(encoded)
+        ]
+        start = time.perf_counter()
+        result = self._run(cmd)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            logger.error(f"Auto-tune: encode with {profile} failed: {result.stderr}")
+            return None
+
+        frames = _FRAME_RE.findall(result.stderr)
+        frame_count = int(frames[-1]) if frames else 0
+
+        cmd = [
+            self.ffmpeg_path,
+            "-i", str(encoded),
+            "-i", str(sample_file),
+            "-lavfi", "[0:v]split[a0][a1];[1:v]split[b0][b1];[a0][b0]ssim;[a1][b1]psnr",
+            "-f", "null",
+            "-"
+        ]
+        result = self._run(cmd)
+        encoded.unlink(missing_ok=True)
+        if result.returncode != 0:
+            logger.error(f"Auto-tune: quality measurement for {profile} failed: {result.stderr}")
+            return None
+
+        ssim_match = _SSIM_RE.search(result.stderr)
+        psnr_match = _PSNR_RE.search(result.stderr)
+        return AutoTuneResult(
+            profile,
+            elapsed,
+            frame_count,
+            float(ssim_match.group(1)) if ssim_match else None,
+            float(psnr_match.group(1)) if psnr_match else None
+        )
+
+    def run(
+        self,
+        input_files: List[Path],
+        progress_callback: Optional[Callable[[str], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Tuple[Optional[EncoderProfile], List[AutoTuneResult]]:
+        """
+        Run the benchmark.
+
+        Args:
+            input_files: Video files from the input folder (sample taken from one of them)
+            progress_callback: Optional callback for progress updates
+            is_cancelled: Optional callable returning True to stop early
+
+        Returns:
+            (fastest profile meeting the quality floor, or None if none does
+            or the run was cancelled before the whole matrix was tested;
+            all results)
+        """
+        def report(msg: str):
+            logger.info(msg)
+            if progress_callback:
+                progress_callback(msg)
+
+        if not input_files:
+            report("Auto-tune: no input files to sample")
+            return None, []
+
+        candidates = self.candidates()
+        if not candidates:
+            report("Auto-tune: no supported encoders found")
+            return None, []
+
+        # Use a file from the middle of the list as a representative sample
+        source = input_files[len(input_files) // 2]
+        work_dir = Path(tempfile.mkdtemp(prefix="vmc_autotune_"))
+        results: List[AutoTuneResult] = []
+        cancelled = False
+        try:
+            sample_file = work_dir / "sample.mkv"
+            report(f"Auto-tune: sampling {self.sample_seconds:g}s of {source.name}")
+            if not self._cut_sample(source, sample_file):
+                return None, []
+
+            for i, profile in enumerate(candidates):
+                if is_cancelled and is_cancelled():
+                    cancelled = True
+                    break
+                report(f"Auto-tune: testing {profile} ({i + 1}/{len(candidates)})")
+                result = self._measure(profile, sample_file, work_dir)
+                if result is None:
+                    continue
+                results.append(result)
+                score = result.score(self.quality_metric)
+                report(
+                    f"  {result.elapsed:.2f}s, {result.fps:.1f} fps, "
+                    f"SSIM {result.ssim if result.ssim is not None else 'n/a'}, "
+                    f"PSNR {result.psnr if result.psnr is not None else 'n/a'}"
+                    + ("" if score is not None and score >= self.quality_floor else " (below floor)")
+                )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        if cancelled:
+            # A partial matrix would favour the fast presets that were tested first
+            report("Auto-tune cancelled, the previous profile is kept")
+            return None, results
+
+        passing = [
+            r for r in results
+            if r.score(self.quality_metric) is not None and r.score(self.quality_metric) >= self.quality_floor
+        ]
+        if not passing:
+            report(f"Auto-tune: no profile met {self.quality_metric.upper()} >= {self.quality_floor}")
+            return None, results
+
+        best = min(passing, key=lambda r: r.elapsed)
+        report(f"Auto-tune: selected {best.profile} ({best.elapsed:.2f}s, {best.fps:.1f} fps)")
+        return best.profile, results
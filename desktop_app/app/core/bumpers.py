@@ -0,0 +1,348 @@
+"""Intro/outro bumpers pre-encoded to match the footage of each group."""
+import hashlib
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.probe import MediaProbe
+from app.core.process_control import FFmpegProcessGroup, ProcessCancelled
+from app.core.trim import matching_encode_args
+from app.services.logging_service import logger
+from app.utils.paths import get_bumper_cache_dir
+
+
+BUMPER_VERSION = 1  # Bump when the variant encode changes
+# Stream parameters a variant must share with the footage to be stream-copied with it
+_VIDEO_KEYS = ("codec", "profile", "pix_fmt", "width", "height", "fps", "time_base")
+_AUDIO_KEYS = ("codec", "sample_rate", "channels")
+# Sample entries that allow parameter sets inside the samples. The concat demuxer
+# puts each H.264 file's SPS/PPS in front of its IDR frames, so tagged this way
+# files with different parameter sets can be stream-copied into one MP4
+INBAND_TAGS = {"h264": "avc3"}
+
+
+def stream_profile(info: Dict) -> Optional[tuple]:
+    """Stream profile of a probe result (None if it has no video)."""
+    video = info.get("video")
+    if not video:
+        return None
+    audio = info.get("audio")
+    return (
+        tuple(round(video[key], 3) if key == "fps" and video.get(key) else video.get(key) for key in _VIDEO_KEYS),
+        tuple(audio.get(key) for key in _AUDIO_KEYS) if audio else None
+    )
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+class BumperStats:
+    """Variants encoded and reused by a BumperLibrary."""
+    
+    def __init__(self):
+        self.encoded = 0
+        self.reused = 0
+        self.unmatched = 0  # Groups left without bumpers (no variant matches their footage)
+        self.inband = 0  # Groups stream-copied with in-band parameter sets (variants' differ)
+        self.reencoded = 0  # Groups re-encoded because the variants' parameter sets differ
+    
+    def summary(self) -> str:
+        text = f"Bumpers: {self.encoded} variants encoded, {self.reused} reused from the cache"
+        if self.inband:
+            text += f", {self.inband} groups stream-copied with in-band parameter sets"
+        if self.reencoded:
+            text += f", {self.reencoded} groups re-encoded (parameter sets differ from the bumpers)"
+        if self.unmatched:
+            text += f", {self.unmatched} groups without bumpers (footage cannot be matched)"
+        return text
+
+
+class BumperLibrary:
+    """
+    Add an intro and/or outro to every output without re-encoding groups.
+    
+    The concat demuxer can only stream-copy files that share codec,
+    resolution, pixel format, frame rate, time base and audio format, so
+    each bumper is encoded once per distinct stream profile found in the
+    plan (scaled and padded to the footage, silent audio added where the
+    footage has audio) and every group is joined with the variant matching
+    its first clip. A stream-copied MP4 keeps the parameter sets (SPS/PPS)
+    of its first file only in its header. A variant rarely has exactly the
+    footage's parameter sets, so H.264 groups are then written with the
+    avc3 sample entry, which tells players to use the SPS/PPS in front of
+    every IDR frame; other groups are re-encoded together with the
+    bumpers (see copy_safe()).
+    
+    Variants are stored in the bumper cache keyed by the bumper file (path,
+    size, mtime) and the profile, so later runs reuse them; variants of an
+    older version of a bumper are removed. Using a variant refreshes its
+    mtime and the cache is trimmed to 90% of max_bytes, least recently
+    used first, whenever a new variant pushes it over the limit.
+    """
+    
+    MAX_BYTES = 2 * 1024 ** 3
+    
+    def __init__(
+        self,
+        ffmpeg_path: Optional[str],
+        probe: MediaProbe,
+        intro: Optional[Path] = None,
+        outro: Optional[Path] = None,
+        processes: Optional[FFmpegProcessGroup] = None,
+        cache_dir: Optional[Path] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.ffmpeg_path = ffmpeg_path or "ffmpeg"
+        self.probe = probe
+        self.intro = intro
+        self.outro = outro
+        self.processes = processes or FFmpegProcessGroup()
+        self.cache_dir = cache_dir or get_bumper_cache_dir()
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self.stats = BumperStats()
+        self._variants: Dict[tuple, Optional[Path]] = {}  # (bumper, profile) -> variant
+        self._lock = threading.Lock()
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._unmatched_groups = set()
+        self._mismatched_groups = set()
+    
+    def bumpers(self) -> List[Path]:
+        return [path for path in (self.intro, self.outro) if path]
+    
+    def fingerprint(self) -> str:
+        """Identify the bumper files (part of the output cache key)."""
+        parts = []
+        for name, path in (("intro", self.intro), ("outro", self.outro)):
+            if path:
+                parts.append(f"{name}={self._source_key(path)}")
+        return f"bumpers-v{BUMPER_VERSION}:" + ":".join(parts)
+    
+    @staticmethod
+    def _source_key(path: Path) -> str:
+        try:
+            st = path.stat()
+        except OSError:
+            return _digest(str(path))
+        return _digest(f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}")
+    
+    def prepare(
+        self,
+        groups: List[List[Path]],
+        workers: int = 4,
+        progress_callback: Optional[Callable[[str], None]] = None
+    ) -> int:
+        """
+        Encode the variants needed by groups up front, in parallel.
+        
+        Returns:
+            Number of distinct stream profiles in the plan
+        """
+        profiles = {}
+        for group in groups:
+            info = self.probe.probe(group[0]) if group else None
+            profile = stream_profile(info) if info else None
+            if profile is not None and matching_encode_args(info) is not None:
+                profiles.setdefault(profile, info)
+        for bumper in self.bumpers():
+            self._remove_stale(bumper)
+        if progress_callback:
+            names = ", ".join(path.name for path in self.bumpers())
+            progress_callback(f"Bumpers ({names}): {len(profiles)} stream profiles in the plan")
+        todo = [(bumper, info) for bumper in self.bumpers() for info in profiles.values()]
+        if todo:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                list(pool.map(lambda item: self.variant(*item), todo))
+        return len(profiles)
+    
+    def wrap(self, input_files: List[Path]) -> Tuple[Optional[Path], Optional[Path]]:
+        """
+        Get the (intro, outro) variants to put around a group.
+        
+        The variants match the group's first clip. The concat demuxer
+        cannot join files of different codecs even when re-encoding, so a
+        group no variant can be made for (unsupported codec, failed encode)
+        gets no bumpers; this is logged once per group.
+        """
+        info = self.probe.probe(input_files[0]) if input_files else None
+        intro = self.variant(self.intro, info) if self.intro and info else None
+        outro = self.variant(self.outro, info) if self.outro and info else None
+        if (self.intro and intro is None) or (self.outro and outro is None):
+            with self._lock:
+                first_time = tuple(input_files) not in self._unmatched_groups
+                if first_time:
+                    self._unmatched_groups.add(tuple(input_files))
+                    self.stats.unmatched += 1
+            if first_time and not self.processes.cancelled:
+                name = input_files[0].name if input_files else "empty group"
+                logger.warning(f"No bumper matches the footage of {name}, it is joined without them")
+            return None, None
+        return intro, outro
+    
+    def _sets_differ(self, input_files: List[Path]) -> bool:
+        """Check if a variant of the group has other parameter sets than its first clip."""
+        variants = [variant for variant in self.wrap(input_files) if variant]
+        if not variants:
+            return False
+        footage = self.probe.parameter_sets(input_files[0])
+        return footage is None or any(self.probe.parameter_sets(variant) != footage for variant in variants)
+    
+    def inband_tag(self, input_files: List[Path]) -> Optional[str]:
+        """Video tag for stream-copying a group with its bumpers (None = keep the default)."""
+        if not self._sets_differ(input_files):
+            return None
+        info = self.probe.probe(input_files[0]) or {}
+        return INBAND_TAGS.get((info.get("video") or {}).get("codec"))
+    
+    def copy_safe(self, input_files: List[Path], inband: bool = True) -> bool:
+        """
+        Check if a group can be stream-copied together with its bumpers.
+        
+        True if the variants share the parameter sets of the group's first
+        clip, or if they can be carried in-band (see inband_tag()). inband
+        is False when the footage after the intro does not start with an
+        IDR frame, which is where the SPS/PPS are repeated. Otherwise the
+        group has to be re-encoded. Both are counted once per group.
+        """
+        if not self._sets_differ(input_files):
+            return True
+        copy = inband and self.inband_tag(input_files) is not None
+        with self._lock:
+            first_time = tuple(input_files) not in self._mismatched_groups
+            if first_time:
+                self._mismatched_groups.add(tuple(input_files))
+                if copy:
+                    self.stats.inband += 1
+                else:
+                    self.stats.reencoded += 1
+        if first_time and not copy:
+            logger.info(f"Bumpers do not share the parameter sets of {input_files[0].name}, re-encoding its group")
+        return copy
+    
+    def variant(self, bumper: Path, info: Dict) -> Optional[Path]:
+        """
+        Get bumper encoded to match the footage described by info.
+        
+        Returns:
+            Path of the cached variant, or None if the footage cannot be
+            matched (unsupported codec) or encoding failed
+        """
+        profile = stream_profile(info)
+        if profile is None or matching_encode_args(info) is None:
+            return None
+        key = (bumper, profile)
+        with self._lock:
+            if key in self._variants:
+                return self._variants[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._variants:
+                    return self._variants[key]
+            output = self._variant_path(bumper, profile)
+            encoded = False
+            try:
+                os.utime(output)  # Mark it recently used
+                variant = output
+                with self._lock:
+                    self.stats.reused += 1
+            except OSError:
+                encoded = self._encode(bumper, info, output)
+                variant = output if encoded else None
+                if variant is None and self.processes.cancelled:
+                    return None  # Try again next time instead of remembering the failure
+                if encoded:
+                    with self._lock:
+                        self.stats.encoded += 1
+            with self._lock:
+                self._variants[key] = variant
+        if encoded:
+            self._evict()
+        return variant
+    
+    def _variant_path(self, bumper: Path, profile: tuple) -> Path:
+        return self.cache_dir / f"{bumper.stem[:40]}_{self._source_key(bumper)}_{_digest(repr(profile))}.mp4"
+    
+    def _remove_stale(self, bumper: Path):
+        """Delete variants made from an earlier version of bumper."""
+        current = self._source_key(bumper)
+        prefix = f"{bumper.stem[:40]}_"
+        try:
+            entries = list(self.cache_dir.glob(f"{prefix}*.mp4"))
+        except OSError:
+            return
+        for entry in entries:
+            parts = entry.stem[len(prefix):].split("_")
+            if len(parts) == 2 and parts[0] != current:
+                try:
+                    entry.unlink()
+                    logger.info(f"Removed outdated bumper variant {entry.name}")
+                except OSError:
+                    pass  # Still used by another job
+    
+    def _evict(self):
+        """Remove least recently used variants until the cache fits 90% of max_bytes."""
+        entries = []
+        for entry in self.cache_dir.glob("*.mp4"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        with self._lock:
+            in_use = set(self._variants.values())
+        target = int(self.max_bytes * 0.9)
+        for _, size, entry in sorted(entries):
+            if total <= target:
+                break
+            if entry in in_use:
+                continue  # Needed by this run
+            try:
+                entry.unlink()
+                total -= size
+                logger.info(f"Removed least recently used bumper variant {entry.name}")
+            except OSError:
+                pass  # Still used by another job
+    
+    def _encode(self, bumper: Path, info: Dict, output: Path) -> bool:
+        video = info["video"]
+        width, height = video.get("width"), video.get("height")
+        cmd = [self.ffmpeg_path, "-hide_banner", "-v", "error", "-i", str(bumper)]
+        bumper_info = self.probe.probe(bumper) or {}
+        if info.get("audio") and not bumper_info.get("audio"):
+            # The footage's audio track must continue through the bumper
+            cmd += ["-f", "lavfi", "-i", "anullsrc"]
+        cmd += ["-map", "0:v:0"]
+        if info.get("audio"):
+            # Padded audio, cut with the video: the next file starts in sync
+            cmd += ["-map", "0:a:0" if bumper_info.get("audio") else "1:a:0", "-af", "apad"]
+            cmd += ["-t", f"{bumper_info['duration']:.6f}"] if bumper_info.get("duration") else ["-shortest"]
+        if width and height:
+            cmd += [
+                "-vf",
+                f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+            ]
+        cmd += matching_encode_args(info)
+        # Unique temp name: other jobs may encode the same variant at the same time
+        temp = output.with_name(f"{output.stem}.{os.getpid()}.{threading.get_ident()}.part")
+        cmd += ["-f", "mp4", "-y", str(temp)]
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            result = self.processes.run(cmd, timeout=600)
+            if result.returncode != 0 or not temp.exists():
+                logger.warning(f"Bumper variant encode failed for {bumper.name}: {result.stderr}")
+                return False
+            os.replace(temp, output)
+        except (ProcessCancelled, subprocess.TimeoutExpired, OSError) as e:
+            logger.info(f"Bumper variant of {bumper.name} not encoded: {e.__class__.__name__}")
+            return False
+        finally:
+            temp.unlink(missing_ok=True)
+        logger.info(f"Encoded {bumper.name} for {width}x{height} {video.get('codec')} footage -> {output.name}")
+        return True
@@ -0,0 +1,229 @@
+"""Adaptive control of how many FFmpeg jobs run at once."""
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+from app.services.logging_service import logger
+
+try:
+    import psutil  # Optional: more accurate sampling on every platform
+except ImportError:
+    psutil = None
+
+
+class SystemSample:
+    """One reading of system pressure (None = not available on this platform)."""
+
+    def __init__(self, cpu_percent: Optional[float], iowait_percent: Optional[float],
+                 memory_available_percent: Optional[float]):
+        self.cpu_percent = cpu_percent
+        self.iowait_percent = iowait_percent
+        self.memory_available_percent = memory_available_percent
+
+    def __str__(self) -> str:
+        def fmt(value):
+            return f"{value:.0f}%" if value is not None else "n/a"
+        return (
+            f"cpu {fmt(self.cpu_percent)}, iowait {fmt(self.iowait_percent)}, "
+            f"mem free {fmt(self.memory_available_percent)}"
+        )
+
+
+class SystemSampler:
+    """
+    Sample CPU load, IO wait and free memory.
+
+    Uses psutil when installed; otherwise /proc on Linux and the Win32 API on
+    Windows. CPU and IO wait are measured over the interval since the
+    previous sample.
+    """
+
+    def __init__(self):
+        self._last_cpu: Optional[Tuple[float, float, float]] = None  # (busy, iowait, total)
+
+    def _cpu_times(self) -> Optional[Tuple[float, float, float]]:
+        if psutil is not None:
+            times = psutil.cpu_times()
+            iowait = getattr(times, "iowait", 0.0)
+            idle = times.idle + iowait
+            total = sum(times)
+            return total - idle, iowait, total
+
+        if sys.platform.startswith("linux"):
+            try:
+                with open("/proc/stat", 'r') as f:
+                    fields = [float(x) for x in f.readline().split()[1:]]
+            except (OSError, ValueError):
+                return None
+            # user nice system idle iowait irq softirq steal ...
+            idle, iowait = fields[3], fields[4] if len(fields) > 4 else 0.0
+            total = sum(fields[:8])
+            return total - idle - iowait, iowait, total
+
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+            idle, kernel, user = wintypes.FILETIME(), wintypes.FILETIME(), wintypes.FILETIME()
+            if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user)):
+                return None
+
+            def to_int(ft):
+                return (ft.dwHighDateTime << 32) | ft.dwLowDateTime
+            # Kernel time includes idle time
+            total = float(to_int(kernel) + to_int(user))
+            return total - to_int(idle), 0.0, total
+        return None
+
+    def _memory_available_percent(self) -> Optional[float]:
+        if psutil is not None:
+            mem = psutil.virtual_memory()
+            return mem.available * 100.0 / mem.total
+
+        if sys.platform.startswith("linux"):
+            values = {}
+            try:
+                with open("/proc/meminfo", 'r') as f:
+                    for line in f:
+                        name, value = line.split(":", 1)
+                        values[name] = float(value.split()[0])
+            except (OSError, ValueError):
+                return None
+            if "MemAvailable" in values and values.get("MemTotal"):
+                return values["MemAvailable"] * 100.0 / values["MemTotal"]
+            return None
+
+        if sys.platform == 'win32':
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return None
+            return status.ullAvailPhys * 100.0 / status.ullTotalPhys
+        return None
+
+    def sample(self) -> SystemSample:
+        """Take a sample (CPU/IO figures cover the time since the last call)."""
+        cpu = iowait = None
+        current = self._cpu_times()
+        if current and self._last_cpu:
+            busy = current[0] - self._last_cpu[0]
+            waited = current[1] - self._last_cpu[1]
+            total = current[2] - self._last_cpu[2]
+            if total > 0:
+                cpu = max(0.0, min(100.0, busy * 100.0 / total))
+                if sys.platform.startswith("linux"):
+                    iowait = max(0.0, min(100.0, waited * 100.0 / total))
+        self._last_cpu = current
+        return SystemSample(cpu, iowait, self._memory_available_percent())
+
+
+class AdaptiveConcurrencyController:
+    """
+    Raise or lower the number of concurrent FFmpeg jobs from live load.
+
+    Every interval the controller samples the system and applies additive
+    increase / decrease within [min_jobs, max_jobs]:
+    - CPU, IO wait or memory pressure above the high-water marks -> one fewer job
+    - everything below the low-water marks and work waiting -> one more job
+    Every change is logged with the sample it was based on; "hold" decisions
+    are logged at DEBUG only.
+    With adaptive=False the limit stays at max_jobs.
+    """
+
+    CPU_HIGH = 90.0
+    CPU_LOW = 70.0
+    IOWAIT_HIGH = 30.0
+    IOWAIT_LOW = 10.0
+    MEMORY_LOW = 10.0  # Percent available below which we back off
+    MEMORY_OK = 20.0
+
+    def __init__(self, min_jobs: int = 1, max_jobs: Optional[int] = None, adaptive: bool = True,
+                 interval: float = 3.0, sampler: Optional[SystemSampler] = None):
+        self.min_jobs = max(1, min_jobs)
+        self.max_jobs = max(self.min_jobs, max_jobs or min(4, os.cpu_count() or 1))
+        self.adaptive = adaptive and self.max_jobs > self.min_jobs
+        self.interval = interval
+        self.sampler = sampler or SystemSampler()
+        self.limit = self.min_jobs if self.adaptive else self.max_jobs
+        self._last_tick = 0.0
+        self._lock = threading.Lock()
+        if self.adaptive:
+            self.sampler.sample()  # Prime CPU counters
+            self._last_tick = time.monotonic()
+
+    def tick(self, running: int, waiting: int) -> int:
+        """
+        Re-evaluate the limit if the interval elapsed.
+
+        Args:
+            running: Jobs currently running
+            waiting: Jobs waiting to start
+
+        Returns:
+            Current concurrency limit
+        """
+        if not self.adaptive:
+            return self.limit
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_tick < self.interval:
+                return self.limit
+            self._last_tick = now
+
+            sample = self.sampler.sample()
+            old = self.limit
+            reason = "steady"
+            if (sample.cpu_percent is not None and sample.cpu_percent > self.CPU_HIGH) \
+                    or (sample.iowait_percent is not None and sample.iowait_percent > self.IOWAIT_HIGH) \
+                    or (sample.memory_available_percent is not None
+                        and sample.memory_available_percent < self.MEMORY_LOW):
+                self.limit = max(self.min_jobs, self.limit - 1)
+                reason = "pressure"
+            elif waiting > 0 and running >= self.limit \
+                    and (sample.cpu_percent is None or sample.cpu_percent < self.CPU_LOW) \
+                    and (sample.iowait_percent is None or sample.iowait_percent < self.IOWAIT_LOW) \
+                    and (sample.memory_available_percent is None
+                         or sample.memory_available_percent > self.MEMORY_OK):
+                self.limit = min(self.max_jobs, self.limit + 1)
+                reason = "headroom"
+
+            action = "raise" if self.limit > old else "lower" if self.limit < old else "hold"
+            logger.log(
+                logging.DEBUG if self.limit == old else logging.INFO,
+                f"Concurrency {action} {old}->{self.limit} ({reason}; {sample}; "
+                f"running {running}, waiting {waiting})"
+            )
+            return self.limit
+
+
+class ConcurrencyBudget:
+    """
+    FFmpeg run slots shared by several workers.
+
+    Used by the job queue so concurrently running jobs together never start
+    more FFmpeg processes than the global budget, whatever each job's own
+    limit is.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self._semaphore = threading.Semaphore(self.slots)
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free."""
+        return self._semaphore.acquire(blocking=False)
+
+    def release(self):
+        """Return a slot taken with try_acquire()."""
+        self._semaphore.release()
@@ -0,0 +1,233 @@
+"""Perceptual duplicate detection for input videos."""
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.probe import MediaProbe
+from app.core.process_control import FFmpegProcessGroup, ProcessCancelled
+from app.services.logging_service import logger
+
+
+class DedupPolicy(Enum):
+    """Which file of a cluster of near-duplicates is kept."""
+    OFF = "off"  # No duplicate detection
+    KEEP_NEWEST = "newest"  # Latest modification time
+    KEEP_LARGEST = "largest"  # Largest file (usually the best quality export)
+    KEEP_FIRST = "first"  # First in scan order
+
+
+# Frames sampled per file, as fractions of the duration
+SAMPLE_POSITIONS = (0.2, 0.4, 0.6, 0.8)
+HASH_WIDTH = 9  # dHash compares adjacent pixels: 9x8 gray -> 64 bits
+HASH_HEIGHT = 8
+FINGERPRINT_VERSION = 1  # Bump when sampling or hashing changes
+EXTRA_NAME = "video_fingerprint"  # MediaProbe.set_extra() key
+
+
+def dhash(gray: bytes) -> int:
+    """Difference hash of a HASH_WIDTH x HASH_HEIGHT gray image."""
+    value = 0
+    for y in range(HASH_HEIGHT):
+        row = gray[y * HASH_WIDTH:(y + 1) * HASH_WIDTH]
+        for x in range(HASH_WIDTH - 1):
+            value = (value << 1) | (row[x] > row[x + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DuplicateCluster:
+    """Near-identical inputs; kept is used, the others are skipped."""
+    
+    def __init__(self, kept: Path, dropped: List[Path]):
+        self.kept = kept
+        self.dropped = dropped
+
+
+class VideoFingerprinter:
+    """
+    Compute cheap perceptual fingerprints of videos.
+    
+    A fingerprint is the duration plus a 64-bit difference hash of a few
+    downscaled gray frames at fixed fractions of the duration, so the same
+    footage re-exported under another name, container or bitrate yields
+    (nearly) the same hashes. All frames of a file come from one FFmpeg
+    run that seeks to each sample point. Fingerprints are stored in the
+    probe cache next to the media info, so a file is fingerprinted once
+    until it changes.
+    """
+    
+    def __init__(
+        self,
+        ffmpeg_path: Optional[str],
+        probe: MediaProbe,
+        processes: Optional[FFmpegProcessGroup] = None
+    ):
+        self.ffmpeg_path = ffmpeg_path or "ffmpeg"
+        self.probe = probe
+        self.processes = processes or FFmpegProcessGroup()
+    
+    def fingerprint(self, path: Path) -> Optional[Dict]:
+        """
+        Get the fingerprint of path.
+        
+        Returns:
+            {"duration": seconds, "hashes": [int, ...]}, or None if the file
+            has no readable video
+        """
+        cached = self.probe.get_extra(path, EXTRA_NAME)
+        if cached and cached.get("version") == FINGERPRINT_VERSION:
+            return cached if cached.get("hashes") else None
+        
+        info = self.probe.probe(path)
+        duration = info.get("duration") if info else None
+        hashes = self._hash_frames(path, duration) if duration and info.get("video") else None
+        if hashes is None and self.processes.cancelled:
+            return None  # Don't cache a failure caused by cancelling
+        result = {"version": FINGERPRINT_VERSION, "duration": duration, "hashes": hashes}
+        self.probe.set_extra(path, EXTRA_NAME, result)
+        return result if hashes else None
+    
+    def _hash_frames(self, path: Path, duration: float) -> Optional[List[int]]:
+        cmd = [self.ffmpeg_path, "-hide_banner", "-v", "error"]
+        for position in SAMPLE_POSITIONS:
+            cmd += ["-ss", f"{duration * position:.3f}", "-i", str(path)]
+        filters = [
+            f"[{i}:v]scale={HASH_WIDTH}:{HASH_HEIGHT}:flags=area,format=gray[v{i}]"
+            for i in range(len(SAMPLE_POSITIONS))
+        ]
+        inputs = "".join(f"[v{i}]" for i in range(len(SAMPLE_POSITIONS)))
+        filters.append(f"{inputs}hstack=inputs={len(SAMPLE_POSITIONS)}")
+        
+        # Raw bytes go to a temp file; process output is read as text
+        fd, raw_name = tempfile.mkstemp(suffix=".gray")
+        os.close(fd)
+        raw_file = Path(raw_name)
+        try:
+            cmd += [
+                "-filter_complex", ";".join(filters),
+                "-frames:v", "1",
+                "-f", "rawvideo",
+                "-y", str(raw_file)
+            ]
+            try:
+                result = self.processes.run(cmd, timeout=60)
+            except (ProcessCancelled, subprocess.TimeoutExpired, OSError) as e:
+                logger.info(f"Fingerprint of {path.name} not computed: {e.__class__.__name__}")
+                return None
+            data = raw_file.read_bytes()
+        except OSError:
+            return None
+        finally:
+            raw_file.unlink(missing_ok=True)
+        
+        row = HASH_WIDTH * len(SAMPLE_POSITIONS)
+        if result.returncode != 0 or len(data) != row * HASH_HEIGHT:
+            return None
+        # hstack puts the frames side by side: split every row back into frames
+        hashes = []
+        for i in range(len(SAMPLE_POSITIONS)):
+            frame = b"".join(
+                data[y * row + i * HASH_WIDTH:y * row + (i + 1) * HASH_WIDTH] for y in range(HASH_HEIGHT)
+            )
+            hashes.append(dhash(frame))
+        return hashes
+
+
+def is_near_duplicate(a: Dict, b: Dict, max_distance: int = 10) -> bool:
+    """
+    Check if two fingerprints show the same footage.
+    
+    Durations must agree within 1% (at least 0.5 s) and every sampled frame
+    within max_distance of 64 hash bits.
+    """
+    if abs(a["duration"] - b["duration"]) > max(0.5, 0.01 * max(a["duration"], b["duration"])):
+        return False
+    if len(a["hashes"]) != len(b["hashes"]):
+        return False
+    return all(hamming(x, y) <= max_distance for x, y in zip(a["hashes"], b["hashes"]))
+
+
+def _keep_key(policy: DedupPolicy, index: int, path: Path) -> tuple:
+    """Sort key; the smallest member of a cluster is kept."""
+    try:
+        st = path.stat()
+    except OSError:
+        return (1, index)
+    if policy == DedupPolicy.KEEP_NEWEST:
+        return (0, -st.st_mtime, index)
+    if policy == DedupPolicy.KEEP_LARGEST:
+        return (0, -st.st_size, index)
+    return (0, index)
+
+
+def find_duplicates(
+    files: List[Path],
+    policy: DedupPolicy,
+    fingerprinter: VideoFingerprinter,
+    workers: int = 4,
+    progress_callback: Optional[Callable[[str], None]] = None
+) -> Tuple[List[Path], List[DuplicateCluster]]:
+    """
+    Collapse near-identical inputs.
+    
+    Fingerprints are computed in parallel (cached ones cost nothing).
+    Files without a fingerprint are never treated as duplicates.
+    
+    Returns:
+        (files to use, in their original order; clusters with skipped files)
+    """
+    if policy == DedupPolicy.OFF or len(files) < 2:
+        return list(files), []
+    
+    if progress_callback:
+        progress_callback(f"Checking {len(files)} files for duplicates...")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        fingerprints = list(pool.map(fingerprinter.fingerprint, files))
+    
+    # Union-find over pairs; sorting by duration limits comparisons to neighbours
+    parent = list(range(len(files)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    candidates = sorted((fp["duration"], i) for i, fp in enumerate(fingerprints) if fp)
+    for n, (duration, i) in enumerate(candidates):
+        tolerance = max(0.5, 0.01 * duration)
+        for other_duration, j in candidates[n + 1:]:
+            if other_duration - duration > tolerance:
+                break
+            if find(i) != find(j) and is_near_duplicate(fingerprints[i], fingerprints[j]):
+                parent[find(j)] = find(i)
+    
+    members: Dict[int, List[int]] = {}
+    for i in range(len(files)):
+        members.setdefault(find(i), []).append(i)
+    
+    dropped = set()
+    clusters = []
+    for indexes in members.values():
+        if len(indexes) < 2:
+            continue
+        keep = min(indexes, key=lambda i: _keep_key(policy, i, files[i]))
+        others = [i for i in indexes if i != keep]
+        dropped.update(others)
+        clusters.append(DuplicateCluster(files[keep], [files[i] for i in others]))
+    
+    kept = [path for i, path in enumerate(files) if i not in dropped]
+    if progress_callback and clusters:
+        progress_callback(f"Skipping {len(dropped)} duplicate files (keep {policy.value})")
+        for cluster in clusters[:10]:
+            names = ", ".join(path.name for path in cluster.dropped)
+            progress_callback(f"  {names} (same as {cluster.kept.name})")
+        if len(clusters) > 10:
+            progress_callback(f"  ... and {len(clusters) - 10} more")
+    return kept, clusters
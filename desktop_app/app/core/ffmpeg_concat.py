@@ -1,23 +1,203 @@
 """FFmpeg concatenation handling."""
+import shutil
 import subprocess
-import sys
 import tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from app.core.autotune import EncoderProfile, DEFAULT_ENCODER_PROFILE
+from app.core.bumpers import BumperLibrary
+from app.core.loudness import LoudnessNormalizer
+from app.core.probe import MediaProbe
+from app.core.process_control import FFmpegProcessGroup, ProcessCancelled
+from app.core.trim import SmartTrimmer
 from app.services.logging_service import logger
+from app.utils.fileclone import clone_file, is_mp4_file
 
-# Windows-specific: Hide console window for subprocess
-if sys.platform == 'win32':
-    CREATE_NO_WINDOW = 0x08000000
-else:
-    CREATE_NO_WINDOW = 0
+
+def _concat_list_line(
+    input_file: Path,
+    inpoint: Optional[float] = None,
+    outpoint: Optional[float] = None,
+    duration: Optional[float] = None
+) -> str:
+    """Format one concat demuxer entry (absolute path, single quotes escaped)."""
+    abs_path = str(input_file.resolve()).replace("'", "'\\''")
+    line = f"file '{abs_path}'\n"
+    if inpoint is not None:
+        line += f"inpoint {inpoint:.6f}\n"
+    if outpoint is not None:
+        line += f"outpoint {outpoint:.6f}\n"
+    if duration is not None:
+        line += f"duration {duration:.6f}\n"
+    return line
+
+
+def can_clone(input_files: List[Path], output_file: Path, probe: Optional[MediaProbe]) -> bool:
+    """
+    Check if a group can be produced by cloning its only file.
+    
+    The file must carry an MP4 (not QuickTime) ftyp brand and probe as an
+    MP4 with a video stream and a duration, so the clone is what a stream
+    copy remux would have produced. Without a probe nothing is cloned.
+    """
+    if len(input_files) != 1 or probe is None:
+        return False
+    source = input_files[0]
+    if output_file.suffix.lower() not in ('.mp4', '.m4v') or not is_mp4_file(source):
+        return False
+    info = probe.probe(source)
+    if not info or not info.get("video") or not info.get("duration"):
+        return False
+    return "mp4" in (info.get("format") or "").split(",")
+
+
+def _detach_output(output_file: Path):
+    """
+    Unlink output_file if it is a hardlink left by the zero-copy fast path.
+    
+    FFmpeg's -y truncates the existing file in place, which would destroy
+    the input it shares its data with.
+    """
+    try:
+        if output_file.exists() and output_file.stat().st_nlink > 1:
+            output_file.unlink()
+    except OSError:
+        pass
 
 
 class FFmpegConcat:
     """FFmpeg concatenation handler."""
     
-    def __init__(self, ffmpeg_path: Optional[str] = None):
+    def __init__(
+        self,
+        ffmpeg_path: Optional[str] = None,
+        encoder_profile: Optional[EncoderProfile] = None,
+        processes: Optional[FFmpegProcessGroup] = None,
+        loudness: Optional[LoudnessNormalizer] = None,
+        trimmer: Optional[SmartTrimmer] = None,
+        bumpers: Optional[BumperLibrary] = None,
+        probe: Optional[MediaProbe] = None
+    ):
         self.ffmpeg_path = ffmpeg_path or "ffmpeg"
+        self.encoder_profile = encoder_profile or DEFAULT_ENCODER_PROFILE
+        self.processes = processes or FFmpegProcessGroup()
+        self.loudness = loudness  # Normalizes audio (re-encoded) while video is copied if possible
+        self.trimmer = trimmer  # Cuts the head/tail of every clip (None = whole clips)
+        self.bumpers = bumpers  # Intro/outro around every group, matched to its footage
+        self.probe = probe or MediaProbe(self.ffmpeg_path)  # Checks single files before cloning
+    
+    def fingerprint(self) -> str:
+        """
+        Identify the settings that shape the output bytes.
+        
+        Used by the output cache: the same inputs concatenated with the same
+        fingerprint produce the same file.
+        """
+        fingerprint = f"concat-v1|{self.encoder_profile.fingerprint()}"
+        if self.loudness:
+            fingerprint += f"|{self.loudness.fingerprint()}"
+        if self.trimmer:
+            fingerprint += f"|{self.trimmer.fingerprint()}"
+        if self.bumpers:
+            fingerprint += f"|{self.bumpers.fingerprint()}"
+        return fingerprint
+    
+    def _list_text(self, input_files: List[Path]) -> str:
+        """
+        Concat demuxer list of a group (trimmed clips become inpoint/outpoint
+        entries, bumpers are added before and after the clips).
+        """
+        if not self.trimmer:
+            text = "".join(_concat_list_line(input_file) for input_file in input_files)
+        else:
+            text = "".join(
+                _concat_list_line(*entry)
+                for trim in self.trimmer.trim_group(input_files)
+                for entry in trim.entries()
+            )
+        if self.bumpers:
+            intro, outro = self.bumpers.wrap(input_files)
+            if intro:
+                text = _concat_list_line(intro) + text
+            if outro:
+                text += _concat_list_line(outro)
+        return text
+    
+    def _whole_clips(self) -> bool:
+        """Check if outputs are made of the unchanged input files only."""
+        return not self.loudness and not self.trimmer and not self.bumpers
+    
+    def _copy_safe(self, input_files: List[Path]) -> bool:
+        """Check if trim pieces and bumpers can be stream-copied with the footage."""
+        if self.trimmer and not self.trimmer.copy_safe(input_files):
+            return False
+        return not self.bumpers or self.bumpers.copy_safe(input_files, self._starts_at_file_start(input_files))
+    
+    def _starts_at_file_start(self, input_files: List[Path]) -> bool:
+        """Check if the footage after the intro starts a file (an IDR frame carrying its SPS/PPS)."""
+        if not self.trimmer:
+            return True
+        trims = self.trimmer.trim_group(input_files)
+        return not trims or trims[0].entries()[0][1] is None
+    
+    def _tag_args(self, input_files: List[Path]) -> List[str]:
+        """Video tag of a stream-copied group (in-band parameter sets for its bumpers)."""
+        tag = self.bumpers.inband_tag(input_files) if self.bumpers else None
+        return ["-tag:v", tag] if tag else []
+    
+    def _prepare_trims(self, input_files: List[Path], output_file: Path, progress_callback) -> bool:
+        """Cut the clips of a group up front and report it; False if nothing is left."""
+        trims = self.trimmer.trim_group(input_files)
+        if not trims:
+            logger.error(f"Nothing left of {output_file.name} after trimming")
+            return False
+        if progress_callback:
+            copied = sum(trim.copied_seconds for trim in trims)
+            reencoded = sum(trim.reencoded_seconds for trim in trims)
+            progress_callback(
+                f"Trimmed {len(trims)}/{len(input_files)} clips for {output_file.name}: "
+                f"{copied:.1f} s copied, {reencoded:.1f} s re-encoded"
+            )
+        return True
+    
+    def _stream_args(self, input_files: List[Path], copy: bool) -> List[str]:
+        """
+        Arguments following the concat demuxer input (input 0).
+        
+        With loudness normalization the group's files are added as extra
+        inputs for the normalized audio track and only the video comes from
+        the concat demuxer (copied, or encoded with the profile).
+        """
+        if not self.loudness:
+            return ["-c", "copy", *self._tag_args(input_files)] if copy else self.encoder_profile.output_args()
+        video_args = ["-c:v", "copy", *self._tag_args(input_files)] if copy else self.encoder_profile.video_args()
+        windows = None
+        if self.trimmer:
+            trims = self.trimmer.trim_group(input_files)
+            windows = [(trim.start, trim.end) for trim in trims]
+            audio_files = [trim.path for trim in trims]
+        else:
+            audio_files = list(input_files)
+        if self.bumpers:
+            # Bumpers are part of the audio track as a whole
+            intro, outro = self.bumpers.wrap(input_files)
+            if intro:
+                audio_files.insert(0, intro)
+                if windows is not None:
+                    windows.insert(0, (0.0, self.loudness.probe.duration(intro) or 0.0))
+            if outro:
+                audio_files.append(outro)
+                if windows is not None:
+                    windows.append((0.0, self.loudness.probe.duration(outro) or 0.0))
+        input_args, filter_complex, audio_label = self.loudness.audio_graph(audio_files, 1, windows)
+        return [
+            *input_args,
+            "-filter_complex", filter_complex,
+            "-map", "0:v:0?",
+            "-map", audio_label,
+            *video_args,
+            "-c:a", self.encoder_profile.audio_codec
+        ]
     
     def concat_videos(
         self,
@@ -38,15 +218,177 @@ class FFmpegConcat:
         Returns:
             True if successful, False otherwise
         """
+        if self.trimmer and not self._prepare_trims(input_files, output_file, progress_callback):
+            return False
+        return self._concat_prepared(input_files, output_file, use_copy, progress_callback)
+    
+    def _concat_prepared(
+        self,
+        input_files: List[Path],
+        output_file: Path,
+        use_copy: bool,
+        progress_callback: Optional[callable]
+    ) -> bool:
+        """concat_videos() for a group whose trims were already prepared and reported."""
+        if use_copy and not self._copy_safe(input_files):
+            use_copy = False
+            if progress_callback:
+                progress_callback(
+                    f"Re-encoding {output_file.name}: trim pieces or bumpers do not share "
+                    f"the footage's parameter sets"
+                )
+        if use_copy and self._whole_clips() and self._clone_single(input_files, output_file, progress_callback):
+            return True
+        
         if use_copy:
             # Try copy mode first
             if self._concat_with_copy(input_files, output_file, progress_callback):
                 return True
+            if self.processes.cancelled:
+                return False
             logger.info("Copy mode failed, falling back to re-encode")
         
         # Fallback to re-encode
         return self._concat_with_reencode(input_files, output_file, progress_callback)
     
+    def concat_batch(
+        self,
+        jobs: List[Tuple[List[Path], Path]],
+        progress_callback: Optional[callable] = None
+    ) -> List[bool]:
+        """
+        Concatenate several groups with a single FFmpeg process.
+        
+        Each group becomes its own concat demuxer input, mapped to its own
+        stream-copied output, so process startup is paid once per batch
+        instead of once per group. If the batch run fails, every group in it
+        is retried individually with concat_videos() (copy, then re-encode).
+        
+        Args:
+            jobs: List of (input_files, output_file) pairs
+            progress_callback: Optional callback for progress updates
+        
+        Returns:
+            Success flag per job, in the same order as jobs
+        """
+        results = [False] * len(jobs)
+        if self.loudness:
+            # Every group needs its own audio graph, so there is no shared process
+            return [
+                self.concat_videos(input_files, output_file, True, progress_callback)
+                for input_files, output_file in jobs
+            ]
+        pending = []
+        for index, (input_files, output_file) in enumerate(jobs):
+            # Single-file groups that are already MP4 never need FFmpeg (unless trimmed or wrapped)
+            if self._whole_clips() and self._clone_single(input_files, output_file, progress_callback):
+                results[index] = True
+            elif not self._copy_safe(input_files):
+                results[index] = self.concat_videos(input_files, output_file, True, progress_callback)
+            else:
+                pending.append(index)
+        
+        if len(pending) == 1:
+            input_files, output_file = jobs[pending[0]]
+            results[pending[0]] = self.concat_videos(input_files, output_file, True, progress_callback)
+        elif pending:
+            if self.trimmer:
+                pending = [i for i in pending if self._prepare_trims(*jobs[i], progress_callback)]
+            if not pending:
+                return results  # Nothing left of these groups after trimming (already logged)
+            if self._concat_batch_with_copy([jobs[i] for i in pending], progress_callback):
+                for index in pending:
+                    results[index] = True
+            else:
+                if self.processes.cancelled:
+                    return results
+                logger.info("Batch copy failed, falling back to per-group processing")
+                for index in pending:
+                    input_files, output_file = jobs[index]
+                    results[index] = self._concat_prepared(input_files, output_file, True, progress_callback)
+        return results
+    
+    def _clone_single(
+        self,
+        input_files: List[Path],
+        output_file: Path,
+        progress_callback: Optional[callable] = None
+    ) -> bool:
+        """
+        Zero-copy fast path for one-file groups.
+        
+        Concatenating a single MP4 into an MP4 with stream copy only rewrites
+        the container, so the file is cloned instead (reflink or an in-kernel
+        copy). Never a hardlink: editing the output would change the input.
+        Returns False when the container needs to change.
+        """
+        if not can_clone(input_files, output_file, self.probe):
+            return False
+        source = input_files[0]
+        
+        method = clone_file(source, output_file, allow_hardlink=False)
+        if method is None:
+            logger.info(f"Could not clone {source.name}, using stream copy")
+            return False
+        
+        logger.info(f"Cloned {source.name} -> {output_file.name} ({method})")
+        if progress_callback:
+            progress_callback(f"Successfully created: {output_file.name} (single file, {method})")
+        return True
+    
+    def _concat_batch_with_copy(
+        self,
+        jobs: List[Tuple[List[Path], Path]],
+        progress_callback: Optional[callable] = None
+    ) -> bool:
+        """Run all jobs as one multi-output FFmpeg stream copy."""
+        list_dir = Path(tempfile.mkdtemp(prefix="vmc_concat_"))
+        try:
+            cmd = [self.ffmpeg_path]
+            for index, (input_files, _) in enumerate(jobs):
+                list_file = list_dir / f"group_{index}.txt"
+                with open(list_file, 'w', encoding='utf-8') as f:
+                    f.write(self._list_text(input_files))
+                cmd += ["-f", "concat", "-safe", "0", "-i", str(list_file)]
+            
+            for index, (input_files, output_file) in enumerate(jobs):
+                cmd += [
+                    "-map", f"{index}:v:0?",
+                    "-map", f"{index}:a:0?",
+                    "-c", "copy",
+                    *self._tag_args(input_files),
+                    "-y",
+                    str(output_file)
+                ]
+            
+            for _, output_file in jobs:
+                _detach_output(output_file)
+            if progress_callback:
+                progress_callback(f"Starting batch concat (copy mode): {len(jobs)} groups in one process")
+            
+            result = self.processes.run(cmd, timeout=3600)  # 1 hour timeout
+            
+            if result.returncode == 0:
+                if progress_callback:
+                    for _, output_file in jobs:
+                        progress_callback(f"Successfully created: {output_file.name}")
+                return True
+            else:
+                logger.error(f"FFmpeg batch copy failed: {result.stderr}")
+                return False
+        except subprocess.TimeoutExpired:
+            logger.error("FFmpeg timeout")
+            return False
+        except ProcessCancelled:
+            logger.info("FFmpeg stopped (cancelled)")
+            return False
+        except Exception as e:
+            logger.error(f"FFmpeg error: {e}")
+            return False
+        finally:
+            # Clean up list files
+            shutil.rmtree(list_dir, ignore_errors=True)
+    
     def _concat_with_copy(
         self,
         input_files: List[Path],
@@ -57,10 +399,7 @@ class FFmpegConcat:
         # Create concat list file
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
             list_file = Path(f.name)
-            for input_file in input_files:
-                # Use absolute paths and escape single quotes
-                abs_path = input_file.resolve()
-                f.write(f"file '{abs_path}'\n")
+            f.write(self._list_text(input_files))
         
         try:
             cmd = [
@@ -68,29 +407,17 @@ class FFmpegConcat:
                 "-f", "concat",
                 "-safe", "0",
                 "-i", str(list_file),
-                "-c", "copy",
+                *self._stream_args(input_files, copy=True),
                 "-y",  # Overwrite output
                 str(output_file)
             ]
             
+            _detach_output(output_file)
             if progress_callback:
-                progress_callback(f"Starting concat (copy mode): {len(input_files)} files")
+                mode = "copy mode, normalized audio" if self.loudness else "copy mode"
+                progress_callback(f"Starting concat ({mode}): {len(input_files)} files")
             
-            # Hide console window on Windows
-            startupinfo = None
-            if sys.platform == 'win32':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=3600,  # 1 hour timeout
-                creationflags=CREATE_NO_WINDOW if sys.platform == 'win32' else 0,
-                startupinfo=startupinfo
-            )
+            result = self.processes.run(cmd, timeout=3600)  # 1 hour timeout
             
             if result.returncode == 0:
                 if progress_callback:
@@ -102,6 +429,9 @@ class FFmpegConcat:
         except subprocess.TimeoutExpired:
             logger.error("FFmpeg timeout")
             return False
+        except ProcessCancelled:
+            logger.info("FFmpeg stopped (cancelled)")
+            return False
         except Exception as e:
             logger.error(f"FFmpeg error: {e}")
             return False
@@ -122,9 +452,7 @@ class FFmpegConcat:
         # Create concat list file
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
             list_file = Path(f.name)
-            for input_file in input_files:
-                abs_path = input_file.resolve()
-                f.write(f"file '{abs_path}'\n")
+            f.write(self._list_text(input_files))
         
         try:
             cmd = [
@@ -132,30 +460,18 @@ class FFmpegConcat:
                 "-f", "concat",
                 "-safe", "0",
                 "-i", str(list_file),
-                "-c:v", "libx264",
-                "-c:a", "aac",
+                *self._stream_args(input_files, copy=False),
                 "-y",
                 str(output_file)
             ]
             
+            _detach_output(output_file)
             if progress_callback:
-                progress_callback(f"Starting concat (re-encode mode): {len(input_files)} files")
+                progress_callback(
+                    f"Starting concat (re-encode mode, {self.encoder_profile}): {len(input_files)} files"
+                )
             
-            # Hide console window on Windows
-            startupinfo = None
-            if sys.platform == 'win32':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=7200,  # 2 hour timeout
-                creationflags=CREATE_NO_WINDOW if sys.platform == 'win32' else 0,
-                startupinfo=startupinfo
-            )
+            result = self.processes.run(cmd, timeout=7200)  # 2 hour timeout
             
             if result.returncode == 0:
                 if progress_callback:
@@ -167,6 +483,9 @@ class FFmpegConcat:
         except subprocess.TimeoutExpired:
             logger.error("FFmpeg timeout")
             return False
+        except ProcessCancelled:
+            logger.info("FFmpeg stopped (cancelled)")
+            return False
         except Exception as e:
             logger.error(f"FFmpeg error: {e}")
             return False
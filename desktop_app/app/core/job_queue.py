@@ -0,0 +1,456 @@
+"""Persistent queue of processing jobs."""
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from PySide6.QtCore import QObject, Signal
+from app.core.autotune import EncoderProfile
+from app.core.concurrency import ConcurrencyBudget
+from app.core.dedup import DedupPolicy
+from app.core.grouper import SortMode, RemainderBehavior
+from app.core.output_cache import OutputStore
+from app.core.scheduler import SchedulePolicy
+from app.core.trim import TrimMode
+from app.core.worker import VideoProcessingWorker
+from app.services.logging_service import logger
+
+
+class JobStatus(Enum):
+    """State of a queued job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"  # Finished with failed groups or an error
+    CANCELLED = "cancelled"
+
+
+class QueuedJob:
+    """
+    One folder to process with its own settings.
+
+    settings holds the form values at the time the job was added (see
+    create_worker() for the keys), so later changes to the form do not
+    affect jobs already in the queue.
+    """
+
+    def __init__(
+        self,
+        input_dir: str,
+        output_dir: str,
+        settings: Dict[str, Any],
+        job_id: Optional[str] = None,
+        status: JobStatus = JobStatus.QUEUED,
+        message: str = "",
+        completed_groups: int = 0,
+        total_groups: int = 0,
+        created_at: Optional[str] = None,
+        finished_at: Optional[str] = None
+    ):
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.settings = settings
+        self.status = status
+        self.message = message
+        self.completed_groups = completed_groups
+        self.total_groups = total_groups
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat()
+        self.finished_at = finished_at
+
+    @property
+    def name(self) -> str:
+        return Path(self.input_dir).name or self.input_dir
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "input_dir": self.input_dir,
+            "output_dir": self.output_dir,
+            "settings": self.settings,
+            "status": self.status.value,
+            "message": self.message,
+            "completed_groups": self.completed_groups,
+            "total_groups": self.total_groups,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueuedJob":
+        try:
+            status = JobStatus(data.get("status", "queued"))
+        except ValueError:
+            status = JobStatus.QUEUED
+        return cls(
+            data["input_dir"],
+            data["output_dir"],
+            data.get("settings", {}),
+            job_id=data.get("job_id"),
+            status=status,
+            message=data.get("message", ""),
+            completed_groups=data.get("completed_groups", 0),
+            total_groups=data.get("total_groups", 0),
+            created_at=data.get("created_at"),
+            finished_at=data.get("finished_at")
+        )
+
+
+class JobQueue:
+    """
+    Ordered list of jobs stored in a JSON file next to config.json.
+
+    Every change is written immediately (temp file + rename), so the queue
+    survives restarts and crashes. Jobs that were running when the app
+    exited are put back to QUEUED on load; with the output cache enabled
+    their already finished groups are restored instead of re-encoded.
+    """
+
+    def __init__(self, queue_file: Path):
+        self.queue_file = queue_file
+        self._jobs: List[QueuedJob] = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.queue_file.exists():
+            return
+        try:
+            with open(self.queue_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._jobs = [QueuedJob.from_dict(item) for item in data.get("jobs", [])]
+        except (json.JSONDecodeError, IOError, KeyError, TypeError, AttributeError):
+            logger.warning("Job queue file is unreadable, starting with an empty queue")
+            self._jobs = []
+            return
+        for job in self._jobs:
+            if job.status == JobStatus.RUNNING:
+                job.status = JobStatus.QUEUED
+                job.message = "Interrupted, will restart"
+
+    def save(self):
+        """Persist the queue."""
+        with self._lock:
+            data = json.dumps({"jobs": [job.to_dict() for job in self._jobs]}, indent=2)
+            tmp_file = self.queue_file.with_suffix(".tmp")
+            try:
+                self.queue_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.queue_file)
+            except IOError as e:
+                logger.warning(f"Could not save job queue: {e}")
+
+    def jobs(self) -> List[QueuedJob]:
+        """Get all jobs in queue order."""
+        with self._lock:
+            return list(self._jobs)
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        """Get a job by id."""
+        with self._lock:
+            for job in self._jobs:
+                if job.job_id == job_id:
+                    return job
+        return None
+
+    def add(self, job: QueuedJob):
+        """Append a job."""
+        with self._lock:
+            self._jobs.append(job)
+        self.save()
+
+    def remove(self, job_id: str) -> bool:
+        """
+        Remove a job that is not running.
+
+        Returns:
+            True if the job was removed
+        """
+        with self._lock:
+            for job in self._jobs:
+                if job.job_id == job_id and job.status != JobStatus.RUNNING:
+                    self._jobs.remove(job)
+                    break
+            else:
+                return False
+        self.save()
+        return True
+
+    def clear_finished(self):
+        """Remove completed, failed and cancelled jobs."""
+        with self._lock:
+            self._jobs = [job for job in self._jobs if job.status in (JobStatus.QUEUED, JobStatus.RUNNING)]
+        self.save()
+
+    def requeue(self, job_id: str) -> bool:
+        """Put a finished job back into the queue."""
+        job = self.get(job_id)
+        if job is None or job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+            return False
+        self.update(job, status=JobStatus.QUEUED, message="", completed_groups=0, finished_at=None)
+        return True
+
+    def next_queued(self) -> Optional[QueuedJob]:
+        """Get the first job waiting to run."""
+        with self._lock:
+            for job in self._jobs:
+                if job.status == JobStatus.QUEUED:
+                    return job
+        return None
+
+    def update(self, job: QueuedJob, save: bool = True, **fields):
+        """Change fields of a job and persist the queue."""
+        with self._lock:
+            for name, value in fields.items():
+                setattr(job, name, value)
+        if save:
+            self.save()
+
+
+def create_worker(
+    input_dir: Path,
+    output_dir: Path,
+    settings: Dict[str, Any],
+    ffmpeg_path: Optional[str],
+    prefetch_groups: int = 2,
+    prefetch_budget_mb: int = 512,
+    output_store: Optional[OutputStore] = None,
+    budget: Optional[ConcurrencyBudget] = None,
+    bumper_cache_max_mb: int = 2048
+) -> VideoProcessingWorker:
+    """
+    Create a worker from a settings dict as stored in QueuedJob.settings.
+
+    Keys: group_size, sort_mode, remainder_behavior, output_naming_pattern,
+    encoder_profile, batch_size, schedule_policy, pinned_groups, max_jobs,
+    adaptive_concurrency, background_priority, dedup_policy,
+    loudness_normalization, loudness_target, trim_head, trim_tail, trim_mode,
+    intro_path, outro_path. Missing keys use the worker defaults.
+    """
+    encoder_profile = settings.get("encoder_profile")
+    return VideoProcessingWorker(
+        input_dir,
+        output_dir,
+        settings.get("group_size", 2),
+        SortMode(settings.get("sort_mode", SortMode.FILENAME.value)),
+        RemainderBehavior(settings.get("remainder_behavior", RemainderBehavior.IGNORE.value)),
+        settings.get("output_naming_pattern") or "group_{group}.mp4",
+        ffmpeg_path,
+        encoder_profile=EncoderProfile.from_dict(encoder_profile) if encoder_profile else None,
+        batch_size=settings.get("batch_size", 1),
+        prefetch_groups=prefetch_groups,
+        prefetch_budget_mb=prefetch_budget_mb,
+        output_store=output_store,
+        schedule_policy=SchedulePolicy(settings.get("schedule_policy", SchedulePolicy.INDEX.value)),
+        pinned_groups=settings.get("pinned_groups"),
+        max_jobs=settings.get("max_jobs", 1),
+        adaptive_concurrency=settings.get("adaptive_concurrency", False),
+        background_priority=settings.get("background_priority", False),
+        budget=budget,
+        dedup_policy=DedupPolicy(settings.get("dedup_policy", DedupPolicy.OFF.value)),
+        loudness_normalization=settings.get("loudness_normalization", False),
+        loudness_target=settings.get("loudness_target", -16.0),
+        trim_head=settings.get("trim_head", 0.0),
+        trim_tail=settings.get("trim_tail", 0.0),
+        trim_mode=TrimMode(settings.get("trim_mode", TrimMode.KEYFRAME.value)),
+        intro_path=Path(settings["intro_path"]) if settings.get("intro_path") else None,
+        outro_path=Path(settings["outro_path"]) if settings.get("outro_path") else None,
+        bumper_cache_max_mb=bumper_cache_max_mb
+    )
+
+
+class JobQueueRunner(QObject):
+    """
+    Run queued jobs, parallel_jobs at a time.
+
+    All running jobs draw FFmpeg slots from one ConcurrencyBudget, so the
+    total number of FFmpeg processes stays within ffmpeg_slots however the
+    jobs are configured. Lives in the UI thread; each job runs in its own
+    VideoProcessingWorker.
+    """
+
+    # Signals
+    job_changed = Signal(str)  # job_id (status or progress changed)
+    job_progress = Signal(str, str)  # job_id, message
+    queue_finished = Signal()
+
+    def __init__(self, queue: JobQueue, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self._workers: Dict[str, VideoProcessingWorker] = {}
+        self._stopping = False
+        self._running = False
+        self._paused = False
+        self._background_priority = False
+        self._parallel_jobs = 1
+        self._ffmpeg_path: Optional[str] = None
+        self._output_store: Optional[OutputStore] = None
+        self._budget: Optional[ConcurrencyBudget] = None
+        self._prefetch_groups = 2
+        self._prefetch_budget_mb = 512
+        self._bumper_cache_max_mb = 2048
+
+    def is_running(self) -> bool:
+        """Check if the queue is being processed."""
+        return self._running
+
+    def is_paused(self) -> bool:
+        """Check if the running jobs are paused."""
+        return self._paused
+
+    def start(
+        self,
+        ffmpeg_path: Optional[str],
+        parallel_jobs: int = 1,
+        ffmpeg_slots: int = 1,
+        output_store: Optional[OutputStore] = None,
+        prefetch_groups: int = 2,
+        prefetch_budget_mb: int = 512,
+        bumper_cache_max_mb: int = 2048
+    ) -> bool:
+        """
+        Start processing queued jobs.
+
+        Returns:
+            False if already running or nothing is queued
+        """
+        if self._running or self.queue.next_queued() is None:
+            return False
+        self._running = True
+        self._stopping = False
+        self._paused = False
+        self._parallel_jobs = max(1, parallel_jobs)
+        self._ffmpeg_path = ffmpeg_path
+        self._output_store = output_store
+        self._budget = ConcurrencyBudget(ffmpeg_slots)
+        self._prefetch_groups = prefetch_groups
+        self._prefetch_budget_mb = prefetch_budget_mb
+        self._bumper_cache_max_mb = bumper_cache_max_mb
+        logger.info(
+            f"Job queue started ({self._parallel_jobs} job(s) at once, "
+            f"{self._budget.slots} FFmpeg slot(s))"
+        )
+        self._fill()
+        return True
+
+    def stop(self):
+        """
+        Cancel running jobs and stop starting new ones (queued jobs stay queued).
+
+        Returns right away; queue_finished is emitted once the last worker
+        has finished.
+        """
+        if not self._running:
+            return
+        self._stopping = True
+        for worker in list(self._workers.values()):
+            worker.cancel()
+        if not self._workers:
+            self._fill()
+
+    def pause(self):
+        """Pause all running jobs."""
+        self._paused = True
+        for worker in self._workers.values():
+            worker.pause()
+
+    def resume(self):
+        """Resume all running jobs and continue with the queue."""
+        self._paused = False
+        for worker in self._workers.values():
+            worker.resume()
+        self._fill()
+
+    def set_background_priority(self, enabled: bool):
+        """Change FFmpeg priority of running jobs."""
+        self._background_priority = enabled
+        for worker in self._workers.values():
+            worker.set_background_priority(enabled)
+
+    def _fill(self):
+        """Start queued jobs until parallel_jobs are running."""
+        while not self._stopping and not self._paused and len(self._workers) < self._parallel_jobs:
+            job = self.queue.next_queued()
+            if job is None:
+                break
+            self._start_job(job)
+
+        if self._workers:
+            return
+        # Paused between jobs: keep running so resume() continues with the queue
+        if self._stopping or self.queue.next_queued() is None:
+            self._running = False
+            logger.info("Job queue finished")
+            self.queue_finished.emit()
+
+    def _start_job(self, job: QueuedJob):
+        if not Path(job.input_dir).exists() or not Path(job.output_dir).exists():
+            self.queue.update(
+                job,
+                status=JobStatus.FAILED,
+                message="Input or output folder not found",
+                finished_at=datetime.now(timezone.utc).isoformat()
+            )
+            self.job_changed.emit(job.job_id)
+            return
+
+        # Background priority is switched for the whole queue from the main window
+        settings = dict(job.settings, background_priority=self._background_priority)
+        worker = create_worker(
+            Path(job.input_dir),
+            Path(job.output_dir),
+            settings,
+            self._ffmpeg_path,
+            prefetch_groups=self._prefetch_groups,
+            prefetch_budget_mb=self._prefetch_budget_mb,
+            output_store=self._output_store,
+            budget=self._budget,
+            bumper_cache_max_mb=self._bumper_cache_max_mb
+        )
+        job_id = job.job_id
+        worker.progress.connect(lambda message, job_id=job_id: self._on_progress(job_id, message))
+        worker.group_complete.connect(
+            lambda index, total, success, job_id=job_id: self._on_group_complete(job_id, total)
+        )
+        worker.finished.connect(lambda success, job_id=job_id: self._on_finished(job_id, success))
+        self._workers[job_id] = worker
+
+        self.queue.update(job, status=JobStatus.RUNNING, message="Starting", completed_groups=0, total_groups=0)
+        self.job_changed.emit(job_id)
+        logger.info(f"Job {job.name} ({job_id}) started")
+        worker.start()
+
+    def _on_progress(self, job_id: str, message: str):
+        job = self.queue.get(job_id)
+        if job is not None:
+            self.queue.update(job, save=False, message=message)
+            self.job_changed.emit(job_id)
+        self.job_progress.emit(job_id, message)
+
+    def _on_group_complete(self, job_id: str, total: int):
+        job = self.queue.get(job_id)
+        if job is not None:
+            self.queue.update(job, completed_groups=job.completed_groups + 1, total_groups=total)
+            self.job_changed.emit(job_id)
+
+    def _on_finished(self, job_id: str, success: bool):
+        worker = self._workers.pop(job_id, None)
+        if worker is not None:
+            worker.wait()
+
+        job = self.queue.get(job_id)
+        if job is not None:
+            if success:
+                status = JobStatus.COMPLETED
+            elif self._stopping:
+                status = JobStatus.CANCELLED
+            else:
+                status = JobStatus.FAILED
+            self.queue.update(job, status=status, finished_at=datetime.now(timezone.utc).isoformat())
+            self.job_changed.emit(job_id)
+            logger.info(f"Job {job.name} ({job_id}) {status.value}")
+        self._fill()
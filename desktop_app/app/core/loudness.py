@@ -0,0 +1,205 @@
+"""Two-pass EBU R128 loudness normalization with cached first-pass measurements."""
+import json
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.probe import MediaProbe
+from app.core.process_control import FFmpegProcessGroup, ProcessCancelled
+from app.services.logging_service import logger
+
+
+EXTRA_NAME = "loudness"  # MediaProbe.set_extra() key
+MEASUREMENT_VERSION = 1  # Bump when the analysis changes
+SILENCE_LUFS = -70.0  # Quieter than this is treated as silence (no gain applied)
+_JSON_RE = re.compile(r"\{[^{}]*\"input_i\"[^{}]*\}", re.S)
+
+
+class LoudnessNormalizer:
+    """
+    Normalize the audio of every input to a common loudness.
+    
+    The first loudnorm pass (integrated loudness, true peak, LRA and
+    threshold) only depends on the input, so it runs once per file, in
+    parallel, and is stored in the probe cache. Outputs then need a single
+    encode: each input's audio goes through loudnorm in linear mode with its
+    measured values, padded or trimmed to the file's duration so it stays in
+    sync with the concatenated video, and the segments are joined with the
+    concat filter. Video is still stream-copied when the inputs allow it.
+    """
+    
+    def __init__(
+        self,
+        ffmpeg_path: Optional[str],
+        probe: MediaProbe,
+        processes: Optional[FFmpegProcessGroup] = None,
+        target_lufs: float = -16.0,
+        true_peak: float = -1.5,
+        lra: float = 11.0,
+        sample_rate: int = 48000
+    ):
+        self.ffmpeg_path = ffmpeg_path or "ffmpeg"
+        self.probe = probe
+        self.processes = processes or FFmpegProcessGroup()
+        self.target_lufs = target_lufs
+        self.true_peak = true_peak
+        self.lra = lra
+        self.sample_rate = sample_rate
+    
+    def fingerprint(self) -> str:
+        """Identify the normalization settings (part of the output cache key)."""
+        return f"loudnorm-v{MEASUREMENT_VERSION}:I{self.target_lufs}:TP{self.true_peak}:LRA{self.lra}:{self.sample_rate}"
+    
+    def _target_args(self) -> str:
+        return f"I={self.target_lufs}:TP={self.true_peak}:LRA={self.lra}"
+    
+    def measure(self, path: Path) -> Optional[Dict]:
+        """
+        Get the first-pass measurement of path (cached until the file changes).
+        
+        Returns:
+            {"input_i", "input_tp", "input_lra", "input_thresh"} in LUFS/dBTP/LU,
+            or None if the file has no audio or could not be analyzed
+        """
+        cached = self.probe.get_extra(path, EXTRA_NAME)
+        if cached and cached.get("version") == MEASUREMENT_VERSION:
+            return cached.get("values")
+        
+        info = self.probe.probe(path)
+        if not info:
+            return None
+        values = self._analyze(path) if info.get("audio") else None
+        if values is None and self.processes.cancelled:
+            return None  # Don't cache a failure caused by cancelling
+        self.probe.set_extra(path, EXTRA_NAME, {"version": MEASUREMENT_VERSION, "values": values})
+        return values
+    
+    def measure_all(
+        self,
+        files: List[Path],
+        workers: int = 4,
+        progress_callback: Optional[Callable[[str], None]] = None
+    ) -> int:
+        """
+        Measure every file that is not cached yet, in parallel.
+        
+        Returns:
+            Number of files that had to be analyzed
+        """
+        unique = list(dict.fromkeys(files))
+        todo = []
+        for path in unique:
+            cached = self.probe.get_extra(path, EXTRA_NAME)
+            if not cached or cached.get("version") != MEASUREMENT_VERSION:
+                todo.append(path)
+        if progress_callback:
+            progress_callback(
+                f"Loudness: {len(unique) - len(todo)} of {len(unique)} files measured before"
+                + (f", analyzing {len(todo)}..." if todo else "")
+            )
+        if todo:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                list(pool.map(self.measure, todo))
+        return len(todo)
+    
+    def _analyze(self, path: Path) -> Optional[Dict]:
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner", "-nostats",
+            "-i", str(path),
+            "-map", "0:a:0",
+            "-af", f"loudnorm={self._target_args()}:print_format=json",
+            "-f", "null", "-"
+        ]
+        try:
+            result = self.processes.run(cmd, timeout=3600)
+        except (ProcessCancelled, subprocess.TimeoutExpired, OSError) as e:
+            logger.info(f"Loudness of {path.name} not measured: {e.__class__.__name__}")
+            return None
+        match = _JSON_RE.search(result.stderr or "")
+        if result.returncode != 0 or not match:
+            logger.warning(f"Loudness analysis failed for {path.name}")
+            return None
+        try:
+            data = json.loads(match.group(0))
+            values = {key: float(data[key]) for key in ("input_i", "input_tp", "input_lra", "input_thresh")}
+        except (ValueError, KeyError):
+            return None
+        logger.info(f"Loudness of {path.name}: {values['input_i']:.1f} LUFS, peak {values['input_tp']:.1f} dBTP")
+        return values
+    
+    def segment_filter(self, path: Path, channels: int, duration: Optional[float] = None) -> str:
+        """
+        Audio filter chain for one input (without stream labels).
+        
+        Uses linear loudnorm with the cached measurement; inputs that were
+        not measured fall back to one-pass (dynamic) loudnorm, silent ones
+        (input_i is -inf) are left as they are. The result is padded or cut
+        to duration (default: the file's duration).
+        """
+        layout = "mono" if channels == 1 else "stereo"
+        values = self.measure(path)
+        filters = []
+        if values is None:
+            filters.append(f"loudnorm={self._target_args()}")
+        elif values["input_i"] > SILENCE_LUFS:
+            filters.append(
+                f"loudnorm={self._target_args()}"
+                f":measured_I={values['input_i']}:measured_TP={values['input_tp']}"
+                f":measured_LRA={values['input_lra']}:measured_thresh={values['input_thresh']}"
+                ":linear=true"
+            )
+        filters.append(f"aformat=sample_fmts=fltp:sample_rates={self.sample_rate}:channel_layouts={layout}")
+        duration = duration or self.probe.duration(path)
+        if duration:
+            # Match the concat demuxer, which starts each file after the previous one's duration
+            filters.append(f"apad,atrim=0:{duration:.6f}")
+        return ",".join(filters)
+    
+    def audio_graph(
+        self,
+        input_files: List[Path],
+        first_input: int,
+        windows: Optional[List[Tuple[float, float]]] = None
+    ) -> Tuple[List[str], str, str]:
+        """
+        Build the normalized audio track of a group.
+        
+        Args:
+            input_files: Files of the group, in order
+            first_input: FFmpeg input index the group's files will start at
+            windows: (start, end) seconds used of each file (trimmed clips);
+                None uses the whole files
+        
+        Returns:
+            (input args, filter_complex, output label)
+        """
+        infos = [self.probe.probe(path) or {} for path in input_files]
+        channels = max(((info.get("audio") or {}).get("channels") or 2 for info in infos), default=2)
+        input_args = []
+        chains = []
+        labels = ""
+        index = first_input
+        for offset, (path, info) in enumerate(zip(input_files, infos)):
+            label = f"[na{offset}]"
+            duration = None
+            if windows:
+                start, end = windows[offset]
+                duration = end - start
+            if info.get("audio"):
+                if windows:
+                    input_args += ["-ss", f"{start:.6f}", "-t", f"{duration:.6f}"]
+                input_args += ["-i", str(path)]
+                chains.append(f"[{index}:a:0]{self.segment_filter(path, channels, duration)}{label}")
+                index += 1
+            else:
+                # Keep the timeline: silence for inputs without audio
+                layout = "mono" if channels == 1 else "stereo"
+                duration = duration or info.get("duration") or 0.0
+                chains.append(
+                    f"anullsrc=r={self.sample_rate}:cl={layout},atrim=0:{duration:.6f}{label}"
+                )
+            labels += label
+        chains.append(f"{labels}concat=n={len(input_files)}:v=0:a=1[aout]")
+        return input_args, ";".join(chains), "[aout]"
@@ -0,0 +1,206 @@
+"""Content-addressed store of finished group outputs."""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.services.logging_service import logger
+from app.utils.fileclone import clone_file
+
+
+def _stat_key(path: Path) -> Optional[str]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+
+
+class OutputStore:
+    """
+    Reuse byte-identical group outputs across runs.
+
+    Entries are keyed by the ordered content hashes of a group's inputs plus
+    the fingerprint of the settings that produced it (see
+    FFmpegConcat.fingerprint()). A hit is materialized with a reflink or
+    hardlink instead of running FFmpeg. Content hashes are memoized by
+    (path, size, mtime) so unchanged inputs are hashed only once. The store
+    is bounded by max_bytes with least-recently-used eviction.
+    """
+
+    INDEX_FILE = "index.json"
+    HASH_CHUNK_SIZE = 1024 * 1024
+    MAX_FILE_HASHES = 50000
+
+    def __init__(self, store_dir: Path, max_bytes: int = 10 * 1024 ** 3):
+        self.store_dir = store_dir
+        self.objects_dir = store_dir / "objects"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.seconds_saved = 0.0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Workers of concurrent queue jobs share one store
+        self._entries: Dict[str, dict] = {}
+        self._file_hashes: Dict[str, str] = {}
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        index_file = self.store_dir / self.INDEX_FILE
+        if not index_file.exists():
+            return
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = data.get("entries", {})
+            self._file_hashes = data.get("file_hashes", {})
+        except (json.JSONDecodeError, IOError, AttributeError):
+            self._entries = {}
+            self._file_hashes = {}
+
+    def save(self):
+        """Persist the index."""
+        with self._lock:
+            if len(self._file_hashes) > self.MAX_FILE_HASHES:
+                # Keep the most recently added half
+                recent = list(self._file_hashes.items())[-(self.MAX_FILE_HASHES // 2):]
+                self._file_hashes = dict(recent)
+            data = {"entries": self._entries, "file_hashes": self._file_hashes}
+        index_file = self.store_dir / self.INDEX_FILE
+        tmp_file = index_file.with_suffix(".tmp")
+        with self._save_lock:
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_file, index_file)
+            except IOError as e:
+                logger.warning(f"Could not save output cache index: {e}")
+
+    def file_hash(self, path: Path, compute: bool = True) -> Optional[str]:
+        """
+        Get the content hash of path (memoized by size and mtime).
+
+        With compute=False only a memoized hash is returned (a stat, no
+        reading), None otherwise.
+        """
+        stat_key = _stat_key(path)
+        if stat_key is None:
+            return None
+        with self._lock:
+            cached = self._file_hashes.get(stat_key)
+        if cached or not compute:
+            return cached
+
+        digest = hashlib.blake2b(digest_size=20)
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        value = digest.hexdigest()
+        with self._lock:
+            self._file_hashes[stat_key] = value
+        return value
+
+    def group_key(self, input_files: List[Path], fingerprint: str, compute: bool = True) -> Optional[str]:
+        """
+        Get the store key for a group, or None if an input cannot be read.
+
+        Hashing reads every input in full; with compute=False the key is
+        only returned if all inputs are already hashed (see file_hash()).
+        """
+        hashes = []
+        for path in input_files:
+            value = self.file_hash(path, compute)
+            if value is None:
+                return None
+            hashes.append(value)
+        payload = json.dumps({"fingerprint": fingerprint, "inputs": hashes})
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _object_path(self, key: str) -> Path:
+        return self.objects_dir / f"{key}.mp4"
+
+    def materialize(self, key: str, output_file: Path) -> Optional[str]:
+        """
+        Recreate a stored output at output_file.
+
+        Returns:
+            Clone method used, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        obj = self._object_path(key)
+        if entry is None or _stat_key(obj) != entry.get("stat"):
+            # Missing, or the object was modified through a hardlinked output
+            if entry is not None:
+                self._drop(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        method = clone_file(obj, output_file)
+        if method is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            entry["last_used"] = time.time()
+            self.hits += 1
+            self.bytes_saved += entry.get("size", 0)
+            self.seconds_saved += entry.get("seconds", 0.0)
+        return method
+
+    def put(self, key: str, output_file: Path, seconds: float):
+        """Add a freshly produced output to the store."""
+        obj = self._object_path(key)
+        method = clone_file(output_file, obj)
+        if method is None:
+            return
+        stat_key = _stat_key(obj)
+        size = obj.stat().st_size
+        with self._lock:
+            self._entries[key] = {
+                "size": size,
+                "seconds": seconds,
+                "stat": stat_key,
+                "last_used": time.time()
+            }
+        self._evict()
+
+    def _drop(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        try:
+            self._object_path(key).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove least recently used entries until the store fits max_bytes."""
+        with self._lock:
+            total = sum(e.get("size", 0) for e in self._entries.values())
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1].get("last_used", 0)):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= entry.get("size", 0)
+        for key in victims:
+            logger.info(f"Output cache: evicting {key[:12]}")
+            self._drop(key)
+
+    def summary(self) -> str:
+        """Get a human-readable report of cache effectiveness."""
+        return (
+            f"Output cache: {self.hits} reused, {self.misses} produced, "
+            f"{self.bytes_saved / (1024 * 1024):.1f} MB and {self.seconds_saved:.1f}s saved"
+        )
@@ -0,0 +1,195 @@
+"""Group plan preview: what a batch would do, computed without running FFmpeg."""
+import csv
+import json
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from app.core.dedup import DedupPolicy, VideoFingerprinter, find_duplicates
+from app.core.grouper import scan_video_files, group_files, SortMode, RemainderBehavior
+from app.core.ffmpeg_concat import can_clone
+from app.core.probe import MediaProbe
+
+
+class PlanStrategy(Enum):
+    """How a group is expected to be produced."""
+    CLONE = "clone"  # Single MP4, cloned without FFmpeg
+    COPY = "copy"  # Inputs share stream parameters, (video) stream copy should work
+    REENCODE = "re-encode"  # Parameters differ, copy will fall back to re-encode
+    UNKNOWN = "unknown"  # At least one input could not be probed
+
+
+# Stream parameters that must match for the concat demuxer to copy
+_VIDEO_KEYS = ("codec", "profile", "pix_fmt", "width", "height")
+_AUDIO_KEYS = ("codec", "sample_rate", "channels")
+
+
+class GroupPlan:
+    """Planned output of one group."""
+    
+    def __init__(
+        self,
+        index: int,
+        output_name: str,
+        files: List[Path],
+        total_size: int,
+        duration: Optional[float],
+        strategy: PlanStrategy
+    ):
+        self.index = index  # 0-based, as in output names
+        self.output_name = output_name
+        self.files = files
+        self.total_size = total_size
+        self.duration = duration  # Seconds; None if any input could not be probed
+        self.strategy = strategy
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "group": self.index + 1,
+            "output": self.output_name,
+            "file_count": len(self.files),
+            "total_size": self.total_size,
+            "duration": round(self.duration, 3) if self.duration is not None else None,
+            "strategy": self.strategy.value,
+            "files": [str(path) for path in self.files]
+        }
+
+
+def generate_output_filename(pattern: str, group_index: int, file_count: int) -> str:
+    """Generate output filename based on pattern ({group} and {count} placeholders)."""
+    # Replace placeholders
+    filename = pattern.replace("{group}", f"{group_index + 1:03d}")
+    filename = filename.replace("{count}", str(file_count))
+    
+    # Ensure .mp4 extension
+    if not filename.endswith('.mp4'):
+        filename += '.mp4'
+    
+    return filename
+
+
+def _stream_signature(info: Dict[str, Any]) -> tuple:
+    video = info.get("video") or {}
+    audio = info.get("audio") or {}
+    return (
+        tuple(video.get(key) for key in _VIDEO_KEYS),
+        tuple(audio.get(key) for key in _AUDIO_KEYS) if audio else None
+    )
+
+
+def keeps_whole_clips(settings: dict) -> bool:
+    """Check if job settings (see create_worker()) leave the input files unchanged."""
+    trimmed = settings.get("trim_head", 0.0) > 0 or settings.get("trim_tail", 0.0) > 0
+    wrapped = bool(settings.get("intro_path") or settings.get("outro_path"))
+    return not trimmed and not wrapped and not settings.get("loudness_normalization", False)
+
+
+def predict_strategy(
+    files: List[Path],
+    output_name: str,
+    probe: Optional[MediaProbe],
+    whole_clips: bool = True
+) -> PlanStrategy:
+    """
+    Predict how FFmpegConcat will produce a group.
+    
+    Single files are only cloned when whole_clips is True (no trim,
+    loudness normalization or bumpers).
+    """
+    if whole_clips and can_clone(files, Path(output_name), probe):
+        return PlanStrategy.CLONE
+    if probe is None:
+        return PlanStrategy.UNKNOWN
+    
+    signatures = set()
+    for path in files:
+        info = probe.probe(path)
+        if not info:
+            return PlanStrategy.UNKNOWN
+        signatures.add(_stream_signature(info))
+    return PlanStrategy.COPY if len(signatures) == 1 else PlanStrategy.REENCODE
+
+
+def plan_groups(
+    groups: List[List[Path]],
+    output_naming_pattern: str,
+    probe: Optional[MediaProbe] = None,
+    whole_clips: bool = True
+) -> Iterator[GroupPlan]:
+    """
+    Describe each group in order.
+    
+    A generator, so callers can show the first rows while later groups are
+    still being probed. whole_clips is passed to predict_strategy().
+    """
+    for index, group in enumerate(groups):
+        output_name = generate_output_filename(output_naming_pattern, index, len(group))
+        total_size = 0
+        for path in group:
+            try:
+                total_size += path.stat().st_size
+            except OSError:
+                pass
+        
+        duration = 0.0
+        for path in group:
+            file_duration = probe.duration(path) if probe is not None else None
+            if file_duration is None:
+                duration = None
+                break
+            duration += file_duration
+        
+        yield GroupPlan(index, output_name, group, total_size, duration,
+                        predict_strategy(group, output_name, probe, whole_clips))
+
+
+def build_groups(
+    input_dir: Path,
+    settings: dict,
+    fingerprinter: Optional[VideoFingerprinter] = None,
+    progress_callback: Optional[Callable[[str], None]] = None
+) -> tuple:
+    """
+    Group input_dir the way the worker will.
+    
+    Args:
+        input_dir: Folder to scan
+        settings: Job settings dict (see create_worker())
+        fingerprinter: Needed to skip duplicates when settings has a dedup_policy
+        progress_callback: Receives duplicate detection messages
+    
+    Returns:
+        (groups, remainder); with EXPORT_SINGLE the remainder is already
+        appended as the last group
+    """
+    files = scan_video_files(input_dir)
+    dedup_policy = DedupPolicy(settings.get("dedup_policy", DedupPolicy.OFF.value))
+    if fingerprinter is not None and dedup_policy != DedupPolicy.OFF:
+        files, _ = find_duplicates(files, dedup_policy, fingerprinter, progress_callback=progress_callback)
+    remainder_behavior = RemainderBehavior(settings.get("remainder_behavior", RemainderBehavior.IGNORE.value))
+    groups, remainder = group_files(
+        files,
+        settings.get("group_size", 2),
+        SortMode(settings.get("sort_mode", SortMode.FILENAME.value)),
+        remainder_behavior
+    ) if files else ([], [])
+    if remainder and remainder_behavior == RemainderBehavior.EXPORT_SINGLE:
+        groups.append(remainder)
+    return groups, remainder
+
+
+def export_plan_json(plans: List[GroupPlan], path: Path):
+    """Write the plan as a JSON list of groups."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([plan.to_dict() for plan in plans], f, indent=2)
+
+
+def export_plan_csv(plans: List[GroupPlan], path: Path):
+    """Write the plan as CSV, one row per group (files separated by "|")."""
+    columns = ["group", "output", "file_count", "total_size", "duration", "strategy", "files"]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for plan in plans:
+            row = plan.to_dict()
+            row["files"] = "|".join(row["files"])
+            writer.writerow(row)
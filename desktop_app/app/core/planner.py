@@ -0,0 +1,193 @@
+"""Pre-flight disk space planning for a batch."""
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import List, Optional
+from app.core.autotune import EncoderProfile, DEFAULT_ENCODER_PROFILE
+from app.core.ffmpeg_concat import can_clone
+from app.core.probe import MediaProbe
+from app.core.trim import TrimMode, TrimSettings
+
+# Approximate bits per pixel of a CRF encode at the profile's default CRF
+_BITS_PER_PIXEL = {"libx264": 0.10, "libx265": 0.06}
+_AUDIO_BITRATE = 128_000
+
+
+class InsufficientSpaceError(Exception):
+    """Raised when a batch cannot fit on the output or temp filesystem."""
+
+
+class DiskSpacePlanner:
+    """
+    Estimate output sizes and keep a batch from filling the disk.
+
+    Each group is estimated from its input sizes (stream copy) and from a
+    bits-per-pixel model of the re-encode profile; the larger of the two is
+    used since copy falls back to re-encode. plan() refuses up front when
+    the total cannot fit; reserve()/release() then gate each FFmpeg run on
+    the space actually free at that moment, so a batch stops cleanly
+    instead of failing every remaining group after the disk fills up.
+
+    Trimmed clips only count with the part that is kept, bumpers are added
+    to every group and single MP4 files are only counted as clones when
+    nothing changes them. Frame-accurate trims also need temp space for
+    the re-encoded pieces, which are kept until the batch ends.
+    """
+
+    SAFETY_FACTOR = 1.05  # Container overhead and estimate error
+    MIN_FREE_BYTES = 256 * 1024 * 1024  # Never plan to use the last 256 MB
+    TEMP_BYTES_PER_RUN = 1024 * 1024  # Concat lists and other small temp files
+    TRIM_PIECE_SECONDS = 5.0  # Assumed length of a re-encoded partial GOP
+
+    def __init__(
+        self,
+        output_dir: Path,
+        probe: Optional[MediaProbe] = None,
+        encoder_profile: Optional[EncoderProfile] = None,
+        temp_dir: Optional[Path] = None,
+        trim: Optional[TrimSettings] = None,
+        loudness: bool = False,
+        bumpers: Optional[List[Path]] = None
+    ):
+        self.output_dir = output_dir
+        self.probe = probe
+        self.encoder_profile = encoder_profile or DEFAULT_ENCODER_PROFILE
+        self.temp_dir = temp_dir or Path(tempfile.gettempdir())
+        self.trim = trim if trim is not None and trim.enabled else None
+        self.loudness = loudness
+        self.bumpers = bumpers or []
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def free_bytes(path: Path) -> int:
+        """Get free bytes on the filesystem holding path."""
+        return shutil.disk_usage(path).free
+
+    def _reencode_estimate(self, path: Path) -> Optional[int]:
+        if self.probe is None:
+            return None
+        info = self.probe.probe(path)
+        if not info or not info.get("duration"):
+            return None
+        bits_per_second = _AUDIO_BITRATE if info.get("audio") else 0
+        video = info.get("video")
+        if video and video.get("width") and video.get("height"):
+            bpp = _BITS_PER_PIXEL.get(self.encoder_profile.codec, 0.10)
+            bits_per_second += video["width"] * video["height"] * (video.get("fps") or 30) * bpp
+        return int(info["duration"] * bits_per_second / 8)
+
+    def _whole_clips(self) -> bool:
+        return not self.trim and not self.loudness and not self.bumpers
+
+    def _kept_fraction(self, path: Path) -> float:
+        """Part of path that is left after trimming (1.0 if not trimmed or unknown)."""
+        if not self.trim or self.probe is None:
+            return 1.0
+        duration = self.probe.duration(path)
+        if not duration:
+            return 1.0
+        return max(0.0, duration - self.trim.head - self.trim.tail) / duration
+
+    def _file_estimate(self, path: Path) -> int:
+        """Larger of the stream copy and re-encode size of a whole file."""
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        estimate = self._reencode_estimate(path)
+        return max(size, estimate if estimate is not None else size)
+
+    def estimate_group(self, group: List[Path]) -> int:
+        """Estimate the output size of one group in bytes."""
+        # Single MP4 files are cloned: free as a reflink, the file size as a copy
+        if self._whole_clips() and can_clone(group, group[0].with_suffix(".mp4"), self.probe):  # Outputs are always .mp4
+            try:
+                return group[0].stat().st_size
+            except OSError:
+                return 0
+
+        copy_size = 0
+        reencode_size = 0
+        for path in group:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = 0
+            kept = self._kept_fraction(path)
+            copy_size += size * kept
+            estimate = self._reencode_estimate(path)
+            reencode_size += (estimate if estimate is not None else size) * kept
+        # Bumper variants are encoded to the footage, their size is close to the bumper's
+        bumper_size = sum(self._file_estimate(path) for path in self.bumpers)
+        return int((max(copy_size, reencode_size) + bumper_size) * self.SAFETY_FACTOR)
+
+    def estimate_temp(self, group: List[Path]) -> int:
+        """Estimate the temp space a group needs until the batch ends in bytes."""
+        if not self.trim or self.trim.mode != TrimMode.FRAME:
+            return 0
+        total = 0
+        for path in group:
+            duration = self.probe.duration(path) if self.probe is not None else None
+            if not duration:
+                continue
+            # Up to one re-encoded piece at each cut
+            seconds = min(duration, 2 * self.TRIM_PIECE_SECONDS)
+            total += self._file_estimate(path) * seconds / duration
+        return int(total * self.SAFETY_FACTOR)
+
+    def plan(self, groups: List[List[Path]]) -> List[int]:
+        """
+        Estimate every group and check that the batch fits.
+
+        Returns:
+            Estimated output size per group
+
+        Raises:
+            InsufficientSpaceError: if the total cannot fit
+        """
+        estimates = [self.estimate_group(group) for group in groups]
+        total = sum(estimates)
+        available = self.free_bytes(self.output_dir) - self.MIN_FREE_BYTES
+        if total > available:
+            raise InsufficientSpaceError(
+                f"Not enough space in {self.output_dir}: need about {_format_bytes(total)}, "
+                f"{_format_bytes(max(available, 0))} available"
+            )
+
+        temp_needed = self.TEMP_BYTES_PER_RUN + sum(self.estimate_temp(group) for group in groups)
+        temp_available = self.free_bytes(self.temp_dir) - self.MIN_FREE_BYTES
+        if temp_available < temp_needed:
+            raise InsufficientSpaceError(
+                f"Not enough space for temporary files in {self.temp_dir}: need about "
+                f"{_format_bytes(temp_needed)}, {_format_bytes(max(temp_available, 0))} available"
+            )
+        return estimates
+
+    def reserve(self, size: int) -> bool:
+        """
+        Reserve space for a run about to start.
+
+        Returns:
+            False if the output filesystem cannot take size more bytes now
+        """
+        with self._lock:
+            available = self.free_bytes(self.output_dir) - self.MIN_FREE_BYTES - self._reserved
+            if size > available:
+                return False
+            self._reserved += size
+            return True
+
+    def release(self, size: int):
+        """Release a reservation once its run finished (its bytes now show as used)."""
+        with self._lock:
+            self._reserved = max(0, self._reserved - size)
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
@@ -0,0 +1,159 @@
+"""Read-ahead prefetching of upcoming group inputs."""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from app.services.logging_service import logger
+
+
+class PrefetchStats:
+    """Counters for tuning the prefetch lookahead."""
+
+    def __init__(self):
+        self.hits = 0  # Units fully warmed before they started
+        self.partial = 0  # Units partly warmed
+        self.misses = 0  # Units not warmed at all
+        self.bytes_prefetched = 0
+        self.budget_stalls = 0  # Times the memory budget stopped read-ahead
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.partial + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        total = self.hits + self.partial + self.misses
+        return (
+            f"Prefetch: {self.hits}/{total} warm, {self.partial} partial, {self.misses} cold "
+            f"({self.hit_rate:.0%} hit rate), {self.bytes_prefetched / (1024 * 1024):.1f} MB read ahead, "
+            f"{self.budget_stalls} budget stalls"
+        )
+
+
+class GroupPrefetcher:
+    """
+    Warm the OS page cache for the next K units of work.
+
+    A unit is the list of input files one FFmpeg run will read (a group, or a
+    batch of groups). While unit i is being processed, a background thread
+    issues posix_fadvise(WILLNEED) for the files of units i+1..i+K, or reads
+    them sequentially where fadvise is unavailable (Windows). Bytes warmed
+    for units that have not started yet are capped by memory_budget so
+    read-ahead never evicts the working set of the running job.
+    """
+
+    CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, units: List[List[Path]], lookahead: int = 2, memory_budget: int = 512 * 1024 * 1024):
+        self.units = units
+        self.lookahead = lookahead
+        self.memory_budget = memory_budget
+        self.stats = PrefetchStats()
+        self._current = -1
+        self._warmed: Dict[int, Set[Path]] = {}
+        self._unit_bytes: Dict[int, int] = {}
+        self._oversized: Set[Path] = set()  # Files larger than the whole budget
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background prefetch thread."""
+        if self.lookahead <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="GroupPrefetcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop prefetching and wait for the thread to exit."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def advance(self, index: int):
+        """
+        Mark unit index as starting, record whether it was warm, and move the
+        prefetch window to the units after it.
+        """
+        with self._cond:
+            if self.lookahead > 0:
+                files = self.units[index]
+                warmed = self._warmed.get(index, set())
+                if files and all(f in warmed for f in files):
+                    self.stats.hits += 1
+                elif warmed:
+                    self.stats.partial += 1
+                else:
+                    self.stats.misses += 1
+            self._current = index
+            # Units that have started no longer count against the budget
+            for done in [i for i in self._unit_bytes if i <= index]:
+                del self._unit_bytes[done]
+            self._cond.notify_all()
+
+    def _pending_bytes(self) -> int:
+        return sum(self._unit_bytes.values())
+
+    def _next_file(self):
+        """Get (unit index, file) to warm next, or None if nothing to do."""
+        last = min(self._current + self.lookahead, len(self.units) - 1)
+        for index in range(self._current + 1, last + 1):
+            warmed = self._warmed.setdefault(index, set())
+            for path in self.units[index]:
+                if path not in warmed and path not in self._oversized:
+                    return index, path
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    job = self._next_file()
+                    if job is not None:
+                        try:
+                            size = job[1].stat().st_size
+                        except OSError:
+                            size = 0
+                        if size > self.memory_budget:
+                            self._oversized.add(job[1])
+                            continue
+                        if self._pending_bytes() + size <= self.memory_budget:
+                            break
+                        self.stats.budget_stalls += 1
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                index, path = job
+                self._unit_bytes[index] = self._unit_bytes.get(index, 0) + size
+
+            # Warm outside the lock so advance() never blocks on disk I/O
+            warmed_bytes = self._warm_file(path, index)
+            with self._cond:
+                self._warmed.setdefault(index, set()).add(path)
+                self.stats.bytes_prefetched += warmed_bytes
+
+    def _warm_file(self, path: Path, index: int) -> int:
+        """Pull path into the page cache; returns bytes covered."""
+        try:
+            with open(path, 'rb', buffering=0) as f:
+                if hasattr(os, "posix_fadvise"):
+                    size = os.fstat(f.fileno()).st_size
+                    os.posix_fadvise(f.fileno(), 0, size, os.POSIX_FADV_WILLNEED)
+                    return size
+
+                total = 0
+                while True:
+                    # Give up early if the unit started or we were stopped
+                    if self._stopped or self._current >= index:
+                        break
+                    chunk = f.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    total += len(chunk)
+                return total
+        except OSError as e:
+            logger.warning(f"Prefetch of {path.name} failed: {e}")
+            return 0
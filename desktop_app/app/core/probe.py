@@ -0,0 +1,318 @@
+"""Media probing with a persistent per-file cache."""
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from app.services.logging_service import logger
+from app.utils.ffmpeg_helper import find_ffprobe, get_hidden_window_kwargs
+
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_BITRATE_RE = re.compile(r"Duration: .*?bitrate: (\d+) kb/s")
+_INPUT_RE = re.compile(r"Input #0, ([^ ]+), from")
+_VIDEO_RE = re.compile(r"Stream #0:\d+.*?: Video: (\w+)(?: \(([^)]*)\))?.*?, (\w+)(?:\([^)]*\))?, (\d+)x(\d+)")
+_FPS_RE = re.compile(r"([\d.]+) fps")
+_TBN_RE = re.compile(r"(\d+)(k?) tbn")
+_AUDIO_RE = re.compile(r"Stream #0:\d+.*?: Audio: (\w+).*?, (\d+) Hz, ([^,]+)")
+_CHANNELS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "5.1(side)": 6, "7.1": 8}
+_SHA256_RE = re.compile(r"SHA256=([0-9a-f]+)")
+# Bitstream filters keeping only the parameter set NAL units of the first packet
+_PARAMETER_SET_FILTERS = {
+    "h264": "h264_mp4toannexb,filter_units=pass_types=7-8",
+    "hevc": "hevc_mp4toannexb,filter_units=pass_types=32-34"
+}
+PARAMETER_SETS_EXTRA = "parameter_sets"  # get_extra() key
+
+
+def _parse_rate(value: Optional[str]) -> Optional[float]:
+    """Parse an FFmpeg rational like "30000/1001"."""
+    if not value:
+        return None
+    try:
+        if "/" in value:
+            num, den = value.split("/", 1)
+            return float(num) / float(den) if float(den) else None
+        return float(value)
+    except ValueError:
+        return None
+
+
+class MediaProbe:
+    """
+    Read duration and stream parameters of media files.
+
+    Uses ffprobe when it is available next to FFmpeg or in PATH, and falls
+    back to parsing "ffmpeg -i" output otherwise. Results are cached per
+    (path, size, mtime) in memory and, if cache_file is given, on disk, so a
+    file is probed once across runs. Other stages can attach their own
+    per-file measurements (e.g. loudness) with get_extra()/set_extra().
+    """
+
+    MAX_ENTRIES = 50000
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, cache_file: Optional[Path] = None):
+        self.ffmpeg_path = ffmpeg_path or "ffmpeg"
+        self.ffprobe_path = find_ffprobe(ffmpeg_path)
+        self.cache_file = cache_file
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self._cache = self._read_file()
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        if not self.cache_file or not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def save(self):
+        """
+        Persist the cache (no-op if nothing changed).
+
+        Other instances (parallel jobs, the plan preview) save the same
+        file, so entries written since it was loaded are merged in rather
+        than overwritten, and each save writes its own temp file.
+        """
+        if not self.cache_file:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+        on_disk = self._read_file()
+        with self._lock:
+            for key, saved in on_disk.items():
+                entry = self._cache.setdefault(key, saved)
+                if entry is not saved and isinstance(saved, dict):
+                    for name, value in saved.items():
+                        entry.setdefault(name, value)  # Our measurements win
+            if len(self._cache) > self.MAX_ENTRIES:
+                # Keep the most recently added half (stale path|size|mtime keys go first)
+                self._cache = dict(list(self._cache.items())[-(self.MAX_ENTRIES // 2):])
+            data = json.dumps(self._cache)
+            self._dirty = False
+        tmp_file = None
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                prefix=f"{self.cache_file.stem}.", suffix=".tmp", dir=self.cache_file.parent
+            )
+            tmp_file = Path(tmp_name)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not save probe cache: {e}")
+            if tmp_file is not None:
+                tmp_file.unlink(missing_ok=True)
+
+    @staticmethod
+    def _key(path: Path) -> Optional[str]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+
+    def _entry(self, path: Path) -> Optional[Dict[str, Any]]:
+        key = self._key(path)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                entry = self._cache[key] = {}
+        return entry
+
+    def probe(self, path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Get media info for path.
+
+        Returns:
+            Dict with "duration", "bit_rate", "format", "video" and "audio"
+            (stream dicts or None), or None if the file cannot be read
+        """
+        entry = self._entry(path)
+        if entry is None:
+            return None
+        if "info" in entry:
+            return entry["info"]
+
+        info = self._probe_ffprobe(path) if self.ffprobe_path else None
+        if info is None:
+            info = self._probe_ffmpeg(path)
+        if info is None:
+            return None
+        with self._lock:
+            entry["info"] = info
+            self._dirty = True
+        return info
+
+    def duration(self, path: Path) -> Optional[float]:
+        """Get duration of path in seconds."""
+        info = self.probe(path)
+        return info.get("duration") if info else None
+
+    def get_extra(self, path: Path, name: str) -> Any:
+        """Get a cached per-file measurement stored by another stage."""
+        entry = self._entry(path)
+        return entry.get(name) if entry is not None else None
+
+    def set_extra(self, path: Path, name: str, value: Any):
+        """Cache a per-file measurement (invalidated when the file changes)."""
+        entry = self._entry(path)
+        if entry is None:
+            return
+        with self._lock:
+            entry[name] = value
+            self._dirty = True
+
+    def parameter_sets(self, path: Path, cache: bool = True) -> Optional[str]:
+        """
+        Digest of the video parameter sets (H.264 SPS/PPS, HEVC VPS/SPS/PPS).
+
+        An MP4 made by stream-copying several files keeps the avcC/hvcC of
+        the first one only, so files can be joined without re-encoding only
+        if their digests are equal. Returns None for other codecs or if the
+        file cannot be read. Temporary files should pass cache=False.
+        """
+        if cache:
+            cached = self.get_extra(path, PARAMETER_SETS_EXTRA)
+            if cached is not None:
+                return cached
+        info = self.probe(path) if cache else self._probe_ffmpeg(path)
+        video = info.get("video") if info else None
+        bsf = _PARAMETER_SET_FILTERS.get(video.get("codec")) if video else None
+        if bsf is None:
+            return None
+        result = self._run([
+            self.ffmpeg_path,
+            "-hide_banner", "-v", "error",
+            "-i", str(path),
+            "-map", "0:v:0",
+            "-c", "copy",
+            "-bsf:v", bsf,
+            "-frames:v", "1",
+            "-f", "hash", "-hash", "sha256", "-"
+        ])
+        match = _SHA256_RE.search(result.stdout) if result is not None and result.returncode == 0 else None
+        if match is None:
+            return None
+        if cache:
+            self.set_extra(path, PARAMETER_SETS_EXTRA, match.group(1))
+        return match.group(1)
+
+    def _run(self, cmd) -> Optional[subprocess.CompletedProcess]:
+        try:
+            return subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                timeout=60,
+                **get_hidden_window_kwargs()
+            )
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.error(f"Probe failed: {e}")
+            return None
+
+    def _probe_ffprobe(self, path: Path) -> Optional[Dict[str, Any]]:
+        result = self._run([
+            self.ffprobe_path,
+            "-v", "error",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            str(path)
+        ])
+        if result is None or result.returncode != 0:
+            return None
+        try:
+            data = json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return None
+
+        fmt = data.get("format", {})
+        info = {
+            "duration": float(fmt["duration"]) if fmt.get("duration") else None,
+            "bit_rate": int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+            "format": fmt.get("format_name"),
+            "video": None,
+            "audio": None
+        }
+        for stream in data.get("streams", []):
+            codec_type = stream.get("codec_type")
+            if codec_type == "video" and info["video"] is None:
+                info["video"] = {
+                    "codec": stream.get("codec_name"),
+                    "profile": stream.get("profile"),
+                    "pix_fmt": stream.get("pix_fmt"),
+                    "width": stream.get("width"),
+                    "height": stream.get("height"),
+                    "fps": _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate")),
+                    "time_base": stream.get("time_base")
+                }
+            elif codec_type == "audio" and info["audio"] is None:
+                info["audio"] = {
+                    "codec": stream.get("codec_name"),
+                    "profile": stream.get("profile"),
+                    "sample_rate": int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+                    "channels": stream.get("channels")
+                }
+        return info
+
+    def _probe_ffmpeg(self, path: Path) -> Optional[Dict[str, Any]]:
+        result = self._run([self.ffmpeg_path, "-hide_banner", "-i", str(path)])
+        if result is None:
+            return None
+        text = result.stderr
+        match = _DURATION_RE.search(text)
+        if not match:
+            return None
+
+        hours, minutes, seconds = match.groups()
+        bitrate = _BITRATE_RE.search(text)
+        fmt = _INPUT_RE.search(text)
+        info = {
+            "duration": int(hours) * 3600 + int(minutes) * 60 + float(seconds),
+            "bit_rate": int(bitrate.group(1)) * 1000 if bitrate else None,
+            "format": fmt.group(1).rstrip(",") if fmt else None,
+            "video": None,
+            "audio": None
+        }
+
+        video = _VIDEO_RE.search(text)
+        if video:
+            line = text[video.start():text.find("\n", video.start())]
+            fps = _FPS_RE.search(line)
+            tbn = _TBN_RE.search(line)
+            info["video"] = {
+                "codec": video.group(1),
+                "profile": video.group(2),
+                "pix_fmt": video.group(3),
+                "width": int(video.group(4)),
+                "height": int(video.group(5)),
+                "fps": float(fps.group(1)) if fps else None,
+                "time_base": f"1/{int(tbn.group(1)) * (1000 if tbn.group(2) else 1)}" if tbn else None
+            }
+
+        audio = _AUDIO_RE.search(text)
+        if audio:
+            layout = audio.group(3).strip()
+            info["audio"] = {
+                "codec": audio.group(1),
+                "profile": None,
+                "sample_rate": int(audio.group(2)),
+                "channels": _CHANNELS.get(layout)
+            }
+        return info
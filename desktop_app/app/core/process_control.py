@@ -0,0 +1,224 @@
+"""Control of live FFmpeg child processes (pause, resume, priority, cancel)."""
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Set
+from app.services.logging_service import logger
+from app.utils.ffmpeg_helper import get_hidden_window_kwargs
+
+try:
+    import psutil  # In requirements.txt; needed for IO priority
+except ImportError:
+    psutil = None
+
+if sys.platform == 'win32':
+    import ctypes
+    _PROCESS_SUSPEND_RESUME = 0x0800
+    _PROCESS_SET_INFORMATION = 0x0200
+    _NORMAL_PRIORITY_CLASS = 0x00000020
+    _IDLE_PRIORITY_CLASS = 0x00000040
+
+BACKGROUND_NICE = 10
+
+_psutil_warned = False
+
+
+class ProcessCancelled(Exception):
+    """Raised by FFmpegProcessGroup.run() when the group was cancelled."""
+
+
+class FFmpegProcessGroup:
+    """
+    Track the FFmpeg processes of one batch so they can be controlled together.
+
+    - pause()/resume() suspend and continue every live process (SIGSTOP/SIGCONT
+      on POSIX, NtSuspendProcess/NtResumeProcess on Windows) without losing work
+    - set_background() lowers CPU and IO scheduling priority of live and future
+      processes; turning it off restores normal priority where the OS allows it
+      (unprivileged POSIX processes cannot lower their nice value again, so
+      already running jobs keep the lower priority until they finish)
+    - cancel() terminates everything and makes further run() calls fail fast
+    Time spent paused does not count against run() timeouts.
+    """
+
+    def __init__(self, background: bool = False):
+        self._procs: Set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+        self._paused = False
+        self._background = background
+        self._cancelled = False
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def background(self) -> bool:
+        return self._background
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self, cmd: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run cmd like subprocess.run(capture_output=True, text=True).
+
+        Raises:
+            subprocess.TimeoutExpired: if the process ran (unpaused) longer than timeout
+            ProcessCancelled: if the group is or gets cancelled
+        """
+        with self._lock:
+            if self._cancelled:
+                raise ProcessCancelled()
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                **get_hidden_window_kwargs()
+            )
+            self._procs.add(proc)
+            if self._background:
+                self._apply_priority(proc, True)
+            if self._paused:
+                self._suspend(proc)
+
+        try:
+            active = 0.0
+            while True:
+                started = time.monotonic()
+                try:
+                    stdout, stderr = proc.communicate(timeout=1.0)
+                    break
+                except subprocess.TimeoutExpired:
+                    if not self._paused:
+                        active += time.monotonic() - started
+                    if timeout is not None and active > timeout:
+                        proc.kill()
+                        proc.communicate()
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+        finally:
+            with self._lock:
+                self._procs.discard(proc)
+
+        if self._cancelled:
+            raise ProcessCancelled()
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+    def pause(self):
+        """Suspend all live processes; new ones start suspended."""
+        with self._lock:
+            if self._paused:
+                return
+            self._paused = True
+            for proc in self._procs:
+                self._suspend(proc)
+        logger.info("FFmpeg processes paused")
+
+    def resume(self):
+        """Continue all suspended processes."""
+        with self._lock:
+            if not self._paused:
+                return
+            self._paused = False
+            for proc in self._procs:
+                self._resume(proc)
+        logger.info("FFmpeg processes resumed")
+
+    def set_background(self, enabled: bool):
+        """Switch background (low CPU/IO priority) mode for live and future processes."""
+        with self._lock:
+            self._background = enabled
+            for proc in self._procs:
+                self._apply_priority(proc, enabled)
+        logger.info(f"Background priority {'on' if enabled else 'off'}")
+
+    def cancel(self):
+        """Terminate all live processes and refuse new ones."""
+        with self._lock:
+            self._cancelled = True
+            procs = list(self._procs)
+        for proc in procs:
+            try:
+                if self._paused:
+                    self._resume(proc)  # A stopped process cannot handle SIGTERM
+                proc.terminate()
+            except OSError:
+                pass
+
+    # Platform helpers (called with the lock held or on a private process)
+
+    def _suspend(self, proc: subprocess.Popen):
+        try:
+            if sys.platform == 'win32':
+                if psutil is not None:
+                    psutil.Process(proc.pid).suspend()
+                else:
+                    self._nt_call(proc, "NtSuspendProcess")
+            else:
+                os.kill(proc.pid, signal.SIGSTOP)
+        except Exception as e:
+            logger.warning(f"Could not suspend FFmpeg (pid {proc.pid}): {e}")
+
+    def _resume(self, proc: subprocess.Popen):
+        try:
+            if sys.platform == 'win32':
+                if psutil is not None:
+                    psutil.Process(proc.pid).resume()
+                else:
+                    self._nt_call(proc, "NtResumeProcess")
+            else:
+                os.kill(proc.pid, signal.SIGCONT)
+        except Exception as e:
+            logger.warning(f"Could not resume FFmpeg (pid {proc.pid}): {e}")
+
+    @staticmethod
+    def _nt_call(proc: subprocess.Popen, function: str):
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(_PROCESS_SUSPEND_RESUME, False, proc.pid)
+        if not handle:
+            raise OSError(f"OpenProcess failed for pid {proc.pid}")
+        try:
+            getattr(ctypes.windll.ntdll, function)(handle)
+        finally:
+            kernel32.CloseHandle(handle)
+
+    def _apply_priority(self, proc: subprocess.Popen, background: bool):
+        # CPU priority
+        try:
+            if sys.platform == 'win32':
+                priority_class = _IDLE_PRIORITY_CLASS if background else _NORMAL_PRIORITY_CLASS
+                if psutil is not None:
+                    psutil.Process(proc.pid).nice(priority_class)
+                else:
+                    handle = ctypes.windll.kernel32.OpenProcess(_PROCESS_SET_INFORMATION, False, proc.pid)
+                    if handle:
+                        ctypes.windll.kernel32.SetPriorityClass(handle, priority_class)
+                        ctypes.windll.kernel32.CloseHandle(handle)
+            else:
+                os.setpriority(os.PRIO_PROCESS, proc.pid, BACKGROUND_NICE if background else 0)
+        except Exception as e:
+            logger.info(f"Could not change CPU priority of FFmpeg (pid {proc.pid}): {e}")
+
+        # IO priority (psutil only)
+        if psutil is None:
+            global _psutil_warned
+            if background and not _psutil_warned:
+                _psutil_warned = True
+                logger.warning("psutil is not installed: FFmpeg runs at low CPU priority but normal IO priority")
+            return
+        try:
+            process = psutil.Process(proc.pid)
+            if sys.platform == 'win32':
+                process.ionice(psutil.IOPRIO_VERYLOW if background else psutil.IOPRIO_NORMAL)
+            elif hasattr(psutil, "IOPRIO_CLASS_IDLE"):
+                process.ionice(psutil.IOPRIO_CLASS_IDLE if background else psutil.IOPRIO_CLASS_BE)
+        except Exception as e:
+            logger.info(f"Could not change IO priority of FFmpeg (pid {proc.pid}): {e}")
@@ -0,0 +1,94 @@
+"""Execution order policies for video groups."""
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional, Tuple
+from app.core.probe import MediaProbe
+
+
+class SchedulePolicy(Enum):
+    """Order in which groups are processed."""
+    INDEX = "index"
+    SHORTEST_FIRST = "shortest_first"  # Best mean time-to-first-output
+    LONGEST_FIRST = "longest_first"  # Best makespan when running concurrently
+    PRIORITY = "priority"  # User-pinned groups first, then index order
+
+
+def estimate_costs(groups: List[List[Path]], probe: Optional[MediaProbe] = None) -> List[float]:
+    """
+    Estimate the processing cost of each group.
+
+    Uses total duration when every group could be probed, otherwise total
+    input size, so all groups are compared on the same basis.
+    """
+    if probe is not None:
+        durations = []
+        for group in groups:
+            total = 0.0
+            for path in group:
+                duration = probe.duration(path)
+                if duration is None:
+                    break
+                total += duration
+            else:
+                durations.append(total)
+                continue
+            break
+        if len(durations) == len(groups):
+            return durations
+
+    sizes = []
+    for group in groups:
+        total = 0
+        for path in group:
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        sizes.append(float(total))
+    return sizes
+
+
+def order_groups(
+    groups: List[List[Path]],
+    policy: SchedulePolicy,
+    costs: Optional[List[float]] = None,
+    pinned: Optional[List[int]] = None
+) -> List[Tuple[int, List[Path]]]:
+    """
+    Order groups for execution.
+
+    Args:
+        groups: Groups in plan order
+        policy: Scheduling policy
+        costs: Per-group cost estimates (required for SHORTEST/LONGEST_FIRST)
+        pinned: 1-based group numbers to run first (PRIORITY), in the given order
+
+    Returns:
+        (original_index, group) pairs in execution order. The original index
+        is what output naming must use.
+    """
+    indexed = list(enumerate(groups))
+    if policy == SchedulePolicy.SHORTEST_FIRST and costs:
+        return sorted(indexed, key=lambda item: (costs[item[0]], item[0]))
+    elif policy == SchedulePolicy.LONGEST_FIRST and costs:
+        return sorted(indexed, key=lambda item: (-costs[item[0]], item[0]))
+    elif policy == SchedulePolicy.PRIORITY and pinned:
+        first = []
+        for number in pinned:
+            index = number - 1
+            if 0 <= index < len(groups) and index not in first:
+                first.append(index)
+        rest = [i for i in range(len(groups)) if i not in first]
+        return [indexed[i] for i in first + rest]
+    else:
+        return indexed
+
+
+def parse_pinned_groups(text: str) -> List[int]:
+    """Parse "3, 7, 1" (1-based group numbers) into a list; invalid entries are ignored."""
+    numbers = []
+    for part in text.replace(";", ",").split(","):
+        part = part.strip()
+        if part.isdigit() and int(part) > 0:
+            numbers.append(int(part))
+    return numbers
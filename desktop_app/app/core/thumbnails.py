@@ -0,0 +1,412 @@
+"""Video thumbnails: cached keyframe grabs on a low-priority thread pool."""
+import hashlib
+import heapq
+import itertools
+import os
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.probe import MediaProbe
+from app.core.process_control import FFmpegProcessGroup, ProcessCancelled
+from app.services.logging_service import logger
+
+
+ThumbnailCallback = Callable[[Path, float, Optional[Path]], None]
+CONTACT_SHEET = -1.0  # Timestamp requesting a contact sheet of the whole video
+
+
+def content_key(path: Path) -> Optional[str]:
+    """
+    Identify a file by its content without reading all of it.
+    
+    Hashes the size plus 64 KB from the start, middle and end, so renamed
+    or copied files share thumbnails and rewritten ones get new ones.
+    """
+    sample = 64 * 1024
+    try:
+        size = path.stat().st_size
+        digest = hashlib.sha1(str(size).encode())
+        with open(path, "rb") as f:
+            for offset in (0, max(0, size // 2 - sample // 2), max(0, size - sample)):
+                f.seek(offset)
+                digest.update(f.read(sample))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class ThumbnailCache:
+    """
+    On-disk JPEG cache keyed by (file content, timestamp, width).
+    
+    A hit refreshes the file's mtime, so eviction by oldest mtime is
+    least-recently-used. The cache is trimmed to 90% of max_bytes whenever
+    a new thumbnail pushes it over the limit. Keys whose grab failed (not
+    a video, unreadable, no frame at that time) are remembered in memory,
+    so they are not grabbed again while the file is unchanged.
+    """
+    
+    MAX_FAILED = 5000
+    
+    def __init__(self, cache_dir: Path, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._content_keys: Dict[Tuple[str, int, int], str] = {}  # (path, size, mtime_ns) -> content key
+        self._total_bytes = sum(entry.stat().st_size for entry in self.cache_dir.glob("*.jpg"))
+        self._failed: "OrderedDict[str, None]" = OrderedDict()
+    
+    def key(self, path: Path, timestamp: float, width: int) -> Optional[str]:
+        """Cache key of a thumbnail, or None if path cannot be read."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        stat_key = (str(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            content = self._content_keys.get(stat_key)
+        if content is None:
+            content = content_key(path)
+            if content is None:
+                return None
+            with self._lock:
+                self._content_keys[stat_key] = content
+        when = "sheet" if timestamp == CONTACT_SHEET else int(timestamp * 1000)
+        return f"{content}_{when}_{width}"
+    
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.jpg"
+    
+    def get(self, key: str) -> Optional[Path]:
+        """Get the cached thumbnail for key, marking it recently used."""
+        image = self.path_for(key)
+        try:
+            os.utime(image)
+        except OSError:
+            return None
+        return image
+    
+    def is_failed(self, key: str) -> bool:
+        """Check if the grab for key failed before."""
+        with self._lock:
+            return key in self._failed
+    
+    def mark_failed(self, key: str):
+        """Remember that key cannot be grabbed."""
+        with self._lock:
+            self._failed[key] = None
+            while len(self._failed) > self.MAX_FAILED:
+                self._failed.popitem(last=False)
+    
+    def added(self, key: str):
+        """Account for a thumbnail just written to path_for(key)."""
+        try:
+            size = self.path_for(key).stat().st_size
+        except OSError:
+            return
+        with self._lock:
+            self._total_bytes += size
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self._evict()
+    
+    def _evict(self):
+        entries = []
+        for image in self.cache_dir.glob("*.jpg"):
+            try:
+                st = image.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, image))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, image in entries:
+            if total <= target:
+                break
+            try:
+                image.unlink()
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._total_bytes = total
+
+
+class ThumbnailService:
+    """
+    Grab video frames with FFmpeg in the background.
+    
+    Requests go into a bounded priority queue (lower priority value first,
+    newest first among equals, so rows the user just scrolled to win) and
+    are served by a few daemon threads. FFmpeg seeks to the keyframe
+    before the timestamp and outputs it without decoding up to the exact
+    time, runs single-threaded
+    at background CPU/IO priority, and while throttled (e.g. during a
+    batch) only one grab runs at a time. Identical requests share one grab.
+    
+    The timestamp CONTACT_SHEET asks for a grid of SHEET_COLUMNS x
+    SHEET_ROWS small frames spread over the whole video, made from cached
+    grabs and tiled by FFmpeg; it is cached like a thumbnail. Requests
+    that failed are answered with None and reported by failed().
+    """
+    
+    MAX_PENDING = 500  # Oldest low-priority requests are dropped beyond this
+    SHEET_COLUMNS = 4
+    SHEET_ROWS = 3
+    SHEET_FRAME_WIDTH = 160
+    
+    def __init__(
+        self,
+        ffmpeg_path: str,
+        cache: ThumbnailCache,
+        workers: int = 2,
+        width: int = 240,
+        probe: Optional[MediaProbe] = None
+    ):
+        self.ffmpeg_path = ffmpeg_path
+        self.cache = cache
+        self.width = width
+        self.probe = probe or MediaProbe(ffmpeg_path)  # Durations for contact sheets
+        self.processes = FFmpegProcessGroup(background=True)
+        self._lock = threading.Condition()
+        self._queue: List[tuple] = []  # heap of (priority, -sequence, key)
+        self._requests: Dict[Tuple[str, float], Tuple[Path, float, List[ThumbnailCallback]]] = {}
+        self._sequence = itertools.count()
+        self._active = 0
+        self._in_progress = set()
+        self._failed_requests = set()  # Request ids answered with None because the grab failed
+        self._throttled = False
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"Thumbnail-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def cached(self, path: Path, timestamp: float) -> Optional[Path]:
+        """Get a thumbnail only if it is already cached (no FFmpeg; reads a little of path)."""
+        width = self.SHEET_FRAME_WIDTH if timestamp == CONTACT_SHEET else self.width
+        key = self.cache.key(path, timestamp, width)
+        return self.cache.get(key) if key else None
+    
+    def request(self, path: Path, timestamp: float, callback: ThumbnailCallback, priority: int = 0):
+        """
+        Get a thumbnail in the background.
+        
+        Nothing is read on the calling thread. callback(path, timestamp,
+        image or None) is called from a pool thread with the cached or
+        newly grabbed image.
+        """
+        request_id = (str(path), timestamp)
+        dropped = None
+        with self._lock:
+            if self._stopped:
+                return
+            if request_id in self._requests:
+                self._requests[request_id][2].append(callback)
+            else:
+                self._requests[request_id] = (path, timestamp, [callback])
+            heapq.heappush(self._queue, (priority, -next(self._sequence), request_id))
+            if len(self._queue) > self.MAX_PENDING:
+                dropped = self._drop_oldest()
+            self._lock.notify()
+        
+        # Dropped requests are answered with None so callers may ask again
+        if dropped is not None:
+            for dropped_callback in dropped[2]:
+                dropped_callback(dropped[0], dropped[1], None)
+    
+    def failed(self, path: Path, timestamp: float) -> bool:
+        """Check if a request was answered with None because its grab failed (not dropped or cancelled)."""
+        with self._lock:
+            return (str(path), timestamp) in self._failed_requests
+    
+    def set_throttled(self, throttled: bool):
+        """Run at most one grab at a time (e.g. while concat jobs run)."""
+        with self._lock:
+            self._throttled = throttled
+            self._lock.notify_all()
+    
+    def stop(self):
+        """Drop pending requests and stop running grabs."""
+        with self._lock:
+            self._stopped = True
+            self._queue.clear()
+            self._requests.clear()
+            self._lock.notify_all()
+        self.processes.cancel()
+    
+    def _drop_oldest(self) -> Optional[Tuple[Path, float, List[ThumbnailCallback]]]:
+        # The largest entry is the lowest priority and, among those, the oldest
+        victim = max(self._queue)
+        self._queue.remove(victim)
+        heapq.heapify(self._queue)
+        request_id = victim[2]
+        if request_id in self._in_progress or any(entry[2] == request_id for entry in self._queue):
+            return None
+        return self._requests.pop(request_id, None)
+    
+    def _next(self) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            while True:
+                if self._stopped:
+                    return None
+                limit = 1 if self._throttled else len(self._threads)
+                if self._queue and self._active < limit:
+                    _, _, request_id = heapq.heappop(self._queue)
+                    # Stale entry, or the same frame is being grabbed already
+                    if request_id in self._requests and request_id not in self._in_progress:
+                        self._active += 1
+                        self._in_progress.add(request_id)
+                        return request_id
+                    continue
+                self._lock.wait(1.0)
+    
+    def _run(self):
+        while True:
+            request_id = self._next()
+            if request_id is None:
+                return
+            path, timestamp = Path(request_id[0]), request_id[1]
+            failed = False
+            try:
+                if timestamp == CONTACT_SHEET:
+                    image, failed = self._load_sheet(path)
+                else:
+                    image, failed = self._load(path, timestamp, self.width)
+            except Exception as e:
+                logger.error(f"Thumbnail error for {path.name}: {e}")
+                image = None
+            finally:
+                with self._lock:
+                    if failed:
+                        self._failed_requests.add(request_id)
+                    self._active -= 1
+                    self._in_progress.discard(request_id)
+                    request = self._requests.pop(request_id, None)
+                    self._lock.notify()
+            if request is None:
+                continue
+            for callback in request[2]:
+                try:
+                    callback(path, timestamp, image)
+                except Exception as e:
+                    logger.error(f"Thumbnail callback error: {e}")
+    
+    def _load(self, path: Path, timestamp: float, width: int) -> Tuple[Optional[Path], bool]:
+        """
+        Get the thumbnail from the cache or grab it with FFmpeg.
+        
+        Returns:
+            (image or None, True if the grab failed and was remembered)
+        """
+        key = self.cache.key(path, timestamp, width)
+        if key is None:
+            return None, False  # Not there (yet): may be asked again
+        image = self.cache.get(key)
+        if image is not None:
+            return image, False
+        if self.cache.is_failed(key):
+            return None, True
+        
+        image = self.cache.path_for(key)
+        temp = image.with_suffix(".part")
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner", "-v", "error",
+            "-threads", "1",
+            "-ss", f"{max(0.0, timestamp):.3f}",
+            "-noaccurate_seek",  # Output the keyframe at or before the timestamp, decode nothing else
+            "-i", str(path),
+            "-frames:v", "1",
+            "-vf", f"scale={width}:-2",
+            "-q:v", "5",
+            "-f", "image2",
+            "-y", str(temp)
+        ]
+        try:
+            result = self.processes.run(cmd, timeout=30)
+        except (ProcessCancelled, subprocess.TimeoutExpired, OSError) as e:
+            logger.info(f"Thumbnail of {path.name} at {timestamp:.1f}s not created: {e.__class__.__name__}")
+            temp.unlink(missing_ok=True)
+            return None, False
+        if result.returncode != 0 or not temp.exists() or temp.stat().st_size == 0:
+            temp.unlink(missing_ok=True)
+            self.cache.mark_failed(key)
+            return None, True
+        os.replace(temp, image)
+        self.cache.added(key)
+        return image, False
+    
+    def _load_sheet(self, path: Path) -> Tuple[Optional[Path], bool]:
+        """Get the contact sheet of path from the cache or build it from frame grabs."""
+        key = self.cache.key(path, CONTACT_SHEET, self.SHEET_FRAME_WIDTH)
+        if key is None:
+            return None, False
+        image = self.cache.get(key)
+        if image is not None:
+            return image, False
+        if self.cache.is_failed(key):
+            return None, True
+        duration = self.probe.duration(path)
+        if not duration:
+            self.cache.mark_failed(key)
+            return None, True
+        
+        count = self.SHEET_COLUMNS * self.SHEET_ROWS
+        frames = []
+        for n in range(count):
+            frame, failed = self._load(path, round((n + 0.5) * duration / count, 1), self.SHEET_FRAME_WIDTH)
+            if frame is None and not failed:
+                return None, False  # Cancelled or gone: try again next time
+            if frame is not None:
+                frames.append(frame)
+        if not frames:
+            self.cache.mark_failed(key)
+            return None, True
+        
+        image = self.cache.path_for(key)
+        temp = image.with_suffix(".part")
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            list_file = Path(f.name)
+            for frame in frames:
+                f.write(f"file '{frame.as_posix()}'\n")
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner", "-v", "error",
+            "-f", "concat", "-safe", "0", "-i", str(list_file),
+            "-vf", f"tile={self.SHEET_COLUMNS}x{self.SHEET_ROWS}:padding=2",
+            "-frames:v", "1",
+            "-q:v", "5",
+            "-f", "image2",
+            "-y", str(temp)
+        ]
+        try:
+            result = self.processes.run(cmd, timeout=30)
+        except (ProcessCancelled, subprocess.TimeoutExpired, OSError) as e:
+            logger.info(f"Contact sheet of {path.name} not created: {e.__class__.__name__}")
+            temp.unlink(missing_ok=True)
+            return None, False
+        finally:
+            list_file.unlink(missing_ok=True)
+        if result.returncode != 0 or not temp.exists() or temp.stat().st_size == 0:
+            logger.warning(f"Contact sheet of {path.name} failed: {result.stderr.strip()}")
+            temp.unlink(missing_ok=True)
+            self.cache.mark_failed(key)
+            return None, True
+        os.replace(temp, image)
+        self.cache.added(key)
+        return image, False
+
+
+def thumbnail_timestamp(duration: Optional[float]) -> float:
+    """Representative frame time: 10% in, skipping intros and black leaders."""
+    if not duration:
+        return 1.0
+    return min(duration * 0.1, max(0.0, duration - 0.5))
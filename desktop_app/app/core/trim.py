@@ -0,0 +1,440 @@
+"""Head/tail trimming of input clips with keyframe-snapped smart cuts."""
+import itertools
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.probe import MediaProbe
+from app.core.process_control import FFmpegProcessGroup, ProcessCancelled
+from app.services.logging_service import logger
+
+
+class TrimMode(Enum):
+    """How cuts between keyframes are handled."""
+    KEYFRAME = "keyframe"  # Snap inwards to keyframes, copy everything (up to a GOP more is cut)
+    FRAME = "frame"  # Exact cuts: re-encode the partial GOPs at both ends, copy the rest
+
+
+KEYFRAMES_EXTRA = "keyframes"  # MediaProbe.set_extra() key
+KEYFRAME_SCAN_WINDOW = 30.0  # Seconds scanned around a cut point for keyframes
+_TB_RE = re.compile(r"^#tb 0: (\d+)/(\d+)", re.M)
+_PACKET_RE = re.compile(r"^0,\s*(-?\d+),\s*(-?\d+),[^\n]*?(?:F=0x([0-9A-Fa-f]+))?\s*$", re.M)
+
+# Encoders that can re-encode partial GOPs in the codec of the copied part. The
+# pieces are only stream-copied when their parameter sets match too (see _encode_piece)
+_SMART_CUT_ENCODERS = {"h264": "libx264", "hevc": "libx265"}
+_AUDIO_ENCODERS = {"aac": "aac", "mp3": "libmp3lame", "opus": "libopus", "ac3": "ac3"}
+
+Keyframe = Tuple[float, float]  # (pts, dts) in seconds
+
+
+def matching_encode_args(info: dict) -> Optional[List[str]]:
+    """
+    Encoder arguments producing streams that can be stream-copied together
+    with the file described by info (probe result).
+    
+    Codec, profile, pixel format, frame rate and time base of the video and
+    codec, sample rate and channels of the audio are matched. Returns None
+    if the video codec cannot be encoded that way.
+    """
+    video = info.get("video") or {}
+    encoder = _SMART_CUT_ENCODERS.get(video.get("codec"))
+    if encoder is None:
+        return None
+    args = ["-c:v", encoder, "-crf", "16"]
+    profile = (video.get("profile") or "").lower().replace("constrained ", "")
+    if encoder == "libx264" and profile in ("baseline", "main", "high"):
+        args += ["-profile:v", profile]
+    if video.get("pix_fmt"):
+        args += ["-pix_fmt", video["pix_fmt"]]
+    if video.get("fps"):
+        args += ["-r", f"{video['fps']:.6f}"]
+    time_base = video.get("time_base") or ""
+    if time_base.startswith("1/"):
+        args += ["-video_track_timescale", time_base[2:]]
+    audio = info.get("audio")
+    if audio:
+        args += ["-c:a", _AUDIO_ENCODERS.get(audio.get("codec"), "aac")]
+        if audio.get("sample_rate"):
+            args += ["-ar", str(audio["sample_rate"])]
+        if audio.get("channels"):
+            args += ["-ac", str(audio["channels"])]
+    return args
+
+
+class TrimSettings:
+    """Seconds cut from the start and end of every clip."""
+    
+    def __init__(self, head: float = 0.0, tail: float = 0.0, mode: TrimMode = TrimMode.KEYFRAME):
+        self.head = max(0.0, head)
+        self.tail = max(0.0, tail)
+        self.mode = mode
+    
+    @property
+    def enabled(self) -> bool:
+        return self.head > 0 or self.tail > 0
+    
+    def fingerprint(self) -> str:
+        """Identify the trim settings (part of the output cache key)."""
+        return f"trim-v1:{self.head:.3f}:{self.tail:.3f}:{self.mode.value}"
+
+
+class ClipTrim:
+    """
+    How one clip is cut.
+    
+    The kept part [start, end) is an optional re-encoded head piece, the
+    stream-copied GOPs [copy_start, copy_end) and an optional re-encoded
+    tail piece. copy_safe is False if a piece does not carry the clip's
+    parameter sets, so the group can only be joined by re-encoding it.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        start: float,
+        end: float,
+        copy_start: Optional[Keyframe] = None,
+        copy_end: Optional[Keyframe] = None,
+        head_piece: Optional[Path] = None,
+        tail_piece: Optional[Path] = None,
+        copy_safe: bool = True
+    ):
+        self.path = path
+        self.start = start  # Seconds of the clip that are kept
+        self.end = end
+        self.copy_start = copy_start  # Keyframe the copied part starts at (None = nothing copied)
+        self.copy_end = copy_end  # Keyframe it stops before (None = end of file)
+        self.head_piece = head_piece  # Re-encoded [start, copy_start)
+        self.tail_piece = tail_piece  # Re-encoded [copy_end, end)
+        self.copy_safe = copy_safe
+    
+    @property
+    def copied_seconds(self) -> float:
+        if self.copy_start is None:
+            return 0.0
+        copy_end = self.copy_end[0] if self.copy_end else self.end
+        return max(0.0, copy_end - self.copy_start[0])
+    
+    @property
+    def reencoded_seconds(self) -> float:
+        return max(0.0, self.end - self.start - self.copied_seconds)
+    
+    def entries(self) -> List[Tuple[Path, Optional[float], Optional[float], Optional[float]]]:
+        """
+        Concat demuxer entries (file, inpoint, outpoint, duration).
+        
+        The demuxer compares outpoint with packet DTS, so the copied part
+        ends at the DTS of the next keyframe (every earlier frame in decode
+        order, nothing of the next GOP) and its duration is given explicitly
+        as the PTS span so the following entry starts right after it.
+        """
+        entries = []
+        if self.head_piece:
+            entries.append((self.head_piece, None, None, None))
+        if self.copy_start is not None:
+            inpoint = self.copy_start[0] if self.copy_start[0] > 0 else None
+            if self.copy_end:
+                entries.append((self.path, inpoint, self.copy_end[1], self.copy_end[0] - self.copy_start[0]))
+            else:
+                entries.append((self.path, inpoint, None, None))
+        if self.tail_piece:
+            entries.append((self.tail_piece, None, None, None))
+        return entries
+
+
+class TrimStats:
+    """Seconds copied and re-encoded by a SmartTrimmer."""
+    
+    def __init__(self):
+        self.clips = 0
+        self.skipped = 0
+        self.copied = 0.0
+        self.reencoded = 0.0
+        self.snapped = 0.0  # Seconds cut beyond the requested trim by snapping to keyframes
+        self.unmatched = 0  # Clips whose pieces do not match their parameter sets (group re-encoded)
+    
+    def summary(self) -> str:
+        text = (f"Trim: {self.clips} clips, {self.copied:.1f} s stream-copied, "
+                f"{self.reencoded:.1f} s re-encoded")
+        if self.snapped >= 0.05:
+            text += f", {self.snapped:.1f} s extra cut by keyframe snapping"
+        if self.unmatched:
+            text += (f", {self.unmatched} clips joined by re-encoding their group "
+                     f"(cut pieces do not match the clip's parameter sets)")
+        if self.skipped:
+            text += f", {self.skipped} clips skipped (shorter than the trim or unreadable)"
+        return text
+
+
+class SmartTrimmer:
+    """
+    Cut a fixed number of seconds off the head and tail of every clip.
+    
+    Cuts are expressed as concat demuxer inpoint/outpoint entries, so the
+    bulk of every clip is stream-copied. The copied part always runs from
+    keyframe to keyframe: the head cut snaps forward to the next keyframe
+    and the tail cut back to the previous one. In FRAME mode the partial
+    GOPs between the exact cuts and those keyframes are re-encoded (with
+    the clip's codec and parameters) into short pieces around the copied
+    part. A stream-copied MP4 keeps the parameter sets (SPS/PPS) of its
+    first file only, so a group can only be stream-copied if every piece
+    has its clip's parameter sets; otherwise the cuts stay exact and the
+    group is re-encoded (see copy_safe()). If no keyframe lies between
+    the cuts, KEYFRAME mode keeps the GOPs around them instead of
+    dropping the clip. Keyframe positions are read without decoding and
+    cached in the probe cache. Each clip is planned once per run and
+    reused by retries.
+    """
+    
+    def __init__(
+        self,
+        ffmpeg_path: Optional[str],
+        probe: MediaProbe,
+        settings: TrimSettings,
+        processes: Optional[FFmpegProcessGroup] = None
+    ):
+        self.ffmpeg_path = ffmpeg_path or "ffmpeg"
+        self.probe = probe
+        self.settings = settings
+        self.processes = processes or FFmpegProcessGroup()
+        self.stats = TrimStats()
+        self._work_dir: Optional[Path] = None
+        self._piece_ids = itertools.count(1)
+        self._plans: Dict[Path, Optional[ClipTrim]] = {}
+        self._lock = threading.Lock()
+        self._path_locks: Dict[Path, threading.Lock] = {}
+        self._unmatched_sets = set()  # Parameter sets the encoder did not reproduce (warned once)
+    
+    def fingerprint(self) -> str:
+        return self.settings.fingerprint()
+    
+    def trim_group(self, input_files: List[Path]) -> List[ClipTrim]:
+        """
+        Plan (and, in FRAME mode, pre-encode) the cuts of a group.
+        
+        Clips that are too short to keep anything are left out.
+        """
+        trims = [self.trim_clip(path) for path in input_files]
+        return [trim for trim in trims if trim is not None]
+    
+    def copy_safe(self, input_files: List[Path]) -> bool:
+        """Check if the trimmed group can be stream-copied (no mismatching pieces)."""
+        return all(trim.copy_safe for trim in self.trim_group(input_files))
+    
+    def trim_clip(self, path: Path) -> Optional[ClipTrim]:
+        """Get the cut of one clip, or None if nothing of it is kept."""
+        with self._lock:
+            if path in self._plans:
+                return self._plans[path]
+            path_lock = self._path_locks.setdefault(path, threading.Lock())
+        with path_lock:
+            with self._lock:
+                if path in self._plans:
+                    return self._plans[path]
+            trim, requested = self._plan(path)
+            if trim is None and self.processes.cancelled:
+                return None
+            with self._lock:
+                self._plans[path] = trim
+                if trim is None:
+                    self.stats.skipped += 1
+                else:
+                    self.stats.clips += 1
+                    self.stats.copied += trim.copied_seconds
+                    self.stats.reencoded += trim.reencoded_seconds
+                    self.stats.snapped += max(0.0, requested - (trim.end - trim.start))
+                    if not trim.copy_safe:
+                        self.stats.unmatched += 1
+            return trim
+    
+    def cleanup(self):
+        """Remove the re-encoded pieces."""
+        with self._lock:
+            work_dir, self._work_dir = self._work_dir, None
+            self._plans.clear()
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def _plan(self, path: Path) -> Tuple[Optional[ClipTrim], float]:
+        """Returns (cut or None, seconds the requested trim would keep)."""
+        info = self.probe.probe(path)
+        duration = info.get("duration") if info else None
+        if not duration:
+            logger.warning(f"Cannot trim {path.name}: duration unknown, skipped")
+            return None, 0.0
+        head = self.settings.head
+        end = duration - self.settings.tail
+        if end - head <= 0.1:
+            logger.warning(f"{path.name} ({duration:.1f} s) is shorter than the trim, skipped")
+            return None, 0.0
+        requested = end - head
+        fps = (info.get("video") or {}).get("fps") or 25.0
+        half_frame = 0.5 / fps
+        # Exact cuts land on frame boundaries so pieces have whole frames
+        head = round(head * fps) / fps
+        end = round(end * fps) / fps
+        
+        copy_start = self.keyframe_after(path, head, duration) if head > 0 else (0.0, 0.0)
+        copy_end = self.keyframe_before(path, end) if self.settings.tail > 0 else None
+        if copy_start is None or (copy_end is not None and copy_end[0] <= copy_start[0] + half_frame):
+            # No whole GOP inside the kept part: re-encode all of it, or keep the GOPs around it
+            if self.settings.mode == TrimMode.FRAME:
+                piece, matches = self._encode_piece(path, info, head, end)
+                if piece is not None:
+                    return ClipTrim(path, head, end, head_piece=piece, copy_safe=matches), requested
+            return self._snap_outwards(path, head, end, duration, half_frame), requested
+        
+        start = copy_start[0]
+        head_piece = tail_piece = None
+        copy_safe = True
+        if self.settings.mode == TrimMode.FRAME and copy_start[0] - head >= half_frame:
+            head_piece, matches = self._encode_piece(path, info, head, copy_start[0])
+            if head_piece is not None:
+                start = head
+                copy_safe = matches
+        if copy_end is None:
+            end = duration
+        elif self.settings.mode == TrimMode.FRAME and end - copy_end[0] >= half_frame:
+            tail_piece, matches = self._encode_piece(path, info, copy_end[0], end)
+            if tail_piece is None:
+                end = copy_end[0]
+            else:
+                copy_safe = copy_safe and matches
+        else:
+            end = copy_end[0]
+        return ClipTrim(path, start, end, copy_start, copy_end, head_piece, tail_piece, copy_safe), requested
+    
+    def _snap_outwards(self, path: Path, head: float, end: float, duration: float, half_frame: float) -> ClipTrim:
+        """Keep the GOPs around [head, end) when no keyframe lies between the cuts."""
+        copy_start = (self.keyframe_before(path, head) if head > 0 else None) or (0.0, 0.0)
+        copy_end = None
+        if self.settings.tail > 0:
+            copy_end = self.keyframe_after(path, max(end, copy_start[0] + half_frame), duration)
+        kept_end = copy_end[0] if copy_end else duration
+        logger.warning(
+            f"{path.name}: no keyframe between the cuts, keeping {kept_end - copy_start[0]:.1f} s "
+            f"from {copy_start[0]:.1f} s instead of {end - head:.1f} s"
+        )
+        return ClipTrim(path, copy_start[0], kept_end, copy_start, copy_end)
+    
+    def keyframe_after(self, path: Path, t: float, duration: float) -> Optional[Keyframe]:
+        """First video keyframe at or after t seconds (None if there is none)."""
+        for until in (t + KEYFRAME_SCAN_WINDOW, duration + 1.0):
+            for keyframe in self._keyframes(path, t, until):
+                if keyframe[0] >= t - 0.001:
+                    return keyframe
+            if until >= duration:
+                break
+        return None
+    
+    def keyframe_before(self, path: Path, t: float) -> Optional[Keyframe]:
+        """Last video keyframe at or before t seconds (None if there is none)."""
+        # A seeking scan also returns the keyframe before the window
+        candidates = [k for k in self._keyframes(path, max(0.0, t - KEYFRAME_SCAN_WINDOW), t) if k[0] <= t + 0.001]
+        return candidates[-1] if candidates else None
+    
+    def _keyframes(self, path: Path, start: float, until: float) -> List[Keyframe]:
+        """Keyframes of path around [start, until], scanning if not cached."""
+        cached = self.probe.get_extra(path, KEYFRAMES_EXTRA) or {"windows": [], "frames": []}
+        if not any(a <= start and b >= until for a, b in cached["windows"]):
+            frames = self._scan_keyframes(path, start, until)
+            if frames is None:
+                return []
+            merged = {tuple(frame) for frame in cached["frames"]} | set(frames)
+            cached = {
+                "windows": cached["windows"] + [[start, until]],
+                "frames": sorted(list(frame) for frame in merged)
+            }
+            self.probe.set_extra(path, KEYFRAMES_EXTRA, cached)
+        return [tuple(frame) for frame in cached["frames"]]
+    
+    def _scan_keyframes(self, path: Path, start: float, until: float) -> Optional[List[Keyframe]]:
+        # Packets are only demuxed and checksummed, never decoded
+        cmd = [self.ffmpeg_path, "-hide_banner", "-v", "error", "-copyts"]
+        if start > 0:
+            cmd += ["-ss", f"{start:.3f}"]
+        cmd += [
+            "-t", f"{until - start:.3f}",
+            "-i", str(path),
+            "-map", "0:v:0",
+            "-c", "copy",
+            "-f", "framecrc", "-"
+        ]
+        try:
+            result = self.processes.run(cmd, timeout=300)
+        except (ProcessCancelled, subprocess.TimeoutExpired, OSError) as e:
+            logger.info(f"Keyframes of {path.name} not read: {e.__class__.__name__}")
+            return None
+        time_base = _TB_RE.search(result.stdout or "")
+        if result.returncode != 0 or not time_base:
+            logger.warning(f"Keyframe scan failed for {path.name}")
+            return None
+        scale = int(time_base.group(1)) / int(time_base.group(2))
+        keyframes = []
+        for dts, pts, flags in _PACKET_RE.findall(result.stdout):
+            # framecrc only prints flags that differ from a plain keyframe
+            if not flags or int(flags, 16) & 1:
+                keyframes.append((int(pts) * scale, int(dts) * scale))
+        return keyframes
+    
+    def _piece_path(self, path: Path) -> Path:
+        with self._lock:
+            if self._work_dir is None:
+                self._work_dir = Path(tempfile.mkdtemp(prefix="vmc_trim_"))
+            return self._work_dir / f"{next(self._piece_ids)}_{path.stem[:40]}.mp4"
+    
+    def _encode_piece(self, path: Path, info: dict, start: float, end: float) -> Tuple[Optional[Path], bool]:
+        """
+        Re-encode [start, end) with parameters matching the copied part.
+        
+        Returns (piece, or None if it cannot be encoded; whether its
+        parameter sets equal the clip's). A piece that does not match
+        cannot be stream-copied next to the clip: players reading only the
+        MP4 header would decode it with the wrong SPS/PPS.
+        """
+        encode_args = matching_encode_args(info)
+        if encode_args is None:
+            return None, False
+        output = self._piece_path(path)
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner", "-v", "error",
+            "-ss", f"{start:.6f}",  # Decodes from the previous keyframe, output starts exactly here
+            "-i", str(path),
+            "-t", f"{end - start:.6f}",
+            "-map", "0:v:0",
+            "-map", "0:a:0?",
+            *encode_args,
+            "-y", str(output)
+        ]
+        try:
+            result = self.processes.run(cmd, timeout=600)
+        except (ProcessCancelled, subprocess.TimeoutExpired, OSError) as e:
+            logger.info(f"Trim piece of {path.name} not encoded: {e.__class__.__name__}")
+            output.unlink(missing_ok=True)
+            return None, False
+        if result.returncode != 0 or not output.exists():
+            logger.warning(f"Trim piece encode failed for {path.name}, cutting at keyframes: {result.stderr}")
+            output.unlink(missing_ok=True)
+            return None, False
+        
+        source_sets = self.probe.parameter_sets(path)
+        with self._lock:
+            known = source_sets in self._unmatched_sets
+        if source_sets is not None and not known:
+            if self.probe.parameter_sets(output, cache=False) == source_sets:
+                return output, True
+        with self._lock:
+            first_time = source_sets not in self._unmatched_sets
+            self._unmatched_sets.add(source_sets)
+        if first_time:
+            logger.warning(
+                f"{path.name}: re-encoded cut pieces do not match the clip's parameter sets, "
+                f"groups with such clips are re-encoded to keep the cuts exact"
+            )
+        return output, False
@@ -1,10 +1,27 @@
 """Background worker for video processing."""
 from PySide6.QtCore import QThread, Signal
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from typing import List, Optional
+from app.core.autotune import EncoderAutoTuner, EncoderProfile
+from app.core.bumpers import BumperLibrary
+from app.core.concurrency import AdaptiveConcurrencyController, ConcurrencyBudget
+from app.core.dedup import DedupPolicy, VideoFingerprinter, find_duplicates
 from app.core.ffmpeg_concat import FFmpegConcat
+from app.core.loudness import LoudnessNormalizer
+from app.core.output_cache import OutputStore
+from app.core.planner import DiskSpacePlanner, InsufficientSpaceError
+from app.core.plan_preview import GroupPlan, build_groups, generate_output_filename, plan_groups, keeps_whole_clips
+from app.core.probe import MediaProbe
+from app.core.scheduler import SchedulePolicy, estimate_costs, order_groups
+from app.core.prefetch import GroupPrefetcher
+from app.core.process_control import FFmpegProcessGroup
+from app.core.trim import SmartTrimmer, TrimMode, TrimSettings
 from app.core.grouper import group_files, SortMode, RemainderBehavior
 from app.services.logging_service import logger
+from app.utils.paths import get_probe_cache_file
 
 
 class VideoProcessingWorker(QThread):
@@ -23,7 +40,28 @@ class VideoProcessingWorker(QThread):
         sort_mode: SortMode,
         remainder_behavior: RemainderBehavior,
         output_naming_pattern: str,
-        ffmpeg_path: Optional[str] = None
+        ffmpeg_path: Optional[str] = None,
+        encoder_profile: Optional[EncoderProfile] = None,
+        batch_size: int = 1,
+        prefetch_groups: int = 2,
+        prefetch_budget_mb: int = 512,
+        output_store: Optional[OutputStore] = None,
+        check_disk_space: bool = True,
+        schedule_policy: SchedulePolicy = SchedulePolicy.INDEX,
+        pinned_groups: Optional[List[int]] = None,
+        max_jobs: int = 1,
+        adaptive_concurrency: bool = False,
+        background_priority: bool = False,
+        budget: Optional[ConcurrencyBudget] = None,
+        dedup_policy: DedupPolicy = DedupPolicy.OFF,
+        loudness_normalization: bool = False,
+        loudness_target: float = -16.0,
+        trim_head: float = 0.0,
+        trim_tail: float = 0.0,
+        trim_mode: TrimMode = TrimMode.KEYFRAME,
+        intro_path: Optional[Path] = None,
+        outro_path: Optional[Path] = None,
+        bumper_cache_max_mb: int = 2048
     ):
         super().__init__()
         self.input_dir = input_dir
@@ -33,11 +71,49 @@ class VideoProcessingWorker(QThread):
         self.remainder_behavior = remainder_behavior
         self.output_naming_pattern = output_naming_pattern
         self.ffmpeg_path = ffmpeg_path
+        self.encoder_profile = encoder_profile
+        self.batch_size = batch_size  # Groups per FFmpeg process (for many tiny clips)
+        self.prefetch_groups = prefetch_groups  # Upcoming FFmpeg runs to warm in page cache (0 = off)
+        self.prefetch_budget_mb = prefetch_budget_mb
+        self.output_store = output_store  # Reuses identical outputs across runs (None = off)
+        self.check_disk_space = check_disk_space
+        self.schedule_policy = schedule_policy
+        self.pinned_groups = pinned_groups or []  # 1-based group numbers for PRIORITY
+        self.max_jobs = max_jobs  # Upper bound of concurrent FFmpeg runs
+        self.adaptive_concurrency = adaptive_concurrency  # Scale 1..max_jobs from system load
+        self.processes = FFmpegProcessGroup(background_priority)  # Live FFmpeg runs of this batch
+        self.budget = budget  # FFmpeg slots shared with other queued jobs (None = no global limit)
+        self.dedup_policy = dedup_policy  # Skip near-identical inputs before grouping
+        self.loudness_normalization = loudness_normalization  # Two-pass loudnorm of the audio
+        self.loudness_target = loudness_target  # Integrated loudness in LUFS
+        self.trim = TrimSettings(trim_head, trim_tail, trim_mode)  # Cut off every clip's head/tail
+        self.intro_path = intro_path  # Bumpers joined before/after every group
+        self.outro_path = outro_path
+        self.bumper_cache_max_mb = bumper_cache_max_mb  # Size limit of the shared bumper variant cache
         self._cancelled = False
     
     def cancel(self):
-        """Cancel processing."""
+        """Cancel processing, stopping running FFmpeg processes."""
         self._cancelled = True
+        self.processes.cancel()
+    
+    def pause(self):
+        """Suspend running FFmpeg processes and hold back new groups."""
+        self.processes.pause()
+        self.progress.emit("Paused")
+    
+    def resume(self):
+        """Continue after pause()."""
+        self.processes.resume()
+        self.progress.emit("Resumed")
+    
+    def is_paused(self) -> bool:
+        """Check if processing is paused."""
+        return self.processes.paused
+    
+    def set_background_priority(self, enabled: bool):
+        """Run FFmpeg at low CPU/IO priority (applies to running processes too)."""
+        self.processes.set_background(enabled)
     
     def run(self):
         """Run the processing."""
@@ -54,6 +130,20 @@ class VideoProcessingWorker(QThread):
             
             self.progress.emit(f"Found {len(files)} video files")
             
+            probe = MediaProbe(self.ffmpeg_path, get_probe_cache_file())
+            if self.dedup_policy != DedupPolicy.OFF:
+                fingerprinter = VideoFingerprinter(self.ffmpeg_path, probe, self.processes)
+                try:
+                    files, _ = find_duplicates(
+                        files, self.dedup_policy, fingerprinter, self.max_jobs, self.progress.emit
+                    )
+                finally:
+                    probe.save()
+                if self._cancelled:
+                    self.progress.emit("Processing cancelled")
+                    self.finished.emit(False)
+                    return
+            
             # Group files
             self.progress.emit("Grouping files...")
             groups, remainder = group_files(
@@ -77,35 +167,216 @@ class VideoProcessingWorker(QThread):
                 elif self.remainder_behavior == RemainderBehavior.EXPORT_SINGLE:
                     groups.append(remainder)
             
-            # Process groups
-            ffmpeg = FFmpegConcat(self.ffmpeg_path)
-            total_groups = len(groups)
-            success_count = 0
+            # Pre-flight: make sure the whole batch fits on disk
+            planner = None
+            estimates = [0] * len(groups)
+            if self.check_disk_space:
+                planner = DiskSpacePlanner(
+                    self.output_dir, probe, self.encoder_profile,
+                    trim=self.trim,
+                    loudness=self.loudness_normalization,
+                    bumpers=[path for path in (self.intro_path, self.outro_path) if path]
+                )
+                try:
+                    estimates = planner.plan(groups)
+                except InsufficientSpaceError as e:
+                    logger.error(str(e))
+                    self.progress.emit(f"✗ {e}")
+                    self.finished.emit(False)
+                    return
+                finally:
+                    probe.save()
+                self.progress.emit(f"Estimated output size: {sum(estimates) / (1024 * 1024):.1f} MB")
+            
+            # First loudness pass once per input (cached); outputs then need one encode
+            loudness = None
+            if self.loudness_normalization:
+                loudness = LoudnessNormalizer(self.ffmpeg_path, probe, self.processes, self.loudness_target)
+                try:
+                    loudness.measure_all([f for group in groups for f in group], self.max_jobs, self.progress.emit)
+                finally:
+                    probe.save()
+                if self._cancelled:
+                    self.progress.emit("Processing cancelled")
+                    self.finished.emit(False)
+                    return
             
-            for i, group in enumerate(groups):
+            # Bumpers are encoded once per stream profile in the plan (cached)
+            bumpers = None
+            if self.intro_path or self.outro_path:
+                bumpers = BumperLibrary(
+                    self.ffmpeg_path, probe, self.intro_path, self.outro_path, self.processes,
+                    max_bytes=self.bumper_cache_max_mb * 1024 * 1024
+                )
+                try:
+                    bumpers.prepare(groups, self.max_jobs, self.progress.emit)
+                finally:
+                    probe.save()
                 if self._cancelled:
                     self.progress.emit("Processing cancelled")
                     self.finished.emit(False)
                     return
-                
-                # Generate output filename
-                output_filename = self._generate_output_filename(i, len(group))
-                output_file = self.output_dir / output_filename
-                
-                self.progress.emit(f"Processing group {i + 1}/{total_groups}: {output_filename}")
-                
-                def progress_callback(msg: str):
-                    self.progress.emit(msg)
-                
-                success = ffmpeg.concat_videos(group, output_file, use_copy=True, progress_callback=progress_callback)
-                
-                if success:
-                    success_count += 1
-                    self.progress.emit(f"✓ Group {i + 1} completed")
-                else:
-                    self.progress.emit(f"✗ Group {i + 1} failed")
-                
-                self.group_complete.emit(i + 1, total_groups, success)
+            
+            # Process groups
+            trimmer = SmartTrimmer(self.ffmpeg_path, probe, self.trim, self.processes) if self.trim.enabled else None
+            if trimmer:
+                self.progress.emit(
+                    f"Trimming {self.trim.head:g} s from the start and {self.trim.tail:g} s from the end "
+                    f"of every clip ({self.trim.mode.value} accurate)"
+                )
+            ffmpeg = FFmpegConcat(
+                self.ffmpeg_path, self.encoder_profile, self.processes, loudness, trimmer, bumpers, probe
+            )
+            total_groups = len(groups)
+            success_count = 0
+            
+            # Execution order; output names stay tied to the original index
+            costs = None
+            if self.schedule_policy in (SchedulePolicy.SHORTEST_FIRST, SchedulePolicy.LONGEST_FIRST):
+                costs = estimate_costs(groups, probe)
+                probe.save()
+            indexed_groups = order_groups(groups, self.schedule_policy, costs, self.pinned_groups)
+            if self.schedule_policy != SchedulePolicy.INDEX:
+                preview = ", ".join(str(i + 1) for i, _ in indexed_groups[:10])
+                self.progress.emit(f"Execution order ({self.schedule_policy.value}): {preview}"
+                                   + (", ..." if len(indexed_groups) > 10 else ""))
+            
+            batch_size = max(1, self.batch_size)
+            batches = [
+                indexed_groups[start:start + batch_size]
+                for start in range(0, total_groups, batch_size)
+            ]
+            
+            # Warm the inputs of the next batches while the current ones run
+            prefetcher = GroupPrefetcher(
+                [[f for _, group in batch for f in group] for batch in batches],
+                lookahead=self.prefetch_groups,
+                memory_budget=self.prefetch_budget_mb * 1024 * 1024
+            )
+            prefetcher.start()
+            
+            # Number of concurrent FFmpeg runs follows live CPU/IO/memory pressure
+            controller = AdaptiveConcurrencyController(1, self.max_jobs, self.adaptive_concurrency)
+            if controller.max_jobs > 1:
+                mode = "adaptive" if controller.adaptive else "fixed"
+                self.progress.emit(f"Running up to {controller.max_jobs} FFmpeg jobs at once ({mode})")
+            
+            def progress_callback(msg: str):
+                self.progress.emit(msg)
+            
+            pending = deque(enumerate(batches))
+            head = None  # (group indexes, jobs, cache keys) prepared but not started yet
+            running = {}  # Future -> (group indexes, jobs, cache keys, reserved bytes, start time)
+            stop_message = None
+            
+            try:
+                with ThreadPoolExecutor(max_workers=controller.max_jobs) as pool:
+                    while pending or running or head is not None:
+                        if self._cancelled:
+                            stop_message = "Processing cancelled"
+                        
+                        # While paused nothing new starts and load samples are meaningless
+                        paused = self.processes.paused
+                        waiting_for_slot = False
+                        limit = 0 if paused else controller.tick(len(running), len(pending) + (head is not None))
+                        while stop_message is None and len(running) < limit:
+                            if head is None:
+                                if not pending:
+                                    break
+                                batch_number, batch = pending.popleft()
+                                prefetcher.advance(batch_number)
+                                head, hits = self._prepare_batch(batch, ffmpeg, total_groups)
+                                success_count += hits
+                                if not head[1]:
+                                    head = None  # Everything came from the output cache
+                                    continue
+                            
+                            # Wait for running jobs to free space; stop if nothing is running
+                            reserved = sum(estimates[i] for i in head[0])
+                            if planner and not planner.reserve(reserved):
+                                if not running:
+                                    stop_message = f"✗ Not enough free space for group {head[0][0] + 1}; stopping"
+                                break
+                            
+                            # Other jobs in the queue may be using every global slot
+                            if self.budget and not self.budget.try_acquire():
+                                if planner:
+                                    planner.release(reserved)
+                                waiting_for_slot = True
+                                break
+                            
+                            # One FFmpeg process per batch (plain concat when batch_size is 1)
+                            future = pool.submit(self._run_batch, head[1], head[2], ffmpeg, progress_callback)
+                            running[future] = head + (reserved, time.perf_counter())
+                            head = None
+                        
+                        if not running:
+                            if stop_message:
+                                break
+                            if paused or waiting_for_slot:
+                                time.sleep(0.2)
+                            continue
+                        
+                        done, _ = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            job_groups, jobs, job_keys, reserved, started = running.pop(future)
+                            if planner:
+                                planner.release(reserved)
+                            if self.budget:
+                                self.budget.release()
+                            try:
+                                results, job_keys, methods = future.result()
+                            except Exception as e:
+                                logger.error(f"Processing error: {e}")
+                                results, methods = [False] * len(jobs), [None] * len(jobs)
+                            elapsed = (time.perf_counter() - started) / len(jobs)
+                            
+                            for i, (_, output_file), key, method, success in zip(
+                                job_groups, jobs, job_keys, methods, results
+                            ):
+                                if method:
+                                    success_count += 1
+                                    self.progress.emit(f"✓ Group {i + 1} reused from output cache ({method})")
+                                elif success:
+                                    if key:
+                                        self.output_store.put(key, output_file, elapsed)
+                                    success_count += 1
+                                    self.progress.emit(f"✓ Group {i + 1} completed")
+                                elif self._cancelled:
+                                    # Don't leave a truncated file from a terminated FFmpeg
+                                    try:
+                                        output_file.unlink()
+                                    except OSError:
+                                        pass
+                                    self.progress.emit(f"✗ Group {i + 1} cancelled")
+                                else:
+                                    self.progress.emit(f"✗ Group {i + 1} failed")
+                                
+                                self.group_complete.emit(i + 1, total_groups, success)
+            finally:
+                prefetcher.stop()
+                probe.save()
+                if trimmer:
+                    trimmer.cleanup()
+                    logger.info(trimmer.stats.summary())
+                    self.progress.emit(trimmer.stats.summary())
+                if bumpers:
+                    logger.info(bumpers.stats.summary())
+                    self.progress.emit(bumpers.stats.summary())
+                if self.output_store:
+                    self.output_store.save()
+                    logger.info(self.output_store.summary())
+                    self.progress.emit(self.output_store.summary())
+                if self.prefetch_groups > 0:
+                    logger.info(prefetcher.stats.summary())
+                    self.progress.emit(prefetcher.stats.summary())
+            
+            if self._cancelled:
+                self.progress.emit("Processing cancelled")
+                self.finished.emit(False)
+                return
+            if stop_message:
+                self.progress.emit(stop_message)
             
             # Final status
             if success_count == total_groups:
@@ -120,16 +391,174 @@ class VideoProcessingWorker(QThread):
             self.progress.emit(f"Error: {str(e)}")
             self.finished.emit(False)
     
-    def _generate_output_filename(self, group_index: int, file_count: int) -> str:
-        """Generate output filename based on pattern."""
-        pattern = self.output_naming_pattern
+    def _prepare_batch(self, batch, ffmpeg: FFmpegConcat, total_groups: int):
+        """
+        Resolve output names and restore cached outputs for one batch.
+        
+        Runs on the dispatch thread, so only groups whose inputs are already
+        hashed (unchanged since an earlier run) are looked up here; the
+        others get no key yet and are hashed on the pool thread by
+        _run_batch().
         
-        # Replace placeholders
-        filename = pattern.replace("{group}", f"{group_index + 1:03d}")
-        filename = filename.replace("{count}", str(file_count))
+        Returns:
+            ((group indexes, jobs, cache keys) still needing FFmpeg, cache hit count)
+        """
+        job_groups = []
+        jobs = []
+        job_keys = []
+        hits = 0
+        for i, group in batch:
+            # Generate output filename
+            output_filename = self._generate_output_filename(i, len(group))
+            output_file = self.output_dir / output_filename
+            self.progress.emit(f"Processing group {i + 1}/{total_groups}: {output_filename}")
+            
+            key = None
+            if self.output_store:
+                key = self.output_store.group_key(group, ffmpeg.fingerprint(), compute=False)
+                method = key and self.output_store.materialize(key, output_file)
+                if method:
+                    hits += 1
+                    self.progress.emit(f"✓ Group {i + 1} reused from output cache ({method})")
+                    self.group_complete.emit(i + 1, total_groups, True)
+                    continue
+            
+            job_groups.append(i)
+            jobs.append((group, output_file))
+            job_keys.append(key)
+        return (job_groups, jobs, job_keys), hits
+    
+    def _run_batch(self, jobs, job_keys, ffmpeg: FFmpegConcat, progress_callback):
+        """
+        Produce one batch on a pool thread.
         
-        # Ensure .mp4 extension
-        if not filename.endswith('.mp4'):
-            filename += '.mp4'
+        Groups without a cache key yet are hashed here and restored from
+        the output cache if possible; the rest goes to FFmpeg.
         
-        return filename
+        Returns:
+            (success flags, cache keys, cache restore methods) per job
+        """
+        keys = list(job_keys)
+        methods = [None] * len(jobs)
+        if self.output_store:
+            for n, (group, output_file) in enumerate(jobs):
+                if keys[n] is None:
+                    keys[n] = self.output_store.group_key(group, ffmpeg.fingerprint())
+                    methods[n] = keys[n] and self.output_store.materialize(keys[n], output_file)
+        results = [bool(method) for method in methods]
+        todo = [n for n, method in enumerate(methods) if not method]
+        if todo:
+            done = ffmpeg.concat_batch([jobs[n] for n in todo], progress_callback)
+            for n, success in zip(todo, done):
+                results[n] = success
+        return results, keys, methods
+    
+    def _generate_output_filename(self, group_index: int, file_count: int) -> str:
+        """Generate output filename based on pattern."""
+        return generate_output_filename(self.output_naming_pattern, group_index, file_count)
+
+
+class EncoderAutoTuneWorker(QThread):
+    """Worker thread for benchmarking encoder profiles."""
+    
+    # Signals
+    progress = Signal(str)  # Progress message
+    profile_selected = Signal(dict)  # winning EncoderProfile.to_dict()
+    finished = Signal(bool)  # True if a profile met the quality floor
+    
+    def __init__(self, input_dir: Path, quality_floor: float, ffmpeg_path: Optional[str] = None):
+        super().__init__()
+        self.input_dir = input_dir
+        self.quality_floor = quality_floor
+        self.ffmpeg_path = ffmpeg_path
+        self._cancelled = False
+    
+    def cancel(self):
+        """Cancel benchmarking after the current candidate."""
+        self._cancelled = True
+    
+    def run(self):
+        """Run the benchmark."""
+        try:
+            from app.core.grouper import scan_video_files
+            files = scan_video_files(self.input_dir)
+            tuner = EncoderAutoTuner(self.ffmpeg_path, quality_floor=self.quality_floor)
+            profile, _ = tuner.run(
+                files,
+                progress_callback=self.progress.emit,
+                is_cancelled=lambda: self._cancelled
+            )
+            if self._cancelled:
+                profile = None  # Only a completed matrix is stored
+            if profile:
+                self.profile_selected.emit(profile.to_dict())
+            self.finished.emit(profile is not None)
+        except Exception as e:
+            logger.error(f"Auto-tune error: {e}")
+            self.progress.emit(f"Error: {str(e)}")
+            self.finished.emit(False)
+
+
+class GroupPlanWorker(QThread):
+    """Worker thread for computing the group plan preview."""
+    
+    # Signals
+    progress = Signal(str)  # Progress message
+    plans_ready = Signal(list)  # Next chunk of GroupPlan objects, in group order
+    finished = Signal(bool)  # True if the plan was computed completely
+    
+    CHUNK_SECONDS = 0.1  # Hand rows to the UI at most this often
+    
+    def __init__(self, input_dir: Path, settings: dict, ffmpeg_path: Optional[str] = None):
+        super().__init__()
+        self.input_dir = input_dir
+        self.settings = settings  # Job settings dict (see create_worker())
+        self.ffmpeg_path = ffmpeg_path
+        self._cancelled = False
+    
+    def cancel(self):
+        """Stop planning."""
+        self._cancelled = True
+    
+    def run(self):
+        """Group the files and describe each group."""
+        try:
+            self.progress.emit("Scanning video files...")
+            probe = MediaProbe(self.ffmpeg_path, get_probe_cache_file())
+            dedup_policy = DedupPolicy(self.settings.get("dedup_policy", DedupPolicy.OFF.value))
+            fingerprinter = None
+            if dedup_policy != DedupPolicy.OFF:
+                fingerprinter = VideoFingerprinter(self.ffmpeg_path, probe)
+            groups, remainder = build_groups(self.input_dir, self.settings, fingerprinter, self.progress.emit)
+            if not groups:
+                self.progress.emit("No groups to process")
+                self.finished.emit(False)
+                return
+            
+            summary = f"{len(groups)} groups"
+            remainder_behavior = self.settings.get("remainder_behavior", RemainderBehavior.IGNORE.value)
+            if remainder and remainder_behavior != RemainderBehavior.EXPORT_SINGLE.value:
+                summary += f", {len(remainder)} files left ungrouped"
+            self.progress.emit(summary)
+            
+            pattern = self.settings.get("output_naming_pattern") or "group_{group}.mp4"
+            chunk: List[GroupPlan] = []
+            last_emit = time.monotonic()
+            try:
+                for plan in plan_groups(groups, pattern, probe, keeps_whole_clips(self.settings)):
+                    if self._cancelled:
+                        break
+                    chunk.append(plan)
+                    if time.monotonic() - last_emit >= self.CHUNK_SECONDS:
+                        self.plans_ready.emit(chunk)
+                        chunk = []
+                        last_emit = time.monotonic()
+            finally:
+                probe.save()
+            if chunk:
+                self.plans_ready.emit(chunk)
+            self.finished.emit(not self._cancelled)
+        except Exception as e:
+            logger.error(f"Plan preview error: {e}")
+            self.progress.emit(f"Error: {str(e)}")
+            self.finished.emit(False)
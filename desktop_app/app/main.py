@@ -1,16 +1,18 @@
 """Main application entry point."""
+# Imported first so the startup timeline includes the imports below
+from app.utils.startup_profiler import startup_profiler
 import sys
 from pathlib import Path
 from PySide6.QtWidgets import QApplication, QMessageBox
-from PySide6.QtCore import Qt
-from app.ui.main_window import MainWindow
-from app.ui.activation_window import ActivationWindow
+from PySide6.QtCore import Qt, QTimer
 from app.services.config_service import config_service
 from app.services.license_guard import license_guard
-from app.services.logging_service import logger
+from app.services.logging_service import configure_logging, logger
 from app.utils.paths import ensure_directories
 from app.utils.ffmpeg_helper import find_ffmpeg
 
+startup_profiler.mark("core imports")
+
 
 def check_ffmpeg():
     """Check if FFmpeg is available."""
@@ -31,20 +33,32 @@ def check_ffmpeg():
     return False
 
 
+def _request_activation() -> bool:
+    """Show the activation dialog; returns True if a license was activated."""
+    from app.ui.activation_window import ActivationWindow
+    activation = ActivationWindow()
+    return activation.exec() == ActivationWindow.Accepted
+
+
 def main():
     """Main application function."""
     # Ensure directories exist
-    ensure_directories()
-    
-    # Setup logging
-    logger.info("Starting Video Mixer Concat")
+    with startup_profiler.phase("directories and logging"):
+        ensure_directories()
+        
+        # Setup logging
+        configure_logging(config_service.get_log_settings())
+        logger.info("Starting Video Mixer Concat")
     
     # Create application
-    app = QApplication(sys.argv)
-    app.setApplicationName("Video Mixer Concat")
+    with startup_profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
+        app.setApplicationName("Video Mixer Concat")
     
     # Check FFmpeg
-    if not check_ffmpeg():
+    with startup_profiler.phase("FFmpeg lookup"):
+        ffmpeg_found = check_ffmpeg()
+    if not ffmpeg_found:
         msg = QMessageBox()
         msg.setIcon(QMessageBox.Warning)
         msg.setWindowTitle("FFmpeg Not Found")
@@ -60,12 +74,16 @@ def main():
     token = config_service.get_activation_token()
     if not token:
         # Show activation window
-        activation = ActivationWindow()
-        if activation.exec() != ActivationWindow.Accepted:
+        if not _request_activation():
             sys.exit(0)
     
-    # Validate license
-    is_valid, reason = license_guard.is_license_valid()
+    # Validate license. A recent successful validation (within the grace period)
+    # opens the window right away; MainWindow confirms with the server in the
+    # background. Only without one do we wait for the server here.
+    with startup_profiler.phase("license check"):
+        is_valid, reason = license_guard.cached_status()
+        if not is_valid:
+            is_valid, reason = license_guard.is_license_valid()
     if not is_valid:
         msg = QMessageBox()
         msg.setIcon(QMessageBox.Critical)
@@ -74,13 +92,22 @@ def main():
         msg.setInformativeText(reason or "Please activate your license.")
         msg.setStandardButtons(QMessageBox.Ok)
         
-        activation = ActivationWindow()
-        if activation.exec() != ActivationWindow.Accepted:
+        if not _request_activation():
             sys.exit(0)
     
     # Create and show main window
-    window = MainWindow()
-    window.show()
+    with startup_profiler.phase("main window import"):
+        from app.ui.main_window import MainWindow
+    with startup_profiler.phase("main window setup"):
+        window = MainWindow()
+        window.show()
+    
+    # Runs once the event loop has painted the first frame
+    def first_frame():
+        startup_profiler.mark("first frame")
+        startup_profiler.log_timeline(logger, "time to first frame")
+    
+    QTimer.singleShot(0, first_frame)
     
     # Run application
     sys.exit(app.exec())
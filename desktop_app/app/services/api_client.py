@@ -1,16 +1,83 @@
 """API client for communicating with license server."""
+import random
+import threading
+import time
+from collections import deque
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any
 from datetime import datetime
 from app.services.config_service import config_service
 from app.services.logging_service import logger
+from app.utils.lazy import LazyProxy
+
+
+class EndpointMetrics:
+    """Latency and error counters for one endpoint."""
+    
+    SAMPLES = 100  # Recent latencies kept for percentiles
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=self.SAMPLES)
+    
+    def record(self, elapsed_ms: float, error: bool, retries: int):
+        self.calls += 1
+        self.errors += int(error)
+        self.retries += retries
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self._recent.append(elapsed_ms)
+    
+    def percentile(self, fraction: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "p50_ms": round(self.percentile(0.50), 1),
+            "p95_ms": round(self.percentile(0.95), 1),
+            "max_ms": round(self.max_ms, 1)
+        }
 
 
 class APIClient:
-    """Client for FastAPI license server."""
+    """
+    Client for FastAPI license server.
+    
+    All calls share one keep-alive session, so repeated calls reuse the
+    TCP/TLS connection. Idempotent calls are retried on connection errors,
+    timeouts and 429/502/503/504 with jittered exponential backoff; calls
+    that change server state are only retried when the connection could
+    not be established at all. Latency is recorded per endpoint (see
+    get_metrics()).
+    """
+    
+    CONNECT_TIMEOUT = 5  # Seconds to establish the connection
+    READ_TIMEOUT = 15  # Seconds to wait for the response
+    MAX_RETRIES = 3
+    BACKOFF_BASE = 0.5  # Seconds; doubled per attempt
+    BACKOFF_MAX = 8.0
+    RETRY_STATUSES = (429, 502, 503, 504)
     
     def __init__(self):
         self.base_url = config_service.get_api_base_url()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._metrics: Dict[str, EndpointMetrics] = {}
+        self._metrics_lock = threading.Lock()
     
     def _get_headers(self, token: Optional[str] = None) -> Dict[str, str]:
         """Get request headers."""
@@ -19,6 +86,79 @@ class APIClient:
             headers["Authorization"] = f"Bearer {token}"
         return headers
     
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number attempt + 1 (full jitter)."""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.BACKOFF_MAX)
+        return random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** attempt)))
+    
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        idempotent: bool,
+        max_retries: Optional[int] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send a request with retries, timeouts and metrics.
+        
+        Args:
+            method: HTTP method
+            endpoint: Path below base_url (also the metrics key)
+            idempotent: Whether the call may be repeated safely
+            max_retries: Retries after the first attempt (default MAX_RETRIES)
+            **kwargs: Passed to requests.Session.request()
+        
+        Returns:
+            Response with a non-error status (304 included)
+        
+        Raises:
+            requests.exceptions.RequestException: after the last attempt failed
+        """
+        url = f"{self.base_url}{endpoint}"
+        kwargs.setdefault("timeout", (self.CONNECT_TIMEOUT, self.READ_TIMEOUT))
+        attempts = (self.MAX_RETRIES if max_retries is None else max_retries) + 1
+        started = time.perf_counter()
+        attempt = 0
+        
+        try:
+            while True:
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                    if idempotent and response.status_code in self.RETRY_STATUSES and attempt + 1 < attempts:
+                        delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                        logger.info(f"{method} {endpoint} returned {response.status_code}, retrying in {delay:.1f}s")
+                    else:
+                        response.raise_for_status()
+                        self._record(endpoint, started, False, attempt)
+                        return response
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    # A connect failure never reached the server, so even
+                    # non-idempotent calls can be repeated safely
+                    retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                    if not retryable or attempt + 1 >= attempts:
+                        raise
+                    delay = self._backoff(attempt)
+                    logger.info(f"{method} {endpoint} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+        except requests.exceptions.RequestException:
+            self._record(endpoint, started, True, attempt)
+            raise
+    
+    def _record(self, endpoint: str, started: float, error: bool, retries: int):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(endpoint, EndpointMetrics())
+            metrics.record(elapsed_ms, error, retries)
+        logger.debug(f"API {endpoint}: {elapsed_ms:.0f} ms, retries {retries}, error {error}")
+    
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get latency/error statistics per endpoint."""
+        with self._metrics_lock:
+            return {endpoint: metrics.to_dict() for endpoint, metrics in self._metrics.items()}
+    
     def activate(
         self,
         license_key: str,
@@ -27,7 +167,6 @@ class APIClient:
         device_label: Optional[str] = None
     ) -> Dict[str, Any]:
         """Activate a license."""
-        url = f"{self.base_url}/api/v1/activate"
         data = {
             "license_key": license_key,
             "device_fingerprint": device_fingerprint,
@@ -36,26 +175,29 @@ class APIClient:
         }
         
         try:
-            response = requests.post(url, json=data, headers=self._get_headers(), timeout=10)
-            response.raise_for_status()
+            response = self._request(
+                "POST", "/api/v1/activate", idempotent=False, json=data, headers=self._get_headers()
+            )
             return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"Activation failed: {e}")
             raise
     
-    def validate(self, token: str, app_version: str) -> Dict[str, Any]:
-        """Validate an activation token."""
-        url = f"{self.base_url}/api/v1/validate"
+    def validate(self, token: str, app_version: str, max_retries: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Validate an activation token.
+        
+        Callers that block on the answer (startup) pass max_retries=0 and
+        rely on the grace period; background refreshes keep the retries.
+        """
         data = {"app_version": app_version}
         
         try:
-            response = requests.post(
-                url,
-                json=data,
-                headers=self._get_headers(token),
-                timeout=10
+            # Read-only check, safe to repeat
+            response = self._request(
+                "POST", "/api/v1/validate", idempotent=True, max_retries=max_retries,
+                json=data, headers=self._get_headers(token)
             )
-            response.raise_for_status()
             result = response.json()
             
             if result.get("valid"):
@@ -74,35 +216,48 @@ class APIClient:
     
     def deactivate(self, token: str) -> Dict[str, Any]:
         """Deactivate an activation."""
-        url = f"{self.base_url}/api/v1/deactivate"
-        
         try:
-            response = requests.post(
-                url,
-                headers=self._get_headers(token),
-                timeout=10
+            response = self._request(
+                "POST", "/api/v1/deactivate", idempotent=False, headers=self._get_headers(token)
             )
-            response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"Deactivation failed: {e}")
             raise
     
-    def get_latest_release(self, platform: str = "windows", current_version: str = "0.0.0") -> Dict[str, Any]:
-        """Get latest release information."""
-        url = f"{self.base_url}/api/v1/releases/latest"
+    def get_latest_release(
+        self,
+        platform: str = "windows",
+        current_version: str = "0.0.0",
+        etag: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get latest release information.
+        
+        With etag (the "etag" field of an earlier result) the request is
+        conditional; if nothing changed the server answers 304 and the
+        result is {"not_modified": True}.
+        """
         params = {
             "platform": platform,
             "current_version": current_version
         }
+        headers = {"If-None-Match": etag} if etag else None
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            response = self._request(
+                "GET", "/api/v1/releases/latest", idempotent=True, params=params, headers=headers
+            )
+            if response.status_code == 304:
+                return {"not_modified": True, "etag": etag}
+            result = response.json()
+            if response.headers.get("ETag"):
+                result["etag"] = response.headers["ETag"]
+            return result
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to check for updates: {e}")
-            return {"update_available": False}
+            return {"update_available": False, "error": str(e)}
 
 
-api_client = APIClient()
+# Created on first use
+api_client = LazyProxy(APIClient)
@@ -1,48 +1,157 @@
 """Configuration service for storing app settings."""
+import atexit
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, Dict, Any
 from app.utils.paths import get_config_file, ensure_directories
+from app.utils.lazy import LazyProxy
 
 
 class ConfigService:
-    """Service for managing application configuration."""
+    """
+    Service for managing application configuration.
+    
+    Reads are served from memory. The file is stat()ed at most every
+    CHANGE_CHECK_SECONDS and reloaded only when it changed on disk, so
+    external edits are picked up (values set here but not yet written win).
+    Writes are coalesced: set() schedules a save DEBOUNCE_SECONDS later,
+    batch() writes once when the outermost block exits, and pending
+    changes are flushed at exit. Saves are atomic (temp file + rename), so
+    a crash never leaves a truncated config.json.
+    """
+    
+    DEBOUNCE_SECONDS = 0.5
+    CHANGE_CHECK_SECONDS = 1.0
     
     def __init__(self):
         ensure_directories()
         self._config_file = get_config_file()
         self._config: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._pending_keys = set()  # Keys changed since the last save
+        self._batch_depth = 0
+        self._save_timer: Optional[threading.Timer] = None
+        self._file_state = None  # (mtime_ns, size) of the file as last read/written
+        self._last_change_check = 0.0
         self.load()
+        atexit.register(self.flush)
     
-    def load(self):
-        """Load configuration from file."""
+    def _stat_file(self):
+        try:
+            st = self._config_file.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+    
+    def _read_file(self) -> Dict[str, Any]:
         if self._config_file.exists():
             try:
                 with open(self._config_file, 'r', encoding='utf-8') as f:
-                    self._config = json.load(f)
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
             except (json.JSONDecodeError, IOError):
-                self._config = {}
-        else:
-            self._config = {}
+                return {}
+        return {}
+    
+    def load(self):
+        """Load configuration from file (values set but not yet saved are kept)."""
+        with self._lock:
+            state = self._stat_file()
+            data = self._read_file()
+            for key in self._pending_keys:
+                if key in self._config:
+                    data[key] = self._config[key]
+                else:
+                    data.pop(key, None)
+            self._config = data
+            self._file_state = state
+            self._last_change_check = time.monotonic()
+    
+    def _check_external_change(self):
+        """Reload if config.json was changed by someone else."""
+        now = time.monotonic()
+        if now - self._last_change_check < self.CHANGE_CHECK_SECONDS:
+            return
+        self._last_change_check = now
+        if self._stat_file() != self._file_state:
+            self.load()
     
     def save(self):
-        """Save configuration to file."""
-        ensure_directories()
+        """Save configuration to file now (atomically)."""
+        with self._lock:
+            self._cancel_timer()
+            ensure_directories()
+            tmp_file = self._config_file.with_suffix(".tmp")
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._config, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self._config_file)
+                self._pending_keys.clear()
+                self._file_state = self._stat_file()
+            except (IOError, OSError, TypeError, ValueError):
+                pass
+    
+    def flush(self):
+        """Write pending changes now, if any."""
+        with self._lock:
+            if self._pending_keys:
+                self.save()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group several set() calls into a single write.
+        
+        Usage:
+            with config_service.batch():
+                config_service.set("a", 1)
+                config_service.set("b", 2)
+        """
+        with self._lock:
+            self._batch_depth += 1
         try:
-            with open(self._config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=2)
-        except IOError:
-            pass
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+    
+    def _schedule_save(self):
+        if self._batch_depth > 0 or self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.DEBOUNCE_SECONDS, self._debounced_save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+    
+    def _debounced_save(self):
+        with self._lock:
+            self._save_timer = None
+            self.flush()
+    
+    def _cancel_timer(self):
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a configuration value."""
-        return self._config.get(key, default)
+        with self._lock:
+            self._check_external_change()
+            return self._config.get(key, default)
     
     def set(self, key: str, value: Any):
-        """Set a configuration value."""
-        self._config[key] = value
-        self.save()
+        """Set a configuration value (written shortly after, see batch())."""
+        with self._lock:
+            self._config[key] = value
+            self._pending_keys.add(key)
+            self._schedule_save()
     
     def get_activation_token(self) -> Optional[str]:
         """Get stored activation token."""
@@ -85,6 +194,155 @@ class ConfigService:
         """Set FFmpeg executable path."""
         self.set("ffmpeg_path", path)
     
+    def get_encoder_profile(self) -> Optional[Dict[str, Any]]:
+        """Get auto-tuned re-encode profile (None = built-in default)."""
+        return self.get("encoder_profile")
+    
+    def set_encoder_profile(self, profile: Dict[str, Any]):
+        """Set re-encode profile."""
+        self.set("encoder_profile", profile)
+    
+    def get_quality_floor(self) -> float:
+        """Get minimum SSIM an auto-tuned profile must reach."""
+        return self.get("quality_floor", 0.95)
+    
+    def set_quality_floor(self, value: float):
+        """Set minimum SSIM for auto-tuning."""
+        self.set("quality_floor", value)
+    
+    def get_batch_size(self) -> int:
+        """Get number of groups produced per FFmpeg process."""
+        return self.get("batch_size", 1)
+    
+    def set_batch_size(self, value: int):
+        """Set number of groups produced per FFmpeg process."""
+        self.set("batch_size", value)
+    
+    def get_dedup_policy(self) -> str:
+        """Get the duplicate input policy ("off", "newest", "largest" or "first")."""
+        return self.get("dedup_policy", "off")
+    
+    def set_dedup_policy(self, value: str):
+        """Set the duplicate input policy."""
+        self.set("dedup_policy", value)
+    
+    def is_loudness_normalization(self) -> bool:
+        """Check if audio loudness is normalized."""
+        return self.get("loudness_normalization", False)
+    
+    def set_loudness_normalization(self, enabled: bool):
+        """Enable/disable audio loudness normalization."""
+        self.set("loudness_normalization", enabled)
+    
+    def get_loudness_target(self) -> float:
+        """Get target integrated loudness in LUFS."""
+        return self.get("loudness_target", -16.0)
+    
+    def set_loudness_target(self, value: float):
+        """Set target integrated loudness in LUFS."""
+        self.set("loudness_target", value)
+    
+    def get_trim(self) -> Dict[str, Any]:
+        """Get clip trim settings: {"head": s, "tail": s, "mode": "keyframe" | "frame"}."""
+        trim = {"head": 0.0, "tail": 0.0, "mode": "keyframe"}
+        trim.update(self.get("trim") or {})
+        return trim
+    
+    def set_trim(self, head: float, tail: float, mode: str):
+        """Set clip trim settings."""
+        self.set("trim", {"head": head, "tail": tail, "mode": mode})
+    
+    def get_bumpers(self) -> Dict[str, str]:
+        """Get intro/outro bumper files: {"intro": path, "outro": path} ("" = none)."""
+        bumpers = {"intro": "", "outro": ""}
+        bumpers.update(self.get("bumpers") or {})
+        return bumpers
+    
+    def set_bumpers(self, intro: str, outro: str):
+        """Set intro/outro bumper files."""
+        self.set("bumpers", {"intro": intro, "outro": outro})
+    
+    def get_prefetch_groups(self) -> int:
+        """Get number of upcoming FFmpeg runs whose inputs are read ahead (0 = off)."""
+        return self.get("prefetch_groups", 2)
+    
+    def get_prefetch_budget_mb(self) -> int:
+        """Get memory budget for read-ahead in MB."""
+        return self.get("prefetch_budget_mb", 512)
+    
+    def is_output_cache_enabled(self) -> bool:
+        """Check if finished outputs are reused across runs."""
+        return self.get("output_cache_enabled", True)
+    
+    def get_output_cache_max_gb(self) -> float:
+        """Get size limit of the output cache in GB."""
+        return self.get("output_cache_max_gb", 10)
+    
+    def get_thumbnail_cache_max_mb(self) -> int:
+        """Get size limit of the thumbnail cache in MB."""
+        return self.get("thumbnail_cache_max_mb", 200)
+    
+    def get_bumper_cache_max_mb(self) -> int:
+        """Get size limit of the bumper variant cache in MB."""
+        return self.get("bumper_cache_max_mb", 2048)
+    
+    def get_max_jobs(self) -> int:
+        """Get maximum number of concurrent FFmpeg jobs."""
+        return self.get("max_jobs", min(4, os.cpu_count() or 1))
+    
+    def set_max_jobs(self, value: int):
+        """Set maximum number of concurrent FFmpeg jobs."""
+        self.set("max_jobs", value)
+    
+    def is_adaptive_concurrency(self) -> bool:
+        """Check if concurrency scales with system load."""
+        return self.get("adaptive_concurrency", True)
+    
+    def set_adaptive_concurrency(self, enabled: bool):
+        """Enable/disable load-based concurrency."""
+        self.set("adaptive_concurrency", enabled)
+    
+    def is_background_priority(self) -> bool:
+        """Check if FFmpeg runs at low CPU/IO priority."""
+        return self.get("background_priority", False)
+    
+    def set_background_priority(self, enabled: bool):
+        """Enable/disable low-priority FFmpeg processes."""
+        self.set("background_priority", enabled)
+    
+    def get_queue_parallel_jobs(self) -> int:
+        """Get number of queued jobs processed at the same time."""
+        return self.get("queue_parallel_jobs", 1)
+    
+    def set_queue_parallel_jobs(self, value: int):
+        """Set number of queued jobs processed at the same time."""
+        self.set("queue_parallel_jobs", value)
+    
+    def get_log_levels(self) -> Dict[str, str]:
+        """Get log level per logger name ("root" for the root logger)."""
+        return self.get("log_levels", {"VideoMixer": "INFO", "urllib3": "WARNING"})
+    
+    def get_log_max_mb(self) -> int:
+        """Get size at which the log file is rotated in MB."""
+        return self.get("log_max_mb", 10)
+    
+    def get_log_retention_days(self) -> int:
+        """Get number of days rotated log files are kept."""
+        return self.get("log_retention_days", 14)
+    
+    def get_log_max_files(self) -> int:
+        """Get maximum number of rotated log files kept."""
+        return self.get("log_max_files", 30)
+    
+    def get_log_settings(self) -> Dict[str, Any]:
+        """Get the settings passed to configure_logging()."""
+        return {
+            "max_mb": self.get_log_max_mb(),
+            "retention_days": self.get_log_retention_days(),
+            "max_files": self.get_log_max_files(),
+            "levels": self.get_log_levels()
+        }
+    
     def get_last_validation_time(self) -> Optional[str]:
         """Get last successful validation timestamp."""
         return self.get("last_validation_time")
@@ -117,5 +375,5 @@ class ConfigService:
         self.set("license_expires_at", expires_at)
 
 
-# Global instance
-config_service = ConfigService()
+# Global instance, created on first use
+config_service = LazyProxy(ConfigService)
@@ -1,12 +1,132 @@
-"""Device fingerprinting service for Windows."""
+"""Device fingerprinting service."""
+import abc
+import hashlib
 import platform
 import subprocess
-import winreg
-from typing import Optional
+import sys
+import threading
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+from app.services.config_service import config_service
+from app.services.logging_service import logger
+
+
+class FingerprintProvider(abc.ABC):
+    """
+    Source of a stable per-device identifier.
+    
+    Providers are asked in order (see register_provider()); the first one
+    that is supported on this platform and returns a value wins.
+    """
+    
+    name = "base"
+    
+    def is_supported(self) -> bool:
+        """Check (cheaply) if the provider can work on this platform."""
+        return True
+    
+    @abc.abstractmethod
+    def get_fingerprint(self) -> Optional[str]:
+        """Get the identifier, or None if it is not available."""
+
+
+class WindowsRegistryProvider(FingerprintProvider):
+    """MachineGuid from the Windows registry."""
+    
+    name = "windows-registry"
+    
+    def is_supported(self) -> bool:
+        return sys.platform == "win32"
+    
+    def get_fingerprint(self) -> Optional[str]:
+        return get_machine_guid()
+
+
+class LinuxMachineIdProvider(FingerprintProvider):
+    """systemd/D-Bus machine-id, falling back to the DMI product UUID."""
+    
+    name = "linux-machine-id"
+    
+    SOURCES = [
+        Path("/etc/machine-id"),
+        Path("/var/lib/dbus/machine-id"),
+        Path("/sys/class/dmi/id/product_uuid"),  # Usually root-only
+    ]
+    
+    def is_supported(self) -> bool:
+        return sys.platform.startswith("linux")
+    
+    def get_fingerprint(self) -> Optional[str]:
+        for source in self.SOURCES:
+            try:
+                value = source.read_text(encoding="ascii").strip()
+            except (OSError, UnicodeDecodeError):
+                continue
+            if value:
+                return value
+        return None
+
+
+class FallbackProvider(FingerprintProvider):
+    """Hostname plus hardware serials (Windows) or the MAC address."""
+    
+    name = "fallback"
+    
+    def get_fingerprint(self) -> Optional[str]:
+        parts = [get_hostname()]
+        
+        if sys.platform == "win32":
+            cpu_serial = get_cpu_serial()
+            if cpu_serial:
+                parts.append(cpu_serial)
+            
+            disk_serial = get_disk_serial()
+            if disk_serial:
+                parts.append(disk_serial)
+        else:
+            node = uuid.getnode()
+            # Bit 40 set means uuid made the address up (no interface found)
+            if not (node >> 40) & 1:
+                parts.append(f"{node:012x}")
+        
+        # Join parts with separator
+        return "|".join(parts)
+
+
+_providers: List[FingerprintProvider] = [
+    WindowsRegistryProvider(),
+    LinuxMachineIdProvider(),
+    FallbackProvider(),
+]
+
+_CACHE_KEY = "device_fingerprint"
+_CHECKSUM_VERSION = "device-fingerprint-v1"
+
+_lock = threading.Lock()
+_fingerprint: Optional[str] = None
+
+
+def register_provider(provider: FingerprintProvider, first: bool = True):
+    """
+    Add a fingerprint provider.
+    
+    Args:
+        provider: Provider to add
+        first: Ask it before the built-in providers (otherwise just before the fallback)
+    """
+    if first:
+        _providers.insert(0, provider)
+    else:
+        _providers.insert(len(_providers) - 1, provider)
 
 
 def get_machine_guid() -> Optional[str]:
     """Get Windows MachineGuid from registry."""
+    try:
+        import winreg
+    except ImportError:
+        return None
     try:
         key = winreg.OpenKey(
             winreg.HKEY_LOCAL_MACHINE,
@@ -58,28 +178,77 @@ def get_disk_serial() -> Optional[str]:
     return None
 
 
-def get_device_fingerprint() -> str:
+def _checksum(value: str, provider: str) -> str:
     """
-    Get device fingerprint.
+    Checksum of a cached fingerprint and the machine it was computed on.
     
-    Primary: MachineGuid from registry
-    Fallback: Combination of hostname + CPU serial + disk serial
+    Catches a corrupted entry or a config file copied from another computer,
+    so the fingerprint is computed again. It is built from public data and
+    anyone can recompute it: it does not protect against deliberate edits.
     """
-    # Try primary method
-    machine_guid = get_machine_guid()
-    if machine_guid:
-        return machine_guid
-    
-    # Fallback method
-    parts = [get_hostname()]
-    
-    cpu_serial = get_cpu_serial()
-    if cpu_serial:
-        parts.append(cpu_serial)
+    parts = [_CHECKSUM_VERSION, get_hostname(), platform.system(), platform.machine(), provider, value]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _load_cached() -> Optional[str]:
+    entry = config_service.get(_CACHE_KEY)
+    if not isinstance(entry, dict):
+        return None
+    value = entry.get("value")
+    provider = entry.get("provider", "")
+    check = entry.get("check", "")
+    if not value or check != _checksum(value, provider):
+        logger.warning("Cached device fingerprint is corrupted or from another machine, recomputing")
+        return None
+    return value
+
+
+def _compute() -> Tuple[str, str]:
+    """Ask the providers in order; returns (fingerprint, provider name)."""
+    for provider in _providers:
+        if not provider.is_supported():
+            continue
+        try:
+            value = provider.get_fingerprint()
+        except Exception as e:
+            logger.warning(f"Fingerprint provider {provider.name} failed: {e}")
+            continue
+        if value:
+            return value, provider.name
+    return get_hostname(), "hostname"
+
+
+def get_device_fingerprint(refresh: bool = False) -> str:
+    """
+    Get device fingerprint.
     
-    disk_serial = get_disk_serial()
-    if disk_serial:
-        parts.append(disk_serial)
+    Computed once by the first working provider (Windows: MachineGuid from
+    registry; Linux: machine-id/DMI; otherwise hostname + hardware serials),
+    then cached in memory and in config, so later calls never run a
+    subprocess.
     
-    # Join parts with separator
-    return "|".join(parts)
+    Args:
+        refresh: Ignore the cache and ask the providers again
+    """
+    global _fingerprint
+    with _lock:
+        if _fingerprint and not refresh:
+            return _fingerprint
+        
+        value = None if refresh else _load_cached()
+        if not value:
+            value, provider_name = _compute()
+            logger.info(f"Device fingerprint computed by {provider_name}")
+            config_service.set(_CACHE_KEY, {
+                "value": value,
+                "provider": provider_name,
+                "check": _checksum(value, provider_name)
+            })
+        
+        _fingerprint = value
+        return value
+
+
+def prefetch_device_fingerprint():
+    """Compute the fingerprint on a background thread so a later call returns at once."""
+    threading.Thread(target=get_device_fingerprint, name="DeviceFingerprint", daemon=True).start()
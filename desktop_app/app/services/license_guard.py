@@ -1,23 +1,49 @@
 """License guard service for grace period and validation."""
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 from app.services.config_service import config_service
-from app.services.api_client import api_client
 from app.services.logging_service import logger
+from app.utils.lazy import LazyProxy
 from app import APP_VERSION
 
 
 class LicenseGuard:
-    """Service for managing license validation and grace period."""
+    """
+    Service for managing license validation and grace period.
+    
+    Validation results are cached per activation token. A fresh server
+    answer is reused for CACHE_TTL_SECONDS; an offline (grace period)
+    answer only for RETRY_TTL_SECONDS so the server is asked again soon.
+    Concurrent callers share a single in-flight request, and
+    start_background_refresh() keeps the cache warm from a daemon thread
+    so the UI can render from cached_status() without waiting.
+    """
     
     GRACE_DAYS = 7
+    CACHE_TTL_SECONDS = 15 * 60
+    RETRY_TTL_SECONDS = 60
     
     def __init__(self):
         self._last_validation_result: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[bool, Optional[str]]] = None
+        self._cached_token: Optional[str] = None
+        self._expires_at = 0.0  # time.monotonic() deadline of the cached result
+        self._inflight: Optional[threading.Event] = None
+        self._listeners: List[Callable[[bool, Optional[str]], None]] = []
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._stop_refresh = threading.Event()
     
     def is_license_valid(self) -> Tuple[bool, Optional[str]]:
         """
-        Check if license is valid.
+        Check if license is valid (cached result if still fresh).
+        
+        The caller waits for the answer, so the server is asked only once
+        (no retries) and a request already in flight is waited for no
+        longer than one attempt; an unreachable server falls back to the
+        grace period.
         
         Returns:
             (is_valid, reason_if_invalid)
@@ -26,19 +52,151 @@ class LicenseGuard:
         if not token:
             return False, "No activation token found. Please activate your license."
         
-        # Try to validate with server
+        with self._lock:
+            if self._cached is not None and self._cached_token == token and time.monotonic() < self._expires_at:
+                return self._cached
+        return self._validate_shared(token, blocking=True)
+    
+    def cached_status(self) -> Tuple[bool, Optional[str]]:
+        """
+        Get the last known status without any network request.
+        
+        Falls back to the grace period from the last successful validation
+        when nothing was validated in this session yet.
+        """
+        token = config_service.get_activation_token()
+        if not token:
+            return False, "No activation token found. Please activate your license."
+        with self._lock:
+            if self._cached is not None and self._cached_token == token:
+                return self._cached
+        return self._check_grace_period()
+    
+    def refresh_async(self):
+        """Validate in a background thread; listeners are notified with the result."""
+        thread = threading.Thread(target=self._refresh, name="LicenseRefresh", daemon=True)
+        thread.start()
+    
+    def start_background_refresh(self, interval: Optional[float] = None):
+        """Revalidate periodically (default: every CACHE_TTL_SECONDS) until stopped."""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        interval = interval or self.CACHE_TTL_SECONDS
+        self._stop_refresh.clear()
+        
+        def loop():
+            while not self._stop_refresh.wait(interval):
+                self._refresh()
+        
+        self._refresh_thread = threading.Thread(target=loop, name="LicenseRefreshLoop", daemon=True)
+        self._refresh_thread.start()
+    
+    def stop_background_refresh(self):
+        """Stop the periodic revalidation."""
+        self._stop_refresh.set()
+    
+    def add_listener(self, callback: Callable[[bool, Optional[str]], None]):
+        """
+        Register a callback for validation results.
+        
+        Callbacks run on the validating thread; UI code must hand the result
+        over to the GUI thread (e.g. by emitting a Qt signal).
+        """
+        with self._lock:
+            self._listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[[bool, Optional[str]], None]):
+        """Unregister a callback added with add_listener()."""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+    
+    def invalidate(self):
+        """Drop the cached result (e.g. after activation or deactivation)."""
+        with self._lock:
+            self._cached = None
+            self._cached_token = None
+            self._expires_at = 0.0
+    
+    def _refresh(self):
+        token = config_service.get_activation_token()
+        if not token:
+            self._notify((False, "No activation token found. Please activate your license."))
+            return
+        self._validate_shared(token)
+    
+    def _validate_shared(self, token: str, blocking: bool = False) -> Tuple[bool, Optional[str]]:
+        """
+        Validate, joining a request already in flight instead of starting another.
+        
+        A request in flight may be a background one with retries, so a
+        blocking caller waits at most as long as one attempt would take and
+        then falls back to the grace period.
+        """
+        with self._lock:
+            event = self._inflight
+            leader = event is None
+            if leader:
+                event = self._inflight = threading.Event()
+        
+        if not leader:
+            if blocking:
+                from app.services.api_client import APIClient
+                if not event.wait(APIClient.CONNECT_TIMEOUT + APIClient.READ_TIMEOUT):
+                    logger.info("License validation still running, using the grace period meanwhile")
+                    return self._check_grace_period()
+            else:
+                event.wait()
+            with self._lock:
+                if self._cached is not None and self._cached_token == token:
+                    return self._cached
+            return self._check_grace_period()
+        
         try:
-            result = api_client.validate(token, APP_VERSION)
+            status, ttl = self._validate(token, blocking)
+            with self._lock:
+                self._cached = status
+                self._cached_token = token
+                self._expires_at = time.monotonic() + ttl
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+        self._notify(status)
+        return status
+    
+    def _validate(self, token: str, blocking: bool = False) -> Tuple[Tuple[bool, Optional[str]], float]:
+        """
+        Ask the server; returns (status, seconds the status may be cached).
+        
+        Blocking validations are not retried, background ones are.
+        """
+        # Imported here: the client pulls in requests, which startup doesn't need
+        from app.services.api_client import api_client
+        try:
+            result = api_client.validate(token, APP_VERSION, max_retries=0 if blocking else None)
             self._last_validation_result = result
             
             if result.get("valid"):
-                return True, None
+                return (True, None), self.CACHE_TTL_SECONDS
+            elif result.get("reason") == "Network error":
+                # Server unreachable: not a verdict on the license
+                return self._check_grace_period(), self.RETRY_TTL_SECONDS
             else:
-                return False, result.get("reason", "License validation failed")
+                return (False, result.get("reason", "License validation failed")), self.CACHE_TTL_SECONDS
         except Exception as e:
             logger.error(f"Validation error: {e}")
             # Check grace period
-            return self._check_grace_period()
+            return self._check_grace_period(), self.RETRY_TTL_SECONDS
+    
+    def _notify(self, status: Tuple[bool, Optional[str]]):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(*status)
+            except Exception as e:
+                logger.error(f"License listener error: {e}")
     
     def _check_grace_period(self) -> Tuple[bool, Optional[str]]:
         """Check if we're within grace period."""
@@ -68,4 +226,5 @@ class LicenseGuard:
         }
 
 
-license_guard = LicenseGuard()
+# Created on first use
+license_guard = LazyProxy(LicenseGuard)
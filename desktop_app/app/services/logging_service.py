@@ -1,29 +1,162 @@
 """Logging service for file-based logging."""
+import atexit
+import gzip
 import logging
-from datetime import datetime
+import logging.handlers
+import queue
+import shutil
+import time
+from datetime import date
 from pathlib import Path
+from typing import Any, Dict, Optional
 from app.utils.paths import get_logs_dir, ensure_directories
 
 
-def setup_logging():
-    """Setup file-based logging."""
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FILE_NAME = "app.log"
+LOGGER_NAME = "VideoMixer"
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Log file handler that rotates daily and by size.
+    
+    The active file is always app.log. When the day changes or the file
+    exceeds max_bytes it is compressed to app_YYYYMMDD_N.log.gz, and
+    rotated files older than retention_days (or beyond max_files) are
+    deleted. Runs on the QueueListener thread, so compression never
+    happens on the thread that logged.
+    """
+    
+    def __init__(self, logs_dir: Path, max_bytes: int, retention_days: int, max_files: int):
+        self.logs_dir = logs_dir
+        self.retention_days = retention_days
+        self.max_files = max_files
+        log_file = logs_dir / LOG_FILE_NAME
+        super().__init__(log_file, maxBytes=max_bytes, backupCount=0, encoding="utf-8", delay=True)
+        # Day the current file belongs to (an old app.log is rotated on the first record)
+        self._day = date.fromtimestamp(log_file.stat().st_mtime) if log_file.exists() else date.today()
+        self._prune()
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if date.today() != self._day:
+            return True
+        return bool(super().shouldRollover(record))
+    
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        
+        source = Path(self.baseFilename)
+        if source.exists() and source.stat().st_size > 0:
+            stem = f"app_{self._day.strftime('%Y%m%d')}"
+            index = 1
+            while (self.logs_dir / f"{stem}_{index}.log.gz").exists():
+                index += 1
+            target = self.logs_dir / f"{stem}_{index}.log.gz"
+            try:
+                with open(source, "rb") as src, gzip.open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                source.unlink()
+            except OSError:
+                # Keep writing to the uncompressed file rather than losing records
+                pass
+        
+        self._day = date.today()
+        self._prune()
+        if not self.delay:
+            self.stream = self._open()
+    
+    def _prune(self):
+        """Delete rotated files beyond the retention limits."""
+        rotated = []
+        for path in self.logs_dir.glob("app_*.log*"):
+            try:
+                rotated.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        rotated.sort(reverse=True)
+        cutoff = time.time() - self.retention_days * 86400
+        for index, (mtime, path) in enumerate(rotated):
+            if mtime < cutoff or index >= self.max_files:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def apply_log_levels(levels: Dict[str, str]):
+    """
+    Set per-module log levels.
+    
+    Args:
+        levels: Logger name -> level name, e.g. {"VideoMixer": "DEBUG", "urllib3": "WARNING"};
+            "root" sets the root logger
+    """
+    for name, level in levels.items():
+        level_value = logging.getLevelName(str(level).upper())
+        if not isinstance(level_value, int):
+            continue
+        logging.getLogger(None if name == "root" else name).setLevel(level_value)
+
+
+def stop_logging():
+    """Write out queued records and stop the logging thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(settings: Optional[Dict[str, Any]] = None) -> logging.Logger:
+    """
+    Setup file-based logging.
+    
+    Called once by main(); importing this module has no side effects
+    (records logged before are handled by Python's last-resort handler).
+    Records are put on a queue by a QueueHandler and written to the log
+    file and the console by a QueueListener thread, so logging calls (for
+    example from the UI thread) never wait on disk.
+    
+    Args:
+        settings: "max_mb", "retention_days", "max_files" and "levels"
+            (see apply_log_levels()); missing keys use the defaults
+    """
+    global _listener
+    settings = settings or {}
     ensure_directories()
     logs_dir = get_logs_dir()
     
-    # Create log file with timestamp
-    log_file = logs_dir / f"app_{datetime.now().strftime('%Y%m%d')}.log"
-    
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()  # Also log to console
-        ]
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = CompressingRotatingFileHandler(
+        logs_dir,
+        max_bytes=settings.get("max_mb", 10) * 1024 * 1024,
+        retention_days=settings.get("retention_days", 14),
+        max_files=settings.get("max_files", 30)
     )
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()  # Also log to console
+    console_handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    apply_log_levels(settings.get("levels") or {})
+    
+    stop_logging()
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    _listener.start()
+    atexit.register(stop_logging)
     
-    return logging.getLogger("VideoMixer")
+    return logger
 
 
-logger = setup_logging()
+# Plain logger; handlers are attached by configure_logging()
+logger = logging.getLogger(LOGGER_NAME)
@@ -1,21 +1,30 @@
 """Update service for checking and managing app updates."""
+import threading
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 from app.services.config_service import config_service
-from app.services.api_client import api_client
 from app.services.logging_service import logger
+from app.utils.lazy import LazyProxy
 from app.utils.semver import is_newer_version
 from app import APP_VERSION
 
 
 class UpdateService:
-    """Service for checking app updates."""
+    """
+    Service for checking app updates.
+    
+    The server is asked at most every CHECK_INTERVAL_HOURS; in between, the
+    last result persisted in config is used. Requests carry the ETag of the
+    stored result so unchanged release info costs a 304. check_async() runs
+    the check on a daemon thread so the UI never waits on the network.
+    """
     
     CHECK_INTERVAL_HOURS = 12
     
     def __init__(self):
         self._last_check_time: Optional[datetime] = None
-        self._last_check_result: Optional[dict] = None
+        self._last_check_result: Optional[dict] = config_service.get("update_check_result")
+        self._check_lock = threading.Lock()
     
     def should_check(self) -> bool:
         """Check if enough time has passed since last check."""
@@ -23,6 +32,10 @@ class UpdateService:
         if not last_check_str:
             return True
         
+        # A stored result from another app version does not apply
+        if config_service.get("update_check_version") != APP_VERSION:
+            return True
+        
         try:
             last_check = datetime.fromisoformat(last_check_str)
             next_check = last_check + timedelta(hours=self.CHECK_INTERVAL_HOURS)
@@ -37,39 +50,82 @@ class UpdateService:
         Returns:
             Update info dict if update available, None otherwise
         """
-        if not force and not self.should_check():
-            return self._last_check_result
-        
-        try:
-            logger.info(f"Checking for updates (current version: {APP_VERSION}, force: {force})")
-            result = api_client.get_latest_release("windows", APP_VERSION)
-            logger.info(f"Update check result: {result}")
-            self._last_check_result = result
+        # Serialize checks so overlapping callers don't all hit the server
+        with self._check_lock:
+            if not force and not self.should_check():
+                logger.info("Update check skipped (checked recently), using stored result")
+                return self._pending_update(self._last_check_result)
             
-            # Update last check time
-            config_service.set("last_update_check", datetime.utcnow().isoformat())
-            
-            if result.get("update_available"):
-                latest_version = result.get("latest_version")
-                logger.info(f"Update available: {latest_version}")
+            try:
+                logger.info(f"Checking for updates (current version: {APP_VERSION}, force: {force})")
+                # Imported here: the client pulls in requests, which startup doesn't need
+                from app.services.api_client import api_client
+                etag = None
+                if self._last_check_result and config_service.get("update_check_version") == APP_VERSION:
+                    etag = config_service.get("update_check_etag")
+                result = api_client.get_latest_release("windows", APP_VERSION, etag)
                 
-                # Check if this version was skipped
-                if latest_version and config_service.is_version_skipped(latest_version):
-                    logger.info(f"Update {latest_version} was skipped by user")
-                    return None
+                if result.get("error"):
+                    # Try again at the next opportunity; keep the stored result
+                    return self._pending_update(self._last_check_result)
                 
-                return result
-            else:
-                logger.info("No update available")
-            
+                self._last_check_time = datetime.utcnow()
+                with config_service.batch():
+                    if result.get("not_modified"):
+                        logger.info("Release info unchanged (304)")
+                        result = self._last_check_result
+                    else:
+                        logger.info(f"Update check result: {result}")
+                        self._last_check_result = result
+                        config_service.set("update_check_result", result)
+                        config_service.set("update_check_etag", result.get("etag"))
+                        config_service.set("update_check_version", APP_VERSION)
+                    
+                    # Update last check time
+                    config_service.set("last_update_check", self._last_check_time.isoformat())
+                return self._pending_update(result)
+            except Exception as e:
+                logger.error(f"Update check failed: {e}")
+                return None
+    
+    def check_async(self, callback: Callable[[dict], None], force: bool = False):
+        """
+        Check for updates on a background thread.
+        
+        callback(update_info) is called from that thread only when an update
+        is available; UI code must hand it over to the GUI thread (e.g. by
+        emitting a Qt signal).
+        """
+        def run():
+            update_info = self.check_for_updates(force=force)
+            if update_info:
+                callback(update_info)
+        
+        threading.Thread(target=run, name="UpdateCheck", daemon=True).start()
+    
+    def _pending_update(self, result: Optional[dict]) -> Optional[dict]:
+        """Return result if it offers a newer, not skipped version."""
+        if not result or not result.get("update_available"):
+            logger.info("No update available")
             return None
-        except Exception as e:
-            logger.error(f"Update check failed: {e}")
+        
+        latest_version = result.get("latest_version")
+        if latest_version and not is_newer_version(latest_version, APP_VERSION):
             return None
+        
+        logger.info(f"Update available: {latest_version}")
+        
+        # Check if this version was skipped
+        if latest_version and config_service.is_version_skipped(latest_version):
+            logger.info(f"Update {latest_version} was skipped by user")
+            return None
+        
+        return result
     
     def skip_version(self, version: str):
         """Mark a version as skipped."""
         config_service.add_skipped_version(version)
 
 
-update_service = UpdateService()
+# Created on first use
+update_service = LazyProxy(UpdateService)
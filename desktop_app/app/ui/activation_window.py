@@ -9,8 +9,7 @@ from PySide6.QtGui import QDesktopServices, QFont, QPixmap, QIcon
 from pathlib import Path
 from app.ui.icon_helper import set_icon_to_label, create_icon_label
 from datetime import datetime
-from app.services.device_fingerprint import get_device_fingerprint
-from app.services.api_client import api_client
+from app.services.device_fingerprint import get_device_fingerprint, prefetch_device_fingerprint
 from app.services.config_service import config_service
 from app.services.logging_service import logger
 from app import APP_VERSION
@@ -28,6 +27,9 @@ class ActivationWindow(QDialog):
         self.setMinimumHeight(450)
         self.setModal(True)
         
+        # Ready by the time the user has typed the license key
+        prefetch_device_fingerprint()
+        
         # Set window icon
         assets_path = Path(__file__).parent / "assets"
         icon_path = assets_path / "logo128x128.png"
@@ -269,9 +271,6 @@ class ActivationWindow(QDialog):
             QMessageBox.warning(self, "Error", "Please enter a license key")
             return
         
-        device_label = self.device_label_input.text().strip() or None
-        device_fingerprint = get_device_fingerprint()
-        
         # Show loading state
         self.activate_button.setEnabled(False)
         self.activate_button.setText("Activating...")
@@ -289,6 +288,8 @@ class ActivationWindow(QDialog):
         device_label = self.device_label_input.text().strip() or None
         device_fingerprint = get_device_fingerprint()
         
+        # Imported here: the client pulls in requests, which startup doesn't need
+        from app.services.api_client import api_client
         try:
             result = api_client.activate(
                 license_key,
@@ -297,14 +298,13 @@ class ActivationWindow(QDialog):
                 device_label
             )
             
-            # Store activation token
-            config_service.set_activation_token(result["activation_token"])
-            
-            # Store license expiration date if available
+            # Store activation token and license expiration date (one write)
             license_info = result.get("license", {})
             expires_at = license_info.get("expires_at")
-            if expires_at:
-                config_service.set_license_expires_at(expires_at)
+            with config_service.batch():
+                config_service.set_activation_token(result["activation_token"])
+                if expires_at:
+                    config_service.set_license_expires_at(expires_at)
             
             # Hide loading
             self.loading_progress.setVisible(False)
@@ -1,17 +1,65 @@
 """Helper functions for loading and displaying SVG icons."""
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 from PySide6.QtWidgets import QLabel
 from PySide6.QtGui import QPixmap, QPainter
-from PySide6.QtSvg import QSvgRenderer
 from PySide6.QtCore import Qt
 
 
+# Rendered icons shared by all widgets: (icon name, logical size, device pixel ratio) -> pixmap
+_pixmap_cache: Dict[Tuple[str, int, float], Optional[QPixmap]] = {}
+
+# Dynamic property remembering which icon a label shows
+_ICON_KEY_PROPERTY = "iconKey"
+
+
 def get_icon_path(icon_name: str) -> Path:
     """Get the path to an icon file."""
     assets_path = Path(__file__).parent / "assets"
     return assets_path / f"icon_{icon_name}.svg"
 
 
+def get_icon_pixmap(icon_name: str, size: int = 16, device_pixel_ratio: float = 1.0) -> Optional[QPixmap]:
+    """
+    Get an SVG icon rendered to a pixmap.
+    
+    Each (icon, size, device pixel ratio) is rendered once per process and
+    then served from the cache; the pixmap is rendered at physical
+    resolution so icons stay sharp on high-DPI screens.
+    
+    Returns:
+        The pixmap, or None if the icon file does not exist
+    """
+    key = (icon_name, size, device_pixel_ratio)
+    if key in _pixmap_cache:
+        return _pixmap_cache[key]
+    
+    pixmap = None
+    icon_path = get_icon_path(icon_name)
+    if icon_path.exists():
+        # QtSvg is loaded with the first icon, not at import
+        from PySide6.QtSvg import QSvgRenderer
+        
+        # Load SVG and render to pixmap
+        renderer = QSvgRenderer(str(icon_path))
+        physical_size = max(1, round(size * device_pixel_ratio))
+        pixmap = QPixmap(physical_size, physical_size)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        
+        painter = QPainter(pixmap)
+        renderer.render(painter)
+        painter.end()
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+    
+    _pixmap_cache[key] = pixmap
+    return pixmap
+
+
+def clear_icon_cache():
+    """Drop all rendered icons (e.g. after the icon files changed)."""
+    _pixmap_cache.clear()
+
+
 def create_icon_label(icon_name: str, size: int = 16) -> QLabel:
     """
     Create a QLabel with an SVG icon.
@@ -32,23 +80,21 @@ def set_icon_to_label(label: QLabel, icon_name: str, size: int = 16):
     """
     Set an SVG icon to an existing QLabel.
     
+    Does nothing if the label already shows this icon at this size.
+    
     Args:
         label: The QLabel to set the icon to
         icon_name: Name of the icon (without 'icon_' prefix and '.svg' extension)
         size: Size of the icon in pixels (default: 16)
     """
-    icon_path = get_icon_path(icon_name)
+    device_pixel_ratio = label.devicePixelRatioF()
+    key = f"{icon_name}@{size}x{device_pixel_ratio}"
+    if label.property(_ICON_KEY_PROPERTY) == key:
+        return
+    label.setProperty(_ICON_KEY_PROPERTY, key)
     
-    if icon_path.exists():
-        # Load SVG and render to pixmap
-        renderer = QSvgRenderer(str(icon_path))
-        pixmap = QPixmap(size, size)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        
-        painter = QPainter(pixmap)
-        renderer.render(painter)
-        painter.end()
-        
+    pixmap = get_icon_pixmap(icon_name, size, device_pixel_ratio)
+    if pixmap is not None:
         label.setPixmap(pixmap)
         label.setFixedSize(size, size)
     else:
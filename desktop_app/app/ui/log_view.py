@@ -0,0 +1,228 @@
+"""Buffered, virtualized processing log."""
+import logging
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QSpinBox, QListView
+from PySide6.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+from PySide6.QtGui import QColor
+from app.services.logging_service import logger
+
+
+class LogEntry(NamedTuple):
+    """One line of the processing log."""
+    timestamp: float
+    level: int  # logging level
+    group: Optional[int]  # 1-based group number the line refers to, if any
+    text: str
+
+
+_GROUP_PATTERN = re.compile(r"\b[Gg]roup (\d+)\b")
+
+_LEVEL_COLORS = {
+    logging.INFO: "#7ee787",
+    logging.WARNING: "#d29922",
+    logging.ERROR: "#f85149",
+}
+
+
+def classify_message(message: str) -> int:
+    """Guess the logging level of a worker progress message."""
+    if "✗" in message or "Error" in message:
+        return logging.ERROR
+    if "Warning" in message:
+        return logging.WARNING
+    return logging.INFO
+
+
+def parse_group(message: str) -> Optional[int]:
+    """Get the group number a message refers to ("Group 3 completed" -> 3)."""
+    match = _GROUP_PATTERN.search(message)
+    return int(match.group(1)) if match else None
+
+
+class LogModel(QAbstractListModel):
+    """
+    List model for the processing log.
+    
+    append() only buffers the message; the buffer is flushed to the view
+    (and to the log file) once per FLUSH_INTERVAL_MS, so a burst of
+    progress signals costs one row insertion instead of one per message.
+    At most MAX_LINES lines are kept, oldest dropped first.
+    """
+    
+    FLUSH_INTERVAL_MS = 100
+    MAX_LINES = 5000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries: deque = deque()
+        self._pending: List[LogEntry] = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        # Optional: entry -> cached thumbnail image shown in the tooltip
+        self.thumbnail_source: Optional[Callable[[LogEntry], Optional[Path]]] = None
+    
+    def append(self, message: str, level: Optional[int] = None):
+        """Queue a message for display (GUI thread only)."""
+        entry = LogEntry(time.time(), level if level is not None else classify_message(message),
+                         parse_group(message), message)
+        self._pending.append(entry)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def flush(self):
+        """Move buffered messages into the model."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        
+        for entry in pending:
+            logger.log(entry.level, entry.text)
+        
+        # Only the newest MAX_LINES of the batch can survive
+        pending = pending[-self.MAX_LINES:]
+        overflow = len(self._entries) + len(pending) - self.MAX_LINES
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._entries.popleft()
+            self.endRemoveRows()
+        
+        start = len(self._entries)
+        self.beginInsertRows(QModelIndex(), start, start + len(pending) - 1)
+        self._entries.extend(pending)
+        self.endInsertRows()
+    
+    def clear(self):
+        """Remove all lines (buffered ones included)."""
+        self._pending = []
+        self._flush_timer.stop()
+        self.beginResetModel()
+        self._entries.clear()
+        self.endResetModel()
+    
+    def entry(self, row: int) -> LogEntry:
+        return self._entries[row]
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+    
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry.text
+        if role == Qt.ToolTipRole:
+            stamp = time.strftime("%H:%M:%S", time.localtime(entry.timestamp))
+            image = self.thumbnail_source(entry) if self.thumbnail_source else None
+            if image is not None:
+                return f"{stamp}<br><img src=\"{image.as_uri()}\">"
+            return stamp
+        if role == Qt.ForegroundRole:
+            return QColor(_LEVEL_COLORS.get(entry.level, "#7ee787"))
+        return None
+
+
+class LogFilterProxy(QSortFilterProxyModel):
+    """Filters log lines by minimum level and by group."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._min_level = logging.NOTSET
+        self._group: Optional[int] = None
+    
+    def set_min_level(self, level: int):
+        self.beginFilterChange()
+        self._min_level = level
+        self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
+    
+    def set_group(self, group: Optional[int]):
+        self.beginFilterChange()
+        self._group = group
+        self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
+    
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if self._min_level == logging.NOTSET and self._group is None:
+            return True
+        entry = self.sourceModel().entry(source_row)
+        if entry.level < self._min_level:
+            return False
+        return self._group is None or entry.group == self._group
+
+
+class LogView(QWidget):
+    """Processing log with level and group filters."""
+    
+    LEVEL_FILTERS = [
+        ("All messages", logging.NOTSET),
+        ("Warnings and errors", logging.WARNING),
+        ("Errors only", logging.ERROR),
+    ]
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = LogModel(self)
+        self.proxy = LogFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(6)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        filter_layout = QHBoxLayout()
+        filter_layout.setSpacing(8)
+        self.level_combo = QComboBox()
+        for label, _ in self.LEVEL_FILTERS:
+            self.level_combo.addItem(label)
+        self.level_combo.currentIndexChanged.connect(
+            lambda index: self.proxy.set_min_level(self.LEVEL_FILTERS[index][1])
+        )
+        filter_layout.addWidget(self.level_combo)
+        
+        filter_layout.addWidget(QLabel("Group:"))
+        self.group_spin = QSpinBox()
+        self.group_spin.setRange(0, 999999)
+        self.group_spin.setSpecialValueText("All")
+        self.group_spin.setToolTip("Show only lines about this group (All = no filter)")
+        self.group_spin.valueChanged.connect(lambda value: self.proxy.set_group(value or None))
+        filter_layout.addWidget(self.group_spin)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+        
+        # Uniform item sizes let the view lay out only the visible rows
+        self.list_view = QListView()
+        self.list_view.setObjectName("logView")
+        self.list_view.setModel(self.proxy)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setEditTriggers(QListView.NoEditTriggers)
+        self.list_view.setSelectionMode(QListView.ExtendedSelection)
+        self.list_view.setMaximumHeight(120)
+        layout.addWidget(self.list_view)
+        self.setLayout(layout)
+        
+        self._follow = True
+        self.list_view.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.proxy.rowsInserted.connect(self._scroll_if_following)
+    
+    def append(self, message: str, level: Optional[int] = None):
+        """Add a message (shown with the next flush)."""
+        self.model.append(message, level)
+    
+    def clear(self):
+        """Remove all messages."""
+        self.model.clear()
+        self._follow = True
+    
+    def _on_scrolled(self, value: int):
+        # Keep following new lines only while the user is at the bottom
+        self._follow = value >= self.list_view.verticalScrollBar().maximum()
+    
+    def _scroll_if_following(self):
+        if self._follow:
+            self.list_view.scrollToBottom()
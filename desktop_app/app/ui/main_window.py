@@ -1,33 +1,70 @@
 """Main application window."""
+import re
 from pathlib import Path
 from datetime import datetime, timezone
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QLineEdit, QComboBox, QSpinBox, QTextEdit,
-    QFileDialog, QMessageBox, QGroupBox, QFormLayout, QFrame, QDialog
+    QPushButton, QLineEdit, QComboBox, QSpinBox, QDoubleSpinBox,
+    QFileDialog, QMessageBox, QGroupBox, QFormLayout, QFrame, QDialog, QCheckBox
 )
-from PySide6.QtCore import Qt, QTimer, QUrl
+from PySide6.QtCore import Qt, QTimer, QUrl, Signal
 from PySide6.QtGui import QFont, QIcon
 from PySide6.QtGui import QDesktopServices
 from app.ui.icon_helper import set_icon_to_label, create_icon_label
-from app.ui.activation_window import ActivationWindow
-from app.ui.update_dialog import UpdateDialog
+from app.ui.queue_dialog import QueueDialog
+from app.ui.plan_dialog import PlanDialog
+from app.ui.thumbnail_loader import ThumbnailLoader
 from app.ui.widgets import ProgressWidget
-from app.core.worker import VideoProcessingWorker
+from app.ui.style_helper import set_style_state
+from app.ui.log_view import LogView
+from app.core.worker import VideoProcessingWorker, EncoderAutoTuneWorker
+from app.core.autotune import EncoderProfile
+from app.core.job_queue import JobQueue, JobQueueRunner, QueuedJob, JobStatus, create_worker
+from app.core.output_cache import OutputStore
+from app.core.dedup import DedupPolicy
+from app.core.trim import TrimMode
 from app.core.grouper import SortMode, RemainderBehavior
+from app.core.scheduler import SchedulePolicy, parse_pinned_groups
 from app.services.config_service import config_service
 from app.services.license_guard import license_guard
 from app.services.update_service import update_service
 from app.services.logging_service import logger
+from app.utils.paths import get_output_cache_dir, get_job_queue_file, get_thumbnail_cache_dir
+from app.utils.lazy import is_initialized
 from app import APP_VERSION
 
+# Order of the Duplicates combo box
+_DEDUP_POLICIES = [DedupPolicy.OFF, DedupPolicy.KEEP_NEWEST, DedupPolicy.KEEP_LARGEST, DedupPolicy.KEEP_FIRST]
+# Order of the Trim mode combo box
+_TRIM_MODES = [TrimMode.KEYFRAME, TrimMode.FRAME]
+
+# Log line of a finished output ("Successfully created: group_001.mp4 (...)")
+_CREATED_PATTERN = re.compile(r"Successfully created: (.+?\.\w+)(?: \(|$)")
+
 
 class MainWindow(QMainWindow):
     """Main application window."""
     
+    # Emitted (from the validating thread) when a license check finishes
+    license_status_changed = Signal(bool, object)  # is_valid, reason
+    # Emitted (from the update check thread) when a newer version is available
+    update_available = Signal(dict)
+    
     def __init__(self):
         super().__init__()
         self.worker: VideoProcessingWorker = None
+        self.autotune_worker: EncoderAutoTuneWorker = None
+        self._completed_groups = 0
+        self._cancelling = False  # Cancel requested, waiting for the worker's finished signal
+        
+        # Persistent job queue (survives restarts)
+        self.job_queue = JobQueue(get_job_queue_file())
+        self.queue_runner = JobQueueRunner(self.job_queue, self)
+        self.queue_runner.job_progress.connect(self._on_queue_progress)
+        self.queue_runner.job_changed.connect(self._on_queue_job_changed)
+        self.queue_runner.queue_finished.connect(self._on_queue_finished)
+        self.queue_dialog: QueueDialog = None
+        self._thumbnail_loader: ThumbnailLoader = None  # Created on first use
         self.setWindowTitle(f"Video Mixer Concat v{APP_VERSION}")
         self.setMinimumSize(1000, 930)
         self.resize(1000, 930)  # Set initial size
@@ -173,8 +210,8 @@ class MainWindow(QMainWindow):
                 background-color: #553098;
             }}
             
-            /* Log TextEdit */
-            QTextEdit {{
+            /* Log view */
+            QListView#logView {{
                 border: 1px solid #30363d;
                 border-radius: 8px;
                 background-color: #0d1117;
@@ -186,7 +223,7 @@ class MainWindow(QMainWindow):
             }}
             
             /* Spinbox - Transparent Background */
-            QSpinBox {{
+            QSpinBox, QDoubleSpinBox {{
                 padding: 8px 12px;
                 border: 1px solid #30363d;
                 border-radius: 8px;
@@ -195,28 +232,30 @@ class MainWindow(QMainWindow):
                 min-width: 120px;
                 font-size: 13px;
             }}
-            QSpinBox:focus {{
+            QSpinBox:focus, QDoubleSpinBox:focus {{
                 border: 1px solid #58a6ff;
             }}
-            QSpinBox:hover {{
+            QSpinBox:hover, QDoubleSpinBox:hover {{
                 border: 1px solid #484f58;
             }}
-            QSpinBox::up-button, QSpinBox::down-button {{
+            QSpinBox::up-button, QSpinBox::down-button,
+            QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {{
                 background-color: transparent;
                 border: none;
                 width: 20px;
                 border-radius: 4px;
                 margin: 2px;
             }}
-            QSpinBox::up-button:hover, QSpinBox::down-button:hover {{
+            QSpinBox::up-button:hover, QSpinBox::down-button:hover,
+            QDoubleSpinBox::up-button:hover, QDoubleSpinBox::down-button:hover {{
                 background-color: #21262d;
             }}
-            QSpinBox::up-arrow {{
+            QSpinBox::up-arrow, QDoubleSpinBox::up-arrow {{
                 image: url({arrow_up});
                 width: 12px;
                 height: 12px;
             }}
-            QSpinBox::down-arrow {{
+            QSpinBox::down-arrow, QDoubleSpinBox::down-arrow {{
                 image: url({arrow_down});
                 width: 12px;
                 height: 12px;
@@ -275,13 +314,55 @@ class MainWindow(QMainWindow):
                 background-color: #6e40c9;
             }}
             
-            /* License Info Frame */
+            /* License Info Frame (state set by _update_license_info) */
             QFrame#licenseInfoFrame {{
                 background-color: #0d1117;
                 border: 1px solid #238636;
                 border-radius: 10px;
                 padding: 8px;
             }}
+            QFrame#licenseInfoFrame[state="invalid"] {{
+                border: 1px solid #f85149;
+            }}
+            QLabel#licenseStatusLabel {{
+                font-weight: bold;
+                color: #3fb950;
+                font-size: 13px;
+            }}
+            QLabel#licenseStatusLabel[state="invalid"] {{
+                color: #f85149;
+            }}
+            QLabel#licenseExpiresLabel {{
+                color: #8b949e;
+                font-size: 12px;
+            }}
+            QLabel#licenseExpiresLabel[state="soon"] {{
+                color: #d29922;
+                font-weight: bold;
+            }}
+            QLabel#licenseExpiresLabel[state="expired"] {{
+                color: #f85149;
+                font-weight: bold;
+            }}
+            QLabel#licenseExpiresLabel[state="unknown"] {{
+                color: #6e7681;
+            }}
+            
+            /* Video count (state set by _update_video_count) */
+            QLabel#videoCountLabel {{
+                color: #6e7681;
+                font-size: 11px;
+                font-style: italic;
+            }}
+            QLabel#videoCountLabel[state="found"] {{
+                color: #3fb950;
+                font-weight: bold;
+                font-style: normal;
+            }}
+            QLabel#videoCountLabel[state="error"] {{
+                color: #f85149;
+                font-style: normal;
+            }}
             
             /* Scrollbar */
             QScrollBar:vertical {{
@@ -305,19 +386,24 @@ class MainWindow(QMainWindow):
         # Setup UI
         self._setup_ui()
         
-        # Setup license validation timer (every 24 hours)
-        self.validation_timer = QTimer()
-        self.validation_timer.timeout.connect(self._check_license)
-        self.validation_timer.start(24 * 60 * 60 * 1000)  # 24 hours
-        
-        # Check license on startup
-        self._check_license()
-        
-        # Check for updates
-        self._check_updates()
+        # Render the license state from cache right away; the server answer
+        # arrives through license_status_changed and is refreshed periodically
+        self._activation_open = False
+        self._license_listener = self.license_status_changed.emit
+        self.license_status_changed.connect(self._on_license_status)
+        license_guard.add_listener(self._license_listener)
+        self._update_license_info(*license_guard.cached_status())
+        license_guard.refresh_async()
+        license_guard.start_background_refresh()
         
-        # Update license info display
-        self._update_license_info()
+        # Check for updates in the background; the service only asks the server
+        # every CHECK_INTERVAL_HOURS and otherwise answers from config
+        self._shown_update_versions = set()
+        self.update_available.connect(self._on_update_available)
+        self._check_updates(force=False)
+        self.update_timer = QTimer(self)
+        self.update_timer.timeout.connect(lambda: self._check_updates(force=False))
+        self.update_timer.start(60 * 60 * 1000)  # Hourly
     
     def _setup_ui(self):
         """Setup the user interface."""
@@ -381,11 +467,7 @@ class MainWindow(QMainWindow):
         status_row.setContentsMargins(0, 0, 0, 0)
         self.license_status_icon = create_icon_label("key", 16)
         self.license_status_label = QLabel("License: Not Activated")
-        self.license_status_label.setStyleSheet("""
-            font-weight: bold;
-            color: #3fb950;
-            font-size: 13px;
-        """)
+        self.license_status_label.setObjectName("licenseStatusLabel")
         status_row.addWidget(self.license_status_icon)
         status_row.addWidget(self.license_status_label)
         status_row.addStretch()
@@ -397,10 +479,7 @@ class MainWindow(QMainWindow):
         expires_row.setContentsMargins(0, 0, 0, 0)
         self.license_expires_icon = create_icon_label("calendar", 14)
         self.license_expires_label = QLabel("No expiration date")
-        self.license_expires_label.setStyleSheet("""
-            color: #8b949e;
-            font-size: 12px;
-        """)
+        self.license_expires_label.setObjectName("licenseExpiresLabel")
         expires_row.addWidget(self.license_expires_icon)
         expires_row.addWidget(self.license_expires_label)
         expires_row.addStretch()
@@ -460,7 +539,7 @@ class MainWindow(QMainWindow):
         video_count_row.setContentsMargins(0, 0, 0, 0)
         self.input_video_count_icon = create_icon_label("video", 12)
         self.input_video_count_label = QLabel("0 videos found")
-        self.input_video_count_label.setStyleSheet("color: #6e7681; font-size: 11px; font-style: italic;")
+        self.input_video_count_label.setObjectName("videoCountLabel")
         video_count_row.addWidget(self.input_video_count_icon)
         video_count_row.addWidget(self.input_video_count_label)
         video_count_row.addStretch()
@@ -572,6 +651,20 @@ class MainWindow(QMainWindow):
         self.remainder_combo.addItems(["Ignore", "Export Single", "Warn"])
         settings_layout.addRow(remainder_label, self.remainder_combo)
         
+        # Duplicates (near-identical inputs)
+        dedup_label = QLabel("Duplicates:")
+        dedup_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
+        self.dedup_combo = QComboBox()
+        self.dedup_combo.addItems(["Keep All", "Skip, Keep Newest", "Skip, Keep Largest", "Skip, Keep First"])
+        self.dedup_combo.setToolTip(
+            "Detect the same footage saved under different names (compares a few\n"
+            "frames and the duration) and use only one file of each set."
+        )
+        dedup_policies = [policy.value for policy in _DEDUP_POLICIES]
+        current_policy = config_service.get_dedup_policy()
+        self.dedup_combo.setCurrentIndex(dedup_policies.index(current_policy) if current_policy in dedup_policies else 0)
+        settings_layout.addRow(dedup_label, self.dedup_combo)
+        
         # Output Naming
         naming_label = QLabel("Output Naming:")
         naming_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
@@ -580,6 +673,176 @@ class MainWindow(QMainWindow):
         self.naming_pattern_edit.setPlaceholderText("group_{group}.mp4")
         settings_layout.addRow(naming_label, self.naming_pattern_edit)
         
+        # Schedule (execution order)
+        schedule_label = QLabel("Schedule:")
+        schedule_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
+        self.schedule_combo = QComboBox()
+        self.schedule_combo.addItems(["Index Order", "Shortest First", "Longest First", "Pinned First"])
+        self.schedule_combo.setToolTip(
+            "Order in which groups are processed. Output names always keep\n"
+            "the original group number."
+        )
+        self.pinned_groups_edit = QLineEdit()
+        self.pinned_groups_edit.setPlaceholderText("Group numbers to run first, e.g. 5, 2")
+        self.pinned_groups_edit.setEnabled(False)
+        self.schedule_combo.currentIndexChanged.connect(
+            lambda index: self.pinned_groups_edit.setEnabled(index == 3)
+        )
+        schedule_layout = QHBoxLayout()
+        schedule_layout.setSpacing(10)
+        schedule_layout.addWidget(self.schedule_combo)
+        schedule_layout.addWidget(self.pinned_groups_edit, 1)
+        settings_layout.addRow(schedule_label, schedule_layout)
+        
+        # Batch size (groups per FFmpeg process)
+        batch_size_label = QLabel("Batch Size:")
+        batch_size_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
+        self.batch_size_spin = QSpinBox()
+        self.batch_size_spin.setMinimum(1)
+        self.batch_size_spin.setMaximum(64)
+        self.batch_size_spin.setValue(config_service.get_batch_size())
+        self.batch_size_spin.setToolTip(
+            "Number of groups produced by one FFmpeg process.\n"
+            "Raise this for many short clips to avoid per-group startup cost."
+        )
+        settings_layout.addRow(batch_size_label, self.batch_size_spin)
+        
+        # Parallel jobs (adaptive concurrency)
+        jobs_label = QLabel("Parallel Jobs:")
+        jobs_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
+        self.max_jobs_spin = QSpinBox()
+        self.max_jobs_spin.setMinimum(1)
+        self.max_jobs_spin.setMaximum(16)
+        self.max_jobs_spin.setValue(config_service.get_max_jobs())
+        self.max_jobs_spin.setToolTip("Maximum number of FFmpeg jobs running at once")
+        self.adaptive_jobs_check = QCheckBox("Adapt to system load")
+        self.adaptive_jobs_check.setChecked(config_service.is_adaptive_concurrency())
+        self.adaptive_jobs_check.setToolTip(
+            "Start with one job and add or remove jobs based on CPU, disk and memory pressure"
+        )
+        jobs_layout = QHBoxLayout()
+        jobs_layout.setSpacing(10)
+        jobs_layout.addWidget(self.max_jobs_spin)
+        jobs_layout.addWidget(self.adaptive_jobs_check, 1)
+        settings_layout.addRow(jobs_label, jobs_layout)
+        
+        # Trim (head/tail of every clip)
+        trim_label = QLabel("Trim:")
+        trim_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
+        trim = config_service.get_trim()
+        self.trim_head_spin = QDoubleSpinBox()
+        self.trim_head_spin.setDecimals(1)
+        self.trim_head_spin.setRange(0.0, 3600.0)
+        self.trim_head_spin.setPrefix("Start ")
+        self.trim_head_spin.setSuffix(" s")
+        self.trim_head_spin.setValue(trim["head"])
+        self.trim_head_spin.setToolTip("Seconds cut from the start of every clip")
+        self.trim_tail_spin = QDoubleSpinBox()
+        self.trim_tail_spin.setDecimals(1)
+        self.trim_tail_spin.setRange(0.0, 3600.0)
+        self.trim_tail_spin.setPrefix("End ")
+        self.trim_tail_spin.setSuffix(" s")
+        self.trim_tail_spin.setValue(trim["tail"])
+        self.trim_tail_spin.setToolTip("Seconds cut from the end of every clip")
+        self.trim_mode_combo = QComboBox()
+        self.trim_mode_combo.addItems(["Keyframe (copy only)", "Frame-accurate"])
+        self.trim_mode_combo.setCurrentIndex(1 if trim["mode"] == TrimMode.FRAME.value else 0)
+        self.trim_mode_combo.setToolTip(
+            "Keyframe: each cut moves inwards to the nearest keyframe (outwards if no keyframe\n"
+            "lies between the cuts), nothing is re-encoded.\n"
+            "Frame-accurate: the frames up to those keyframes are re-encoded. If these pieces\n"
+            "cannot match the clip's stream parameters (most camera footage), the whole group\n"
+            "is re-encoded so the cuts stay exact."
+        )
+        trim_layout = QHBoxLayout()
+        trim_layout.setSpacing(10)
+        trim_layout.addWidget(self.trim_head_spin)
+        trim_layout.addWidget(self.trim_tail_spin)
+        trim_layout.addWidget(self.trim_mode_combo, 1)
+        settings_layout.addRow(trim_label, trim_layout)
+        
+        # Bumpers (intro/outro around every output)
+        bumpers_label = QLabel("Bumpers:")
+        bumpers_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
+        bumpers = config_service.get_bumpers()
+        self.intro_edit = QLineEdit()
+        self.intro_edit.setText(bumpers["intro"])
+        self.intro_edit.setPlaceholderText("Intro video (optional)")
+        self.intro_edit.setClearButtonEnabled(True)
+        self.intro_edit.setToolTip("Joined before every output")
+        intro_browse = QPushButton("Browse...")
+        intro_browse.setObjectName("browseButton")
+        intro_browse.clicked.connect(lambda: self._browse_bumper(self.intro_edit, "Intro"))
+        self.outro_edit = QLineEdit()
+        self.outro_edit.setText(bumpers["outro"])
+        self.outro_edit.setPlaceholderText("Outro video (optional)")
+        self.outro_edit.setClearButtonEnabled(True)
+        self.outro_edit.setToolTip("Joined after every output")
+        outro_browse = QPushButton("Browse...")
+        outro_browse.setObjectName("browseButton")
+        outro_browse.clicked.connect(lambda: self._browse_bumper(self.outro_edit, "Outro"))
+        bumpers_label.setToolTip(
+            "Bumpers are encoded once per stream format of the footage and cached.\n"
+            "H.264 groups are still stream-copied (tagged avc3 when the bumper's stream\n"
+            "parameters differ); other groups whose parameters differ are re-encoded.\n"
+            "The log shows how many groups were re-encoded."
+        )
+        bumpers_layout = QHBoxLayout()
+        bumpers_layout.setSpacing(10)
+        bumpers_layout.addWidget(self.intro_edit, 1)
+        bumpers_layout.addWidget(intro_browse)
+        bumpers_layout.addWidget(self.outro_edit, 1)
+        bumpers_layout.addWidget(outro_browse)
+        settings_layout.addRow(bumpers_label, bumpers_layout)
+        
+        # Audio loudness normalization
+        audio_label = QLabel("Audio:")
+        audio_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
+        self.loudness_check = QCheckBox("Normalize loudness")
+        self.loudness_check.setChecked(config_service.is_loudness_normalization())
+        self.loudness_check.setToolTip(
+            "Bring every clip to the same loudness (EBU R128). Each file is measured once\n"
+            "and the result is cached; the audio is re-encoded, video is still copied."
+        )
+        self.loudness_target_spin = QDoubleSpinBox()
+        self.loudness_target_spin.setDecimals(1)
+        self.loudness_target_spin.setRange(-30.0, -5.0)
+        self.loudness_target_spin.setSingleStep(1.0)
+        self.loudness_target_spin.setSuffix(" LUFS")
+        self.loudness_target_spin.setValue(config_service.get_loudness_target())
+        self.loudness_target_spin.setEnabled(self.loudness_check.isChecked())
+        self.loudness_check.toggled.connect(self.loudness_target_spin.setEnabled)
+        audio_layout = QHBoxLayout()
+        audio_layout.setSpacing(10)
+        audio_layout.addWidget(self.loudness_check)
+        audio_layout.addWidget(self.loudness_target_spin)
+        audio_layout.addStretch(1)
+        settings_layout.addRow(audio_label, audio_layout)
+        
+        # Re-encode profile (auto-tuned)
+        encoder_label = QLabel("Re-encode:")
+        encoder_label.setStyleSheet("color: #c9d1d9; font-weight: bold;")
+        self.quality_floor_spin = QDoubleSpinBox()
+        self.quality_floor_spin.setDecimals(3)
+        self.quality_floor_spin.setRange(0.800, 0.999)
+        self.quality_floor_spin.setSingleStep(0.005)
+        self.quality_floor_spin.setPrefix("SSIM ≥ ")
+        self.quality_floor_spin.setValue(config_service.get_quality_floor())
+        self.quality_floor_spin.setToolTip("Minimum quality an auto-tuned profile must reach")
+        self.autotune_button = QPushButton("Auto-Tune")
+        self.autotune_button.setObjectName("browseButton")
+        self.autotune_button.setToolTip("Benchmark encoder presets on a sample from the input folder")
+        self.autotune_button.clicked.connect(self._start_autotune)
+        self.encoder_profile_label = QLabel()
+        self.encoder_profile_label.setStyleSheet("color: #6e7681; font-size: 11px;")
+        self._update_encoder_profile_label()
+        encoder_layout = QHBoxLayout()
+        encoder_layout.setSpacing(10)
+        encoder_layout.addWidget(self.quality_floor_spin)
+        encoder_layout.addWidget(self.autotune_button)
+        encoder_layout.addWidget(self.encoder_profile_label, 1)
+        settings_layout.addRow(encoder_label, encoder_layout)
+        
         settings_group.setLayout(settings_layout)
         layout.addWidget(settings_group)
         
@@ -595,11 +858,9 @@ class MainWindow(QMainWindow):
         log_header.addStretch()
         layout.addLayout(log_header)
         
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setMaximumHeight(120)
-        self.log_text.setPlaceholderText("Processing output will appear here...")
-        layout.addWidget(self.log_text)
+        self.log_view = LogView()
+        self.log_view.model.thumbnail_source = self._log_thumbnail
+        layout.addWidget(self.log_view)
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -660,8 +921,65 @@ class MainWindow(QMainWindow):
         self.cancel_button.clicked.connect(self._cancel_processing)
         self.cancel_button.setEnabled(False)
         
+        self.pause_button = QPushButton("⏸  Pause")
+        self.pause_button.setObjectName("pauseButton")
+        self.pause_button.setMinimumHeight(44)
+        self.pause_button.setMinimumWidth(120)
+        self.pause_button.setStyleSheet("""
+            QPushButton {
+                background-color: #9e6a03;
+                color: #ffffff;
+                padding: 10px 20px;
+                border-radius: 8px;
+                font-weight: bold;
+                font-size: 13px;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #bb8009;
+            }
+            QPushButton:pressed {
+                background-color: #845306;
+            }
+            QPushButton:disabled {
+                background-color: #3d2e0f;
+                color: #8b7a54;
+            }
+        """)
+        self.pause_button.clicked.connect(self._toggle_pause)
+        self.pause_button.setEnabled(False)
+        
+        # Can be switched while a batch is running
+        self.background_priority_check = QCheckBox("Background priority")
+        self.background_priority_check.setChecked(config_service.is_background_priority())
+        self.background_priority_check.setToolTip(
+            "Run FFmpeg at low CPU and disk priority so the computer stays responsive"
+        )
+        self.background_priority_check.toggled.connect(self._on_background_priority_toggled)
+        
+        self.preview_plan_button = QPushButton("Preview Plan")
+        self.preview_plan_button.setObjectName("browseButton")
+        self.preview_plan_button.setToolTip("Show which files go into which group before starting")
+        self.preview_plan_button.clicked.connect(self._preview_plan)
+        
+        self.add_to_queue_button = QPushButton("Add to Queue")
+        self.add_to_queue_button.setObjectName("browseButton")
+        self.add_to_queue_button.setToolTip("Queue the selected folders with the current settings")
+        self.add_to_queue_button.clicked.connect(self._add_to_queue)
+        
+        self.queue_button = QPushButton()
+        self.queue_button.setObjectName("browseButton")
+        self.queue_button.setToolTip("Show, run and manage queued jobs")
+        self.queue_button.clicked.connect(self._show_queue)
+        self._update_queue_button()
+        
+        button_layout.addWidget(self.background_priority_check)
+        button_layout.addWidget(self.preview_plan_button)
+        button_layout.addWidget(self.add_to_queue_button)
+        button_layout.addWidget(self.queue_button)
         button_layout.addStretch()
         button_layout.addWidget(self.start_button)
+        button_layout.addWidget(self.pause_button)
         button_layout.addWidget(self.cancel_button)
         layout.addLayout(button_layout)
         
@@ -684,7 +1002,7 @@ class MainWindow(QMainWindow):
         if not folder_path:
             set_icon_to_label(self.input_video_count_icon, "video", 12)
             self.input_video_count_label.setText("0 videos found")
-            self.input_video_count_label.setStyleSheet("color: #6e7681; font-size: 11px; font-style: italic;")
+            set_style_state(self.input_video_count_label, "empty")
             return
         
         try:
@@ -696,24 +1014,24 @@ class MainWindow(QMainWindow):
                 if count == 0:
                     set_icon_to_label(self.input_video_count_icon, "video", 12)
                     self.input_video_count_label.setText("No videos found")
-                    self.input_video_count_label.setStyleSheet("color: #f85149; font-size: 11px;")
+                    set_style_state(self.input_video_count_label, "error")
                 elif count == 1:
                     set_icon_to_label(self.input_video_count_icon, "video", 12)
                     self.input_video_count_label.setText("1 video found")
-                    self.input_video_count_label.setStyleSheet("color: #3fb950; font-size: 11px; font-weight: bold;")
+                    set_style_state(self.input_video_count_label, "found")
                 else:
                     set_icon_to_label(self.input_video_count_icon, "video", 12)
                     self.input_video_count_label.setText(f"{count} videos found")
-                    self.input_video_count_label.setStyleSheet("color: #3fb950; font-size: 11px; font-weight: bold;")
+                    set_style_state(self.input_video_count_label, "found")
             else:
                 set_icon_to_label(self.input_video_count_icon, "warning", 12)
                 self.input_video_count_label.setText("Invalid folder")
-                self.input_video_count_label.setStyleSheet("color: #f85149; font-size: 11px;")
+                set_style_state(self.input_video_count_label, "error")
         except Exception as e:
             logger.error(f"Error scanning video files: {e}")
             set_icon_to_label(self.input_video_count_icon, "warning", 12)
             self.input_video_count_label.setText("Error scanning")
-            self.input_video_count_label.setStyleSheet("color: #f85149; font-size: 11px;")
+            set_style_state(self.input_video_count_label, "error")
     
     def _browse_output_folder(self):
         """Browse for output folder."""
@@ -721,6 +1039,17 @@ class MainWindow(QMainWindow):
         if folder:
             self.output_folder_edit.setText(folder)
     
+    def _browse_bumper(self, edit: QLineEdit, name: str):
+        """Browse for an intro/outro video."""
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            f"Select {name} Video",
+            str(Path(edit.text()).parent) if edit.text() else "",
+            "Videos (*.mp4 *.mov *.mkv *.m4v *.avi *.webm);;All Files (*)"
+        )
+        if path:
+            edit.setText(path)
+    
     def _open_output_folder(self):
         """Open output folder in file explorer."""
         output_folder = self.output_folder_edit.text()
@@ -738,38 +1067,267 @@ class MainWindow(QMainWindow):
                 bool(output_folder) and Path(output_folder).exists()
             )
     
-    def _start_processing(self):
-        """Start video processing."""
+    def _collect_settings(self) -> dict:
+        """Read the settings form into a job settings dict (see create_worker())."""
+        sort_modes = [SortMode.FILENAME, SortMode.TIME, SortMode.RANDOM]
+        remainder_behaviors = [RemainderBehavior.IGNORE, RemainderBehavior.EXPORT_SINGLE, RemainderBehavior.WARN]
+        schedule_policies = [
+            SchedulePolicy.INDEX,
+            SchedulePolicy.SHORTEST_FIRST,
+            SchedulePolicy.LONGEST_FIRST,
+            SchedulePolicy.PRIORITY
+        ]
+        return {
+            "group_size": self.group_size_spin.value(),
+            "sort_mode": sort_modes[self.sort_mode_combo.currentIndex()].value,
+            "remainder_behavior": remainder_behaviors[self.remainder_combo.currentIndex()].value,
+            "output_naming_pattern": self.naming_pattern_edit.text() or "group_{group}.mp4",
+            "encoder_profile": config_service.get_encoder_profile(),
+            "batch_size": self.batch_size_spin.value(),
+            "schedule_policy": schedule_policies[self.schedule_combo.currentIndex()].value,
+            "pinned_groups": parse_pinned_groups(self.pinned_groups_edit.text()),
+            "max_jobs": self.max_jobs_spin.value(),
+            "adaptive_concurrency": self.adaptive_jobs_check.isChecked(),
+            "background_priority": self.background_priority_check.isChecked(),
+            "dedup_policy": _DEDUP_POLICIES[self.dedup_combo.currentIndex()].value,
+            "loudness_normalization": self.loudness_check.isChecked(),
+            "loudness_target": self.loudness_target_spin.value(),
+            "trim_head": self.trim_head_spin.value(),
+            "trim_tail": self.trim_tail_spin.value(),
+            "trim_mode": _TRIM_MODES[self.trim_mode_combo.currentIndex()].value,
+            "intro_path": self.intro_edit.text().strip(),
+            "outro_path": self.outro_edit.text().strip()
+        }
+    
+    def _validate_folders(self) -> bool:
+        """Check the selected folders and bumpers, showing a message if one is invalid."""
         input_folder = self.input_folder_edit.text()
         output_folder = self.output_folder_edit.text()
         
         if not input_folder or not Path(input_folder).exists():
             self._show_message("Error", "Please select a valid input folder", QMessageBox.Warning)
-            return
+            return False
         
         if not output_folder or not Path(output_folder).exists():
             self._show_message("Error", "Please select a valid output folder", QMessageBox.Warning)
+            return False
+        
+        for name, edit in (("intro", self.intro_edit), ("outro", self.outro_edit)):
+            path = edit.text().strip()
+            if path and not Path(path).is_file():
+                self._show_message("Error", f"The {name} video does not exist:\n{path}", QMessageBox.Warning)
+                return False
+        return True
+    
+    def _save_concurrency_settings(self):
+        """Remember batch, parallel job, duplicate, trim, bumper and audio settings for the next start."""
+        with config_service.batch():  # One write for all changed settings
+            if self.batch_size_spin.value() != config_service.get_batch_size():
+                config_service.set_batch_size(self.batch_size_spin.value())
+            if self.max_jobs_spin.value() != config_service.get_max_jobs():
+                config_service.set_max_jobs(self.max_jobs_spin.value())
+            if self.adaptive_jobs_check.isChecked() != config_service.is_adaptive_concurrency():
+                config_service.set_adaptive_concurrency(self.adaptive_jobs_check.isChecked())
+            dedup_policy = _DEDUP_POLICIES[self.dedup_combo.currentIndex()].value
+            if dedup_policy != config_service.get_dedup_policy():
+                config_service.set_dedup_policy(dedup_policy)
+            if self.loudness_check.isChecked() != config_service.is_loudness_normalization():
+                config_service.set_loudness_normalization(self.loudness_check.isChecked())
+            if self.loudness_target_spin.value() != config_service.get_loudness_target():
+                config_service.set_loudness_target(self.loudness_target_spin.value())
+            trim = {
+                "head": self.trim_head_spin.value(),
+                "tail": self.trim_tail_spin.value(),
+                "mode": _TRIM_MODES[self.trim_mode_combo.currentIndex()].value
+            }
+            if trim != config_service.get_trim():
+                config_service.set_trim(trim["head"], trim["tail"], trim["mode"])
+            bumpers = {"intro": self.intro_edit.text().strip(), "outro": self.outro_edit.text().strip()}
+            if bumpers != config_service.get_bumpers():
+                config_service.set_bumpers(bumpers["intro"], bumpers["outro"])
+    
+    def _start_processing(self):
+        """Start video processing."""
+        if not self._validate_folders():
             return
         
-        # Get settings
-        group_size = self.group_size_spin.value()
-        sort_mode_map = {
-            0: SortMode.FILENAME,
-            1: SortMode.TIME,
-            2: SortMode.RANDOM
-        }
-        sort_mode = sort_mode_map[self.sort_mode_combo.currentIndex()]
+        ffmpeg_path = self._resolve_ffmpeg_path()
+        if not ffmpeg_path:
+            return
         
-        remainder_map = {
-            0: RemainderBehavior.IGNORE,
-            1: RemainderBehavior.EXPORT_SINGLE,
-            2: RemainderBehavior.WARN
-        }
-        remainder_behavior = remainder_map[self.remainder_combo.currentIndex()]
+        self._save_concurrency_settings()
         
-        output_pattern = self.naming_pattern_edit.text() or "group_{group}.mp4"
+        # Create worker
+        self.worker = create_worker(
+            Path(self.input_folder_edit.text()),
+            Path(self.output_folder_edit.text()),
+            self._collect_settings(),
+            ffmpeg_path,
+            prefetch_groups=config_service.get_prefetch_groups(),
+            prefetch_budget_mb=config_service.get_prefetch_budget_mb(),
+            output_store=self._create_output_store(),
+            bumper_cache_max_mb=config_service.get_bumper_cache_max_mb()
+        )
+        
+        # Connect signals
+        self.worker.progress.connect(self._on_progress)
+        self.worker.group_complete.connect(self._on_group_complete)
+        self.worker.finished.connect(self._on_finished)
         
-        # Get FFmpeg path - try config first, then find bundled/system FFmpeg
+        # Update UI
+        self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.pause_button.setEnabled(True)
+        self.pause_button.setText("⏸  Pause")
+        self.log_view.clear()
+        self.progress_widget.reset()
+        self._completed_groups = 0
+        self._cancelling = False
+        
+        # Start worker
+        self.worker.start()
+        self._set_thumbnails_throttled(True)
+    
+    def _add_to_queue(self):
+        """Queue the selected folders with the current settings."""
+        if not self._validate_folders():
+            return
+        self._save_concurrency_settings()
+        job = QueuedJob(self.input_folder_edit.text(), self.output_folder_edit.text(), self._collect_settings())
+        self.job_queue.add(job)
+        self._log(f"Queued {job.name} -> {job.output_dir}")
+        self._update_queue_button()
+        if self.queue_dialog:
+            self.queue_dialog.refresh()
+    
+    def _preview_plan(self):
+        """Show the group plan for the current folder and settings."""
+        input_folder = self.input_folder_edit.text()
+        if not input_folder or not Path(input_folder).is_dir():
+            self._show_message("Error", "Please select a valid input folder", QMessageBox.Warning)
+            return
+        ffmpeg_path = self._resolve_ffmpeg_path()
+        if not ffmpeg_path:
+            return
+        dialog = PlanDialog(
+            Path(input_folder), self._collect_settings(), ffmpeg_path, self._get_thumbnail_loader(), self
+        )
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
+    
+    def _get_thumbnail_loader(self):
+        """Create the thumbnail loader on first use (None without FFmpeg)."""
+        if self._thumbnail_loader is None:
+            ffmpeg_path = config_service.get_ffmpeg_path()
+            if not ffmpeg_path or not Path(ffmpeg_path).exists():
+                return None
+            self._thumbnail_loader = ThumbnailLoader(
+                ffmpeg_path,
+                get_thumbnail_cache_dir(),
+                config_service.get_thumbnail_cache_max_mb() * 1024 * 1024,
+                self
+            )
+            busy = bool(self.worker and self.worker.isRunning()) or self.queue_runner.is_running()
+            self._set_thumbnails_throttled(busy)
+        return self._thumbnail_loader
+    
+    def _set_thumbnails_throttled(self, busy: bool):
+        """Keep thumbnail grabs to one at a time while concat jobs run."""
+        if self._thumbnail_loader is not None:
+            self._thumbnail_loader.set_throttled(busy)
+    
+    def _log_thumbnail(self, entry):
+        """Contact sheet of the output a "Successfully created: <name>" log line refers to."""
+        match = _CREATED_PATTERN.search(entry.text)
+        output_folder = self.output_folder_edit.text()
+        if not match or not output_folder:
+            return None
+        loader = self._get_thumbnail_loader()
+        if loader is None:
+            return None
+        return loader.contact_sheet_path(Path(output_folder) / match.group(1))
+    
+    def _show_queue(self):
+        """Show the job queue dialog."""
+        if self.queue_dialog is None:
+            self.queue_dialog = QueueDialog(self.queue_runner, self)
+            self.queue_dialog.run_requested.connect(self._run_queue)
+        self.queue_dialog.refresh()
+        self.queue_dialog.show()
+        self.queue_dialog.raise_()
+        self.queue_dialog.activateWindow()
+    
+    def _run_queue(self):
+        """Start processing the job queue."""
+        if self.worker and self.worker.isRunning():
+            self._show_message("Busy", "Wait for the current processing to finish first", QMessageBox.Warning)
+            return
+        
+        ffmpeg_path = self._resolve_ffmpeg_path()
+        if not ffmpeg_path:
+            return
+        
+        self.log_view.clear()
+        self.progress_widget.reset()
+        self.queue_runner.set_background_priority(self.background_priority_check.isChecked())
+        started = self.queue_runner.start(
+            ffmpeg_path,
+            parallel_jobs=config_service.get_queue_parallel_jobs(),
+            ffmpeg_slots=config_service.get_max_jobs(),
+            output_store=self._create_output_store(),
+            prefetch_groups=config_service.get_prefetch_groups(),
+            prefetch_budget_mb=config_service.get_prefetch_budget_mb(),
+            bumper_cache_max_mb=config_service.get_bumper_cache_max_mb()
+        )
+        if started and self.queue_runner.is_running():
+            self._set_thumbnails_throttled(True)
+            self.start_button.setEnabled(False)
+            self.cancel_button.setEnabled(True)
+            self.pause_button.setEnabled(True)
+            self.pause_button.setText("⏸  Pause")
+        if self.queue_dialog:
+            self.queue_dialog.refresh()
+    
+    def _on_queue_progress(self, job_id: str, message: str):
+        """Show a queued job's progress message in the log."""
+        job = self.job_queue.get(job_id)
+        self._log(f"[{job.name if job else job_id}] {message}")
+    
+    def _on_queue_job_changed(self, job_id: str):
+        """Update overall queue progress."""
+        jobs = self.job_queue.jobs()
+        done = sum(1 for job in jobs if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING))
+        running = [job for job in jobs if job.status == JobStatus.RUNNING]
+        if jobs and self.queue_runner.is_running():
+            text = f"Queue: {done} of {len(jobs)} jobs finished"
+            if running:
+                text += f", running: {', '.join(job.name for job in running)}"
+            self.progress_widget.set_progress(int(done / len(jobs) * 100), text)
+        self._update_queue_button()
+    
+    def _on_queue_finished(self):
+        """Handle job queue finished."""
+        self._set_thumbnails_throttled(False)
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.pause_button.setEnabled(False)
+        self.pause_button.setText("⏸  Pause")
+        self._update_queue_button()
+        
+        jobs = self.job_queue.jobs()
+        failed = [job for job in jobs if job.status in (JobStatus.FAILED, JobStatus.CANCELLED)]
+        completed = sum(1 for job in jobs if job.status == JobStatus.COMPLETED)
+        self._log(f"Job queue finished: {completed} completed, {len(failed)} failed or cancelled")
+        self.progress_widget.set_progress(100, "Queue finished")
+    
+    def _update_queue_button(self):
+        """Show the number of waiting jobs on the Queue button."""
+        waiting = sum(1 for job in self.job_queue.jobs() if job.status in (JobStatus.QUEUED, JobStatus.RUNNING))
+        self.queue_button.setText(f"Queue ({waiting})" if waiting else "Queue")
+    
+    def _resolve_ffmpeg_path(self):
+        """Get FFmpeg path, or show a warning and return None if not found."""
+        # Try config first, then find bundled/system FFmpeg
         ffmpeg_path = config_service.get_ffmpeg_path()
         if not ffmpeg_path or not Path(ffmpeg_path).exists():
             # Try to find FFmpeg (bundled first, then PATH)
@@ -785,32 +1343,70 @@ class MainWindow(QMainWindow):
                     "You can download FFmpeg from https://ffmpeg.org/download.html",
                     QMessageBox.Warning
                 )
-                return
+                return None
+        return ffmpeg_path
+    
+    def _create_output_store(self):
+        """Open the output cache, or return None if disabled/unavailable."""
+        if not config_service.is_output_cache_enabled():
+            return None
+        try:
+            max_bytes = int(config_service.get_output_cache_max_gb() * 1024 ** 3)
+            return OutputStore(get_output_cache_dir(), max_bytes)
+        except OSError as e:
+            logger.warning(f"Output cache unavailable: {e}")
+            return None
+    
+    def _start_autotune(self):
+        """Benchmark encoder presets on the input folder."""
+        input_folder = self.input_folder_edit.text()
+        if not input_folder or not Path(input_folder).exists():
+            self._show_message("Error", "Please select a valid input folder", QMessageBox.Warning)
+            return
         
-        # Create worker
-        self.worker = VideoProcessingWorker(
-            Path(input_folder),
-            Path(output_folder),
-            group_size,
-            sort_mode,
-            remainder_behavior,
-            output_pattern,
-            ffmpeg_path
-        )
+        if self.autotune_worker and self.autotune_worker.isRunning():
+            return
         
-        # Connect signals
-        self.worker.progress.connect(self._on_progress)
-        self.worker.group_complete.connect(self._on_group_complete)
-        self.worker.finished.connect(self._on_finished)
+        ffmpeg_path = self._resolve_ffmpeg_path()
+        if not ffmpeg_path:
+            return
         
-        # Update UI
-        self.start_button.setEnabled(False)
-        self.cancel_button.setEnabled(True)
-        self.log_text.clear()
-        self.progress_widget.reset()
+        quality_floor = self.quality_floor_spin.value()
+        config_service.set_quality_floor(quality_floor)
         
-        # Start worker
-        self.worker.start()
+        self.autotune_worker = EncoderAutoTuneWorker(Path(input_folder), quality_floor, ffmpeg_path)
+        self.autotune_worker.progress.connect(self._on_progress)
+        self.autotune_worker.profile_selected.connect(self._on_profile_selected)
+        self.autotune_worker.finished.connect(self._on_autotune_finished)
+        
+        self.autotune_button.setEnabled(False)
+        self.start_button.setEnabled(False)
+        self.log_view.clear()
+        self.autotune_worker.start()
+    
+    def _on_profile_selected(self, profile: dict):
+        """Store the auto-tuned re-encode profile."""
+        config_service.set_encoder_profile(profile)
+        self._update_encoder_profile_label()
+    
+    def _on_autotune_finished(self, success: bool):
+        """Handle auto-tune finished."""
+        self.autotune_button.setEnabled(True)
+        self.start_button.setEnabled(True)
+        if not success:
+            self._show_message(
+                "Auto-Tune",
+                "No encoder profile met the quality floor. The previous profile is kept.",
+                QMessageBox.Warning
+            )
+    
+    def _update_encoder_profile_label(self):
+        """Show the re-encode profile currently in use."""
+        profile = config_service.get_encoder_profile()
+        if profile:
+            self.encoder_profile_label.setText(f"Using {EncoderProfile.from_dict(profile)}")
+        else:
+            self.encoder_profile_label.setText("Using default (libx264 medium)")
     
     def _show_message(self, title: str, text: str, icon=QMessageBox.Information):
         """Show a styled message box."""
@@ -845,12 +1441,42 @@ class MainWindow(QMainWindow):
     
     def _cancel_processing(self):
         """Cancel video processing."""
+        if self.queue_runner.is_running():
+            # Running jobs stop their FFmpeg processes; queue_finished follows without blocking the GUI
+            self.queue_runner.stop()
+            self._log("⏹ Stopping job queue...")
+            self.cancel_button.setEnabled(False)
+            self.pause_button.setEnabled(False)
+            return
         if self.worker and self.worker.isRunning():
+            # The worker stops its FFmpeg processes and emits finished; don't block the GUI waiting
+            self._cancelling = True
             self.worker.cancel()
-            self.worker.wait()
-            self._log("⏹ Processing cancelled")
-            self.start_button.setEnabled(True)
+            self._log("⏹ Cancelling...")
             self.cancel_button.setEnabled(False)
+            self.pause_button.setEnabled(False)
+    
+    def _toggle_pause(self):
+        """Pause or resume video processing."""
+        if self.queue_runner.is_running():
+            target = self.queue_runner
+        elif self.worker and self.worker.isRunning():
+            target = self.worker
+        else:
+            return
+        if target.is_paused():
+            target.resume()
+            self.pause_button.setText("⏸  Pause")
+        else:
+            target.pause()
+            self.pause_button.setText("▶  Resume")
+    
+    def _on_background_priority_toggled(self, enabled: bool):
+        """Apply background priority to the running batch and remember it."""
+        config_service.set_background_priority(enabled)
+        if self.worker and self.worker.isRunning():
+            self.worker.set_background_priority(enabled)
+        self.queue_runner.set_background_priority(enabled)
     
     def _on_progress(self, message: str):
         """Handle progress message."""
@@ -858,66 +1484,72 @@ class MainWindow(QMainWindow):
     
     def _on_group_complete(self, group_index: int, total: int, success: bool):
         """Handle group completion."""
-        progress = int((group_index / total) * 100)
-        self.progress_widget.set_progress(progress, f"Processing group {group_index} of {total}")
+        # Groups may finish out of index order, so count completions
+        self._completed_groups += 1
+        progress = int((self._completed_groups / total) * 100)
+        self.progress_widget.set_progress(progress, f"Completed {self._completed_groups} of {total} groups")
     
     def _on_finished(self, success: bool):
         """Handle processing finished."""
+        self._set_thumbnails_throttled(False)
         self.start_button.setEnabled(True)
         self.cancel_button.setEnabled(False)
+        self.pause_button.setEnabled(False)
+        self.pause_button.setText("⏸  Pause")
         
-        if success:
+        if self._cancelling:
+            self._cancelling = False
+            self._log("⏹ Processing cancelled")
+        elif success:
             self.progress_widget.set_progress(100, "Processing complete!")
             self._show_message("Success", "Video processing completed successfully!")
         else:
             self._show_message("Warning", "Processing completed with errors. Check the log.", QMessageBox.Warning)
     
     def _log(self, message: str):
-        """Add message to log."""
-        self.log_text.append(message)
-        logger.info(message)
+        """Add message to log (written to the view and log file in batches)."""
+        self.log_view.append(message)
     
-    def _check_license(self):
-        """Check license validity."""
-        is_valid, reason = license_guard.is_license_valid()
-        self._update_license_info()
-        
+    def _on_license_status(self, is_valid: bool, reason):
+        """Handle a finished license validation."""
+        self._update_license_info(is_valid, reason)
         if not is_valid:
+            self._request_activation()
+    
+    def _request_activation(self):
+        """Ask for (re)activation after the license turned out invalid."""
+        if self._activation_open:
+            return
+        self._activation_open = True
+        from app.ui.activation_window import ActivationWindow
+        try:
             activation = ActivationWindow(self)
-            if activation.exec() == QDialog.Accepted:
-                self._check_license()
-            else:
-                self.close()
+            accepted = activation.exec() == QDialog.Accepted
+        finally:
+            self._activation_open = False
+        if accepted:
+            license_guard.invalidate()
+            self._update_license_info()
+            license_guard.refresh_async()
+        else:
+            self.close()
     
-    def _update_license_info(self):
-        """Update license information display."""
+    def _update_license_info(self, is_valid: bool = None, reason=None):
+        """Update license information display (from the cached status if none is given)."""
         token = config_service.get_activation_token()
         if token:
-            is_valid, reason = license_guard.is_license_valid()
+            if is_valid is None:
+                is_valid, reason = license_guard.cached_status()
             if is_valid:
                 set_icon_to_label(self.license_status_icon, "check", 16)
                 self.license_status_label.setText("License: Active")
-                self.license_status_label.setStyleSheet("font-weight: bold; color: #3fb950; font-size: 13px;")
-                self.license_info_frame.setStyleSheet("""
-                    QFrame#licenseInfoFrame {
-                        background-color: #0d1117;
-                        border: 1px solid #238636;
-                        border-radius: 10px;
-                        padding: 8px;
-                    }
-                """)
+                set_style_state(self.license_status_label, "valid")
+                set_style_state(self.license_info_frame, "valid")
             else:
                 set_icon_to_label(self.license_status_icon, "warning", 16)
                 self.license_status_label.setText("License: Invalid")
-                self.license_status_label.setStyleSheet("font-weight: bold; color: #f85149; font-size: 13px;")
-                self.license_info_frame.setStyleSheet("""
-                    QFrame#licenseInfoFrame {
-                        background-color: #0d1117;
-                        border: 1px solid #f85149;
-                        border-radius: 10px;
-                        padding: 8px;
-                    }
-                """)
+                set_style_state(self.license_status_label, "invalid")
+                set_style_state(self.license_info_frame, "invalid")
             
             expires_at = config_service.get_license_expires_at()
             if expires_at:
@@ -935,47 +1567,54 @@ class MainWindow(QMainWindow):
                             f"Expires: {exp_date.strftime('%B %d, %Y')} ({days_until} days remaining)"
                         )
                         if days_until <= 30:
-                            self.license_expires_label.setStyleSheet("color: #d29922; font-size: 12px; font-weight: bold;")
+                            set_style_state(self.license_expires_label, "soon")
                         else:
-                            self.license_expires_label.setStyleSheet("color: #8b949e; font-size: 12px;")
+                            set_style_state(self.license_expires_label, "active")
                     else:
                         set_icon_to_label(self.license_expires_icon, "warning", 14)
                         self.license_expires_label.setText("License Expired")
-                        self.license_expires_label.setStyleSheet("color: #f85149; font-size: 12px; font-weight: bold;")
+                        set_style_state(self.license_expires_label, "expired")
                 except Exception as e:
                     logger.error(f"Error parsing expiration date: {e}")
                     set_icon_to_label(self.license_expires_icon, "calendar", 14)
                     self.license_expires_label.setText("Expiration unavailable")
-                    self.license_expires_label.setStyleSheet("color: #6e7681; font-size: 12px;")
+                    set_style_state(self.license_expires_label, "unknown")
             else:
                 set_icon_to_label(self.license_expires_icon, "calendar", 14)
                 self.license_expires_label.setText("No expiration date")
-                self.license_expires_label.setStyleSheet("color: #6e7681; font-size: 12px;")
+                set_style_state(self.license_expires_label, "unknown")
         else:
             set_icon_to_label(self.license_status_icon, "key", 16)
             self.license_status_label.setText("License: Not Activated")
-            self.license_status_label.setStyleSheet("font-weight: bold; color: #f85149; font-size: 13px;")
+            set_style_state(self.license_status_label, "invalid")
             set_icon_to_label(self.license_expires_icon, "calendar", 14)
             self.license_expires_label.setText("Please activate your license")
-            self.license_expires_label.setStyleSheet("color: #6e7681; font-size: 12px;")
-            self.license_info_frame.setStyleSheet("""
-                QFrame#licenseInfoFrame {
-                    background-color: #0d1117;
-                    border: 1px solid #f85149;
-                    border-radius: 10px;
-                    padding: 8px;
-                }
-            """)
-    
-    def _check_updates(self, force: bool = True):
-        """Check for app updates."""
-        try:
-            update_info = update_service.check_for_updates(force=force)
-            if update_info:
-                logger.info(f"Update available: {update_info.get('latest_version')}")
-                dialog = UpdateDialog(update_info, self)
-                dialog.exec()
-            else:
-                logger.info("No update available or update check returned None")
-        except Exception as e:
-            logger.error(f"Error checking for updates: {e}")
+            set_style_state(self.license_expires_label, "unknown")
+            set_style_state(self.license_info_frame, "invalid")
+    
+    def closeEvent(self, event):
+        """Stop background license checks with the window."""
+        self.log_view.model.flush()
+        license_guard.remove_listener(self._license_listener)
+        license_guard.stop_background_refresh()
+        if self._thumbnail_loader is not None:
+            self._thumbnail_loader.stop()
+        from app.services.api_client import api_client
+        if is_initialized(api_client):
+            logger.info(f"License server latency: {api_client.get_metrics()}")
+        super().closeEvent(event)
+    
+    def _check_updates(self, force: bool = False):
+        """Check for app updates without blocking the UI."""
+        update_service.check_async(self.update_available.emit, force=force)
+    
+    def _on_update_available(self, update_info: dict):
+        """Show the update dialog (once per version and session)."""
+        version = update_info.get("latest_version")
+        if version in self._shown_update_versions:
+            return
+        self._shown_update_versions.add(version)
+        logger.info(f"Update available: {version}")
+        from app.ui.update_dialog import UpdateDialog
+        dialog = UpdateDialog(update_info, self)
+        dialog.exec()
@@ -0,0 +1,325 @@
+"""Group plan preview dialog."""
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableView, QHeaderView, QAbstractItemView, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSize
+from PySide6.QtGui import QColor, QIcon
+from app.core.plan_preview import GroupPlan, PlanStrategy, export_plan_csv, export_plan_json
+from app.core.thumbnails import thumbnail_timestamp
+from app.core.worker import GroupPlanWorker
+from app.services.logging_service import logger
+from app.ui.thumbnail_loader import ThumbnailLoader
+
+
+_STRATEGY_COLORS = {
+    PlanStrategy.CLONE: "#3fb950",
+    PlanStrategy.COPY: "#58a6ff",
+    PlanStrategy.REENCODE: "#d29922",
+    PlanStrategy.UNKNOWN: "#8b949e",
+}
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class PlanTableModel(QAbstractTableModel):
+    """
+    Table model for the group plan.
+    
+    Plans arrive in chunks from GroupPlanWorker and are kept in a list, but
+    rows are exposed to the view FETCH_BATCH at a time through
+    canFetchMore()/fetchMore(), so the view only creates rows the user
+    scrolls to, even for tens of thousands of groups. With a thumbnail
+    loader, the Output column shows a frame of the group's first input,
+    requested only when the row is painted.
+    """
+    
+    COLUMNS = ["Group", "Output", "Files", "Total Size", "Duration", "Strategy"]
+    FETCH_BATCH = 200
+    THUMBNAIL_COLUMN = 1
+    
+    def __init__(self, thumbnails: Optional[ThumbnailLoader] = None, parent=None):
+        super().__init__(parent)
+        self._plans: List[GroupPlan] = []
+        self._visible = 0
+        self.thumbnails = thumbnails
+        self._thumbnail_rows = {}  # (path, timestamp) -> row waiting for that thumbnail
+        if thumbnails is not None:
+            thumbnails.thumbnail_ready.connect(self._on_thumbnail_ready)
+    
+    def plans(self) -> List[GroupPlan]:
+        """All plans received so far (including rows not fetched yet)."""
+        return self._plans
+    
+    def append_plans(self, plans: List[GroupPlan]):
+        self._plans.extend(plans)
+        # Show the first screenful without waiting for the view to ask
+        if self._visible < self.FETCH_BATCH:
+            self.fetchMore(QModelIndex())
+    
+    def clear(self):
+        self.beginResetModel()
+        self._plans = []
+        self._visible = 0
+        self._thumbnail_rows = {}
+        self.endResetModel()
+    
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._visible < len(self._plans)
+    
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.FETCH_BATCH, len(self._plans) - self._visible)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._visible, self._visible + count - 1)
+        self._visible += count
+        self.endInsertRows()
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._visible
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+    
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        plan = self._plans[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(plan.index + 1)
+            if column == 1:
+                return plan.output_name
+            if column == 2:
+                return str(len(plan.files))
+            if column == 3:
+                return _format_size(plan.total_size)
+            if column == 4:
+                return _format_duration(plan.duration)
+            return plan.strategy.value
+        if role == Qt.ToolTipRole:
+            names = [path.name for path in plan.files[:20]]
+            if len(plan.files) > 20:
+                names.append(f"... {len(plan.files) - 20} more")
+            return "\n".join(names)
+        if role == Qt.DecorationRole and column == self.THUMBNAIL_COLUMN and self.thumbnails is not None:
+            return self._thumbnail(index.row(), plan)
+        if role == Qt.ForegroundRole and column == 5:
+            return QColor(_STRATEGY_COLORS.get(plan.strategy, "#c9d1d9"))
+        if role == Qt.TextAlignmentRole and column in (0, 2, 3, 4):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+    
+    def _thumbnail(self, row: int, plan: GroupPlan):
+        first = plan.files[0]
+        # About 10% into the first clip (average clip length as its duration)
+        timestamp = round(thumbnail_timestamp(plan.duration / len(plan.files) if plan.duration else None), 1)
+        pixmap = self.thumbnails.pixmap(first, timestamp)
+        if pixmap is None:
+            self._thumbnail_rows[(str(first), timestamp)] = row
+        return pixmap
+    
+    def _on_thumbnail_ready(self, path: str, timestamp: float):
+        row = self._thumbnail_rows.pop((path, timestamp), None)
+        if row is not None and row < self._visible:
+            index = self.index(row, self.THUMBNAIL_COLUMN)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class PlanDialog(QDialog):
+    """Dialog previewing which files go into which group."""
+    
+    def __init__(
+        self,
+        input_dir: Path,
+        settings: dict,
+        ffmpeg_path: Optional[str] = None,
+        thumbnails: Optional[ThumbnailLoader] = None,
+        parent=None
+    ):
+        super().__init__(parent)
+        self.setWindowTitle(f"Group Plan - {input_dir.name}")
+        self.setMinimumWidth(820)
+        self.setMinimumHeight(480)
+        
+        # Set window icon
+        assets_path = Path(__file__).parent / "assets"
+        icon_path = assets_path / "logo128x128.png"
+        if icon_path.exists():
+            self.setWindowIcon(QIcon(str(icon_path)))
+        
+        # Apply Dark Mode styling
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #0d1117;
+                color: #e6edf3;
+            }
+            QLabel {
+                color: #c9d1d9;
+            }
+            QTableView {
+                background-color: #161b22;
+                border: 1px solid #30363d;
+                border-radius: 8px;
+                color: #c9d1d9;
+                gridline-color: #21262d;
+                selection-background-color: #1f6feb;
+            }
+            QHeaderView::section {
+                background-color: #21262d;
+                color: #e6edf3;
+                padding: 6px;
+                border: none;
+                font-weight: bold;
+            }
+            QPushButton {
+                background-color: #4b5563;
+                color: #e0e0e0;
+                padding: 8px 16px;
+                border-radius: 8px;
+                font-weight: 600;
+                font-size: 13px;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #374151;
+            }
+            QPushButton:disabled {
+                background-color: #21262d;
+                color: #6e7681;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        self.summary_label = QLabel("Computing plan...")
+        layout.addWidget(self.summary_label)
+        
+        self.model = PlanTableModel(thumbnails, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        # Fixed row heights keep scrolling cheap with many rows
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        if thumbnails is not None:
+            self.table.setIconSize(QSize(64, 36))
+            self.table.verticalHeader().setDefaultSectionSize(42)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        self.table.setColumnWidth(1, 260)
+        layout.addWidget(self.table, 1)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+        self.export_json_button = QPushButton("Export JSON")
+        self.export_json_button.clicked.connect(lambda: self._export("json"))
+        self.export_csv_button = QPushButton("Export CSV")
+        self.export_csv_button.clicked.connect(lambda: self._export("csv"))
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(self.export_json_button)
+        button_layout.addWidget(self.export_csv_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        self._set_export_enabled(False)
+        
+        self._status = ""
+        self._total_size = 0
+        self._total_duration = 0.0
+        self._unknown_duration = False
+        self._strategies = Counter()
+        
+        self.worker = GroupPlanWorker(input_dir, settings, ffmpeg_path)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.plans_ready.connect(self._on_plans_ready)
+        self.worker.finished.connect(self._on_finished)
+        self.worker.start()
+    
+    def _set_export_enabled(self, enabled: bool):
+        self.export_json_button.setEnabled(enabled)
+        self.export_csv_button.setEnabled(enabled)
+    
+    def _on_progress(self, message: str):
+        self._status = message
+        self._update_summary()
+    
+    def _on_plans_ready(self, plans: list):
+        self.model.append_plans(plans)
+        for plan in plans:
+            self._total_size += plan.total_size
+            if plan.duration is None:
+                self._unknown_duration = True
+            else:
+                self._total_duration += plan.duration
+            self._strategies[plan.strategy] += 1
+        self._update_summary()
+    
+    def _on_finished(self, success: bool):
+        self._set_export_enabled(success and bool(self.model.plans()))
+        self._update_summary(done=True)
+    
+    def _update_summary(self, done: bool = False):
+        planned = len(self.model.plans())
+        parts = [self._status]
+        if planned:
+            duration = _format_duration(self._total_duration) + ("+" if self._unknown_duration else "")
+            strategies = ", ".join(
+                f"{count} {strategy.value}" for strategy, count in self._strategies.most_common()
+            )
+            parts.append(f"{planned} planned, {_format_size(self._total_size)}, {duration} ({strategies})")
+        if not done:
+            parts.append("probing...")
+        self.summary_label.setText("  •  ".join(part for part in parts if part))
+    
+    def _export(self, fmt: str):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Plan", f"group_plan.{fmt}",
+            "JSON files (*.json)" if fmt == "json" else "CSV files (*.csv)"
+        )
+        if not path:
+            return
+        try:
+            if fmt == "json":
+                export_plan_json(self.model.plans(), Path(path))
+            else:
+                export_plan_csv(self.model.plans(), Path(path))
+            logger.info(f"Exported group plan to {path}")
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not write {path}:\n{e}")
+    
+    def done(self, result: int):
+        """Stop planning with the dialog (Close button, window close or Escape)."""
+        if self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait()
+        super().done(result)
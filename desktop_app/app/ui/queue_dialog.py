@@ -0,0 +1,233 @@
+"""Job queue dialog."""
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QSpinBox
+)
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QColor, QIcon
+from pathlib import Path
+from app.core.job_queue import JobQueueRunner, JobStatus, QueuedJob
+from app.services.config_service import config_service
+
+
+_STATUS_COLORS = {
+    JobStatus.QUEUED: "#8b949e",
+    JobStatus.RUNNING: "#58a6ff",
+    JobStatus.COMPLETED: "#3fb950",
+    JobStatus.FAILED: "#f85149",
+    JobStatus.CANCELLED: "#d29922",
+}
+
+
+class QueueDialog(QDialog):
+    """Dialog for managing the persistent job queue."""
+
+    # Signals
+    run_requested = Signal()  # MainWindow resolves FFmpeg and starts the runner
+
+    COLUMNS = ["Input", "Output", "Status", "Groups", "Last Message"]
+
+    def __init__(self, runner: JobQueueRunner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+        self.setWindowTitle("Job Queue")
+        self.setMinimumWidth(820)
+        self.setMinimumHeight(420)
+
+        # Set window icon
+        assets_path = Path(__file__).parent / "assets"
+        icon_path = assets_path / "logo128x128.png"
+        if icon_path.exists():
+            self.setWindowIcon(QIcon(str(icon_path)))
+
+        # Apply Dark Mode styling
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #0d1117;
+                color: #e6edf3;
+            }
+            QLabel {
+                color: #c9d1d9;
+            }
+            QTableWidget {
+                background-color: #161b22;
+                border: 1px solid #30363d;
+                border-radius: 8px;
+                color: #c9d1d9;
+                gridline-color: #21262d;
+                selection-background-color: #1f6feb;
+            }
+            QHeaderView::section {
+                background-color: #21262d;
+                color: #e6edf3;
+                padding: 6px;
+                border: none;
+                font-weight: bold;
+            }
+            QSpinBox {
+                background-color: #21262d;
+                border: 1px solid #30363d;
+                border-radius: 6px;
+                padding: 6px;
+                color: #e6edf3;
+            }
+            QPushButton {
+                background-color: #4b5563;
+                color: #e0e0e0;
+                padding: 8px 16px;
+                border-radius: 8px;
+                font-weight: 600;
+                font-size: 13px;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #374151;
+            }
+            QPushButton:disabled {
+                background-color: #21262d;
+                color: #6e7681;
+            }
+            QPushButton#runButton {
+                background-color: #238636;
+                color: white;
+            }
+            QPushButton#runButton:hover {
+                background-color: #2ea043;
+            }
+            QPushButton#runButton:disabled {
+                background-color: #1c3d2a;
+                color: #4d8f5f;
+            }
+        """)
+
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        self.table.itemSelectionChanged.connect(self._update_buttons)
+        layout.addWidget(self.table, 1)
+
+        # Queue-wide concurrency
+        options_layout = QHBoxLayout()
+        options_layout.setSpacing(10)
+        options_layout.addWidget(QLabel("Jobs at once:"))
+        self.parallel_jobs_spin = QSpinBox()
+        self.parallel_jobs_spin.setRange(1, 8)
+        self.parallel_jobs_spin.setValue(config_service.get_queue_parallel_jobs())
+        self.parallel_jobs_spin.setToolTip(
+            "Number of queued folders processed at the same time.\n"
+            "All of them share the Parallel Jobs limit for FFmpeg processes."
+        )
+        self.parallel_jobs_spin.valueChanged.connect(config_service.set_queue_parallel_jobs)
+        options_layout.addWidget(self.parallel_jobs_spin)
+        options_layout.addStretch()
+        layout.addLayout(options_layout)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+
+        self.remove_button = QPushButton("Remove")
+        self.remove_button.clicked.connect(self._remove_selected)
+        self.retry_button = QPushButton("Retry")
+        self.retry_button.clicked.connect(self._retry_selected)
+        self.clear_button = QPushButton("Clear Finished")
+        self.clear_button.clicked.connect(self._clear_finished)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.runner.stop)
+        self.run_button = QPushButton("Run Queue")
+        self.run_button.setObjectName("runButton")
+        self.run_button.clicked.connect(self.run_requested.emit)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+
+        button_layout.addWidget(self.remove_button)
+        button_layout.addWidget(self.retry_button)
+        button_layout.addWidget(self.clear_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.stop_button)
+        button_layout.addWidget(self.run_button)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+        self.runner.job_changed.connect(self._on_job_changed)
+        self.runner.queue_finished.connect(self._update_buttons)
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the table from the queue."""
+        selected = self._selected_job_id()
+        jobs = self.runner.queue.jobs()
+        self.table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            self._fill_row(row, job)
+            if job.job_id == selected:
+                self.table.selectRow(row)
+        self._update_buttons()
+
+    def _fill_row(self, row: int, job: QueuedJob):
+        groups = f"{job.completed_groups}/{job.total_groups}" if job.total_groups else ""
+        values = [job.input_dir, job.output_dir, job.status.value.capitalize(), groups, job.message]
+        for column, value in enumerate(values):
+            item = self.table.item(row, column)
+            if item is None:
+                item = QTableWidgetItem()
+                self.table.setItem(row, column, item)
+            item.setText(value)
+            item.setToolTip(value)
+            item.setData(Qt.UserRole, job.job_id)
+        self.table.item(row, 2).setForeground(QColor(_STATUS_COLORS.get(job.status, "#c9d1d9")))
+
+    def _on_job_changed(self, job_id: str):
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 0)
+            if item and item.data(Qt.UserRole) == job_id:
+                job = self.runner.queue.get(job_id)
+                if job is not None:
+                    self._fill_row(row, job)
+                    self._update_buttons()
+                return
+        self.refresh()
+
+    def _selected_job_id(self):
+        rows = self.table.selectionModel().selectedRows() if self.table.selectionModel() else []
+        if not rows:
+            return None
+        item = self.table.item(rows[0].row(), 0)
+        return item.data(Qt.UserRole) if item else None
+
+    def _update_buttons(self):
+        job_id = self._selected_job_id()
+        job = self.runner.queue.get(job_id) if job_id else None
+        running = self.runner.is_running()
+        self.remove_button.setEnabled(job is not None and job.status != JobStatus.RUNNING)
+        self.retry_button.setEnabled(
+            job is not None and job.status not in (JobStatus.QUEUED, JobStatus.RUNNING)
+        )
+        self.stop_button.setEnabled(running)
+        self.run_button.setEnabled(not running and self.runner.queue.next_queued() is not None)
+
+    def _remove_selected(self):
+        job_id = self._selected_job_id()
+        if job_id and self.runner.queue.remove(job_id):
+            self.refresh()
+
+    def _retry_selected(self):
+        job_id = self._selected_job_id()
+        if job_id and self.runner.queue.requeue(job_id):
+            self.refresh()
+
+    def _clear_finished(self):
+        self.runner.queue.clear_finished()
+        self.refresh()
+
@@ -0,0 +1,28 @@
+"""Helpers for state-dependent widget styling."""
+from PySide6.QtWidgets import QWidget
+
+
+def set_style_state(widget: QWidget, state: str, name: str = "state") -> bool:
+    """
+    Switch a widget between styles defined once in a stylesheet.
+    
+    Stylesheets select on the dynamic property, e.g.
+    QLabel#videoCountLabel[state="error"] { color: #f85149; }. Unlike
+    calling setStyleSheet() per update, this re-polishes only this widget,
+    and only when the state actually changes.
+    
+    Args:
+        widget: Widget to update
+        state: New property value
+        name: Property name used in the stylesheet selectors
+    
+    Returns:
+        True if the state changed
+    """
+    if widget.property(name) == state:
+        return False
+    widget.setProperty(name, state)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    return True
@@ -0,0 +1,89 @@
+"""Qt bridge for background video thumbnails."""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from PySide6.QtCore import QObject, Signal, Qt
+from PySide6.QtGui import QPixmap
+from app.core.thumbnails import CONTACT_SHEET, ThumbnailCache, ThumbnailService
+
+
+class ThumbnailLoader(QObject):
+    """
+    Loads thumbnails for views without blocking the GUI thread.
+    
+    pixmap() returns a thumbnail right away if it is loaded already;
+    otherwise the request goes to the ThumbnailService pool, which serves
+    it from the disk cache or grabs the frame. thumbnail_ready is emitted
+    on the GUI thread when it arrives, and views repaint the rows that
+    asked for it. The GUI thread never reads the video files. Frames that
+    could not be grabbed are remembered and not requested again.
+    """
+    
+    # Signals
+    thumbnail_ready = Signal(str, float)  # video path, timestamp
+    _image_arrived = Signal(str, float, str)  # Emitted from pool threads, delivered on the GUI thread
+    
+    MEMORY_ITEMS = 300  # Decoded pixmaps kept in memory
+    
+    def __init__(self, ffmpeg_path: str, cache_dir: Path, max_bytes: int, parent=None):
+        super().__init__(parent)
+        self.service = ThumbnailService(ffmpeg_path, ThumbnailCache(cache_dir, max_bytes))
+        self._pixmaps: "OrderedDict[Tuple[str, float], Optional[QPixmap]]" = OrderedDict()
+        self._images: Dict[Tuple[str, float], Path] = {}  # Cached JPEG per request
+        self._pending = set()  # Requests sent to the service and not answered yet
+        self._failed = set()  # Requests the service could not grab
+        self._image_arrived.connect(self._on_image_arrived, Qt.QueuedConnection)
+    
+    def pixmap(self, path: Path, timestamp: float, priority: int = 0) -> Optional[QPixmap]:
+        """Get the thumbnail if it is loaded; otherwise request it and return None."""
+        key = (str(path), timestamp)
+        if key in self._pixmaps:
+            self._pixmaps.move_to_end(key)
+            return self._pixmaps[key]
+        self._request(key, priority)
+        return None
+    
+    def image_path(self, path: Path, timestamp: float, priority: int = 0) -> Optional[Path]:
+        """Like pixmap(), but returns the cached JPEG (e.g. for HTML tooltips)."""
+        key = (str(path), timestamp)
+        if key in self._images:
+            return self._images[key]
+        self._request(key, priority)
+        return None
+    
+    def contact_sheet_path(self, path: Path, priority: int = 0) -> Optional[Path]:
+        """Like image_path(), for a grid of frames spread over the whole video."""
+        return self.image_path(path, CONTACT_SHEET, priority)
+    
+    def set_throttled(self, throttled: bool):
+        """Grab one frame at a time while concat jobs run."""
+        self.service.set_throttled(throttled)
+    
+    def stop(self):
+        """Stop background grabs."""
+        self.service.stop()
+    
+    def _request(self, key: Tuple[str, float], priority: int):
+        if key not in self._pending and key not in self._failed:
+            self._pending.add(key)
+            self.service.request(Path(key[0]), key[1], self._on_grabbed, priority)
+    
+    def _on_grabbed(self, path: Path, timestamp: float, image: Optional[Path]):
+        # Pool thread: hand over to the GUI thread
+        self._image_arrived.emit(str(path), timestamp, str(image) if image else "")
+    
+    def _on_image_arrived(self, path: str, timestamp: float, image: str):
+        key = (path, timestamp)
+        self._pending.discard(key)
+        if not image:
+            # Dropped or cancelled requests are asked again, failed grabs are not
+            if self.service.failed(Path(path), timestamp):
+                self._failed.add(key)
+            return
+        pixmap = QPixmap(image)
+        self._images[key] = Path(image)
+        self._pixmaps[key] = None if pixmap.isNull() else pixmap
+        self._pixmaps.move_to_end(key)
+        while len(self._pixmaps) > self.MEMORY_ITEMS:
+            self._pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(path, timestamp)
@@ -2,13 +2,59 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar
 from PySide6.QtCore import Qt
 from app.ui.icon_helper import set_icon_to_label, create_icon_label
+from app.ui.style_helper import set_style_state
 
 
 class ProgressWidget(QWidget):
     """Widget for displaying progress with modern styling."""
     
+    # One stylesheet for all states; set_progress() only switches the
+    # "state" property (idle / running / done) when it changes
+    STYLESHEET = """
+        QLabel#progressText {
+            color: #e6edf3;
+            font-size: 13px;
+            font-weight: bold;
+            background: transparent;
+        }
+        QLabel#percentLabel {
+            color: #8957e5;
+            font-size: 13px;
+            font-weight: bold;
+            background: transparent;
+        }
+        QLabel#percentLabel[state="running"] {
+            color: #58a6ff;
+        }
+        QLabel#percentLabel[state="done"] {
+            color: #3fb950;
+        }
+        QProgressBar#progressBar {
+            border: none;
+            border-radius: 6px;
+            background-color: #21262d;
+        }
+        QProgressBar#progressBar::chunk {
+            background-color: #8957e5;
+            border-radius: 6px;
+        }
+        QProgressBar#progressBar[state="running"]::chunk {
+            background-color: #58a6ff;
+        }
+        QProgressBar#progressBar[state="done"]::chunk {
+            background-color: #3fb950;
+        }
+    """
+    
+    STATE_ICONS = {
+        "idle": "hourglass",
+        "running": "lightning",
+        "done": "check",
+    }
+    
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setStyleSheet(self.STYLESHEET)
         
         layout = QVBoxLayout()
         layout.setSpacing(8)
@@ -22,48 +68,29 @@ class ProgressWidget(QWidget):
         header_layout.addWidget(self.status_icon)
         
         self.label = QLabel("Ready to process")
-        self.label.setStyleSheet("""
-            color: #e6edf3;
-            font-size: 13px;
-            font-weight: bold;
-            background: transparent;
-        """)
+        self.label.setObjectName("progressText")
         header_layout.addWidget(self.label)
         header_layout.addStretch()
         
         # Percentage label
         self.percent_label = QLabel("0%")
-        self.percent_label.setStyleSheet("""
-            color: #8957e5;
-            font-size: 13px;
-            font-weight: bold;
-            background: transparent;
-        """)
+        self.percent_label.setObjectName("percentLabel")
         header_layout.addWidget(self.percent_label)
         
         layout.addLayout(header_layout)
         
         # Progress bar
         self.progress_bar = QProgressBar()
+        self.progress_bar.setObjectName("progressBar")
         self.progress_bar.setMinimum(0)
         self.progress_bar.setMaximum(100)
         self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(False)
         self.progress_bar.setFixedHeight(12)
-        self.progress_bar.setStyleSheet("""
-            QProgressBar {
-                border: none;
-                border-radius: 6px;
-                background-color: #21262d;
-            }
-            QProgressBar::chunk {
-                background-color: #8957e5;
-                border-radius: 6px;
-            }
-        """)
         
         layout.addWidget(self.progress_bar)
         self.setLayout(layout)
+        self._set_state("idle")
     
     def set_progress(self, value: int, text: str = ""):
         """Set progress value and optional text."""
@@ -75,63 +102,20 @@ class ProgressWidget(QWidget):
         
         # Update styling based on progress
         if value == 0:
-            set_icon_to_label(self.status_icon, "hourglass", 14)
-            self.percent_label.setStyleSheet("color: #8957e5; font-size: 13px; font-weight: bold; background: transparent;")
-            self.progress_bar.setStyleSheet("""
-                QProgressBar {
-                    border: none;
-                    border-radius: 6px;
-                    background-color: #21262d;
-                }
-                QProgressBar::chunk {
-                    background-color: #8957e5;
-                    border-radius: 6px;
-                }
-            """)
+            self._set_state("idle")
         elif value < 100:
-            set_icon_to_label(self.status_icon, "lightning", 14)
-            self.percent_label.setStyleSheet("color: #58a6ff; font-size: 13px; font-weight: bold; background: transparent;")
-            self.progress_bar.setStyleSheet("""
-                QProgressBar {
-                    border: none;
-                    border-radius: 6px;
-                    background-color: #21262d;
-                }
-                QProgressBar::chunk {
-                    background-color: #58a6ff;
-                    border-radius: 6px;
-                }
-            """)
+            self._set_state("running")
         else:
-            set_icon_to_label(self.status_icon, "check", 14)
-            self.percent_label.setStyleSheet("color: #3fb950; font-size: 13px; font-weight: bold; background: transparent;")
-            self.progress_bar.setStyleSheet("""
-                QProgressBar {
-                    border: none;
-                    border-radius: 6px;
-                    background-color: #21262d;
-                }
-                QProgressBar::chunk {
-                    background-color: #3fb950;
-                    border-radius: 6px;
-                }
-            """)
+            self._set_state("done")
     
     def reset(self):
         """Reset progress."""
         self.progress_bar.setValue(0)
         self.percent_label.setText("0%")
         self.label.setText("Ready to process")
-        set_icon_to_label(self.status_icon, "hourglass", 14)
-        self.percent_label.setStyleSheet("color: #8957e5; font-size: 13px; font-weight: bold; background: transparent;")
-        self.progress_bar.setStyleSheet("""
-            QProgressBar {
-                border: none;
-                border-radius: 6px;
-                background-color: #21262d;
-            }
-            QProgressBar::chunk {
-                background-color: #8957e5;
-                border-radius: 6px;
-            }
-        """)
+        self._set_state("idle")
+    
+    def _set_state(self, state: str):
+        set_icon_to_label(self.status_icon, self.STATE_ICONS[state], 14)
+        set_style_state(self.percent_label, state)
+        set_style_state(self.progress_bar, state)
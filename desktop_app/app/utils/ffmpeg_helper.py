@@ -1,4 +1,5 @@
 """FFmpeg helper utilities for finding FFmpeg executable."""
+import subprocess
 import sys
 import shutil
 from pathlib import Path
@@ -54,3 +55,43 @@ def find_ffmpeg() -> Optional[str]:
     
     logger.warning("FFmpeg not found in bundled location or PATH")
     return None
+
+
+def find_ffprobe(ffmpeg_path: Optional[str] = None) -> Optional[str]:
+    """
+    Try to find the ffprobe executable.
+    
+    Priority:
+    1. Next to the given FFmpeg executable (bundled builds ship both)
+    2. ffprobe in PATH
+    3. None
+    
+    Returns:
+        Path to ffprobe executable if found, None otherwise
+    """
+    if ffmpeg_path:
+        ffmpeg = Path(ffmpeg_path)
+        sibling = ffmpeg.with_name(ffmpeg.name.replace("ffmpeg", "ffprobe", 1))
+        if sibling != ffmpeg and sibling.exists():
+            return str(sibling)
+    
+    return shutil.which("ffprobe")
+
+
+def get_hidden_window_kwargs() -> dict:
+    """
+    Get subprocess keyword arguments that hide the console window on Windows.
+    
+    Returns:
+        Dict with creationflags/startupinfo (empty on other platforms)
+    """
+    if sys.platform != 'win32':
+        return {}
+    
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return {
+        "creationflags": 0x08000000,  # CREATE_NO_WINDOW
+        "startupinfo": startupinfo
+    }
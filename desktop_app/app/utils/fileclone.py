@@ -0,0 +1,105 @@
+"""Zero-copy file cloning utilities."""
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Optional
+
+# Linux FICLONE ioctl (btrfs, XFS with reflink=1, bcachefs, overlayfs on those)
+_FICLONE = 0x40049409
+
+# ISO BMFF brands that mean a QuickTime (.mov) file rather than MP4
+_QUICKTIME_BRANDS = {b"qt  "}
+
+
+def is_mp4_file(path: Path) -> bool:
+    """
+    Check whether path is an MP4 (ISO BMFF) file by sniffing its ftyp box.
+
+    QuickTime .mov files share the box structure but carry the "qt  " brand
+    and are reported as not MP4.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(12)
+    except OSError:
+        return False
+    if len(header) < 12 or header[4:8] != b"ftyp":
+        return False
+    return header[8:12] not in _QUICKTIME_BRANDS
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def _hardlink(src: Path, dst: Path) -> bool:
+    try:
+        os.link(src, dst)
+        return True
+    except (OSError, NotImplementedError):
+        return False
+
+
+def _copy_file_range(src: Path, dst: Path) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        if remaining > 0:
+            dst.unlink(missing_ok=True)
+            return False
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def clone_file(src: Path, dst: Path, allow_hardlink: bool = True) -> Optional[str]:
+    """
+    Create dst with the same content as src as cheaply as possible.
+
+    Tries, in order: reflink (copy-on-write clone), hardlink (same volume),
+    copy_file_range (in-kernel copy, may be offloaded), then a regular copy.
+    An existing dst is replaced.
+
+    Returns:
+        Name of the method used, or None on failure
+    """
+    if src.resolve() == dst.resolve():
+        return None
+    try:
+        dst.unlink(missing_ok=True)
+    except OSError:
+        return None
+
+    if _reflink(src, dst):
+        return "reflink"
+    if allow_hardlink and _hardlink(src, dst):
+        return "hardlink"
+    if _copy_file_range(src, dst):
+        return "copy_file_range"
+    try:
+        shutil.copyfile(src, dst)
+        return "copy"
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return None
@@ -0,0 +1,50 @@
+"""Lazily constructed module-level services."""
+import threading
+from typing import Any, Callable
+
+
+class LazyProxy:
+    """
+    Stand-in for a module-level singleton that is built on first use.
+    
+    Attribute access is forwarded to the object returned by factory(),
+    which is called once (thread-safe) the first time an attribute is
+    needed. Modules can keep exposing `service = LazyProxy(Service)` and
+    callers keep using `service.method()` unchanged, while importing the
+    module no longer reads files or opens connections.
+    """
+    
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+    
+    def _resolve(self) -> Any:
+        instance = object.__getattribute__(self, "_instance")
+        if instance is None:
+            with object.__getattribute__(self, "_lock"):
+                instance = object.__getattribute__(self, "_instance")
+                if instance is None:
+                    instance = object.__getattribute__(self, "_factory")()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+    
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._resolve(), name, value)
+    
+    def __repr__(self) -> str:
+        instance = object.__getattribute__(self, "_instance")
+        if instance is None:
+            factory = object.__getattribute__(self, "_factory")
+            return f"<LazyProxy for {getattr(factory, '__name__', factory)} (not created)>"
+        return repr(instance)
+
+
+def is_initialized(proxy: Any) -> bool:
+    """Check whether a LazyProxy has built its object (non-proxies count as built)."""
+    if isinstance(proxy, LazyProxy):
+        return object.__getattribute__(proxy, "_instance") is not None
+    return True
@@ -20,6 +20,31 @@ def get_logs_dir() -> Path:
     return get_app_data_dir() / "logs"
 
 
+def get_output_cache_dir() -> Path:
+    """Get content-addressed output cache directory."""
+    return get_app_data_dir() / "output_cache"
+
+
+def get_probe_cache_file() -> Path:
+    """Get media probe cache file path."""
+    return get_app_data_dir() / "probe_cache.json"
+
+
+def get_job_queue_file() -> Path:
+    """Get persistent job queue file path."""
+    return get_app_data_dir() / "job_queue.json"
+
+
+def get_thumbnail_cache_dir() -> Path:
+    """Get video thumbnail cache directory."""
+    return get_app_data_dir() / "thumbnails"
+
+
+def get_bumper_cache_dir() -> Path:
+    """Get directory of intro/outro variants encoded to match the footage."""
+    return get_app_data_dir() / "bumpers"
+
+
 def ensure_directories():
     """Ensure all required directories exist."""
     get_app_data_dir().mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,54 @@
+"""Startup timeline profiler."""
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+
+class StartupProfiler:
+    """
+    Records how long each startup phase takes.
+    
+    The clock starts when this module is first imported, so app.main
+    imports it before anything else. Phases are recorded with phase() or
+    mark() and written to the log as one timeline by log_timeline().
+    """
+    
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._last = self._origin
+        self._phases: List[Tuple[str, float, float]] = []  # (name, start offset, duration) in seconds
+        self._logged = False
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as one phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            self._phases.append((name, started - self._origin, ended - started))
+            self._last = ended
+    
+    def mark(self, name: str):
+        """Record the time since the previous phase ended as a phase."""
+        now = time.perf_counter()
+        self._phases.append((name, self._last - self._origin, now - self._last))
+        self._last = now
+    
+    def elapsed(self) -> float:
+        """Seconds since the profiler started."""
+        return time.perf_counter() - self._origin
+    
+    def log_timeline(self, logger, label: Optional[str] = None):
+        """Write the recorded phases to logger (only the first call logs)."""
+        if self._logged:
+            return
+        self._logged = True
+        lines = [f"Startup timeline ({label or 'total'}: {self.elapsed() * 1000:.0f} ms):"]
+        for name, start, duration in self._phases:
+            lines.append(f"  {start * 1000:8.1f} ms  +{duration * 1000:7.1f} ms  {name}")
+        logger.info("\n".join(lines))
+
+
+startup_profiler = StartupProfiler()
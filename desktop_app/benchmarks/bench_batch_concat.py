@@ -0,0 +1,98 @@
+"""
+Benchmark: per-group FFmpeg processes vs. batched multi-output processes.
+
+Generates (or reuses) a folder of short clips, groups them, and times
+FFmpegConcat.concat_videos() per group against FFmpegConcat.concat_batch()
+for several batch sizes.
+
+Run from the desktop_app directory:
+    python -m benchmarks.bench_batch_concat --clips 120 --group-size 3
+    python -m benchmarks.bench_batch_concat --input-dir D:\\clips --batch-sizes 4 8 16
+"""
+import argparse
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from app.core.ffmpeg_concat import FFmpegConcat
+from app.core.grouper import scan_video_files, group_files, SortMode
+
+
+def generate_clips(ffmpeg_path: str, target_dir: Path, count: int, seconds: float):
+    """Generate short synthetic H.264/AAC clips with FFmpeg's lavfi sources."""
+    for i in range(count):
+        subprocess.run(
+            [
+                ffmpeg_path, "-v", "error",
+                "-f", "lavfi", "-i", "testsrc=size=640x360:rate=30",
+                "-f", "lavfi", "-i", f"sine=frequency={220 + i}",
+                "-t", str(seconds),
+                "-c:v", "libx264", "-preset", "ultrafast",
+                "-c:a", "aac",
+                "-shortest", "-y",
+                str(target_dir / f"clip_{i:04d}.mp4")
+            ],
+            check=True
+        )
+
+
+def run_per_group(ffmpeg: FFmpegConcat, groups, out_dir: Path) -> float:
+    start = time.perf_counter()
+    for i, group in enumerate(groups):
+        ffmpeg.concat_videos(group, out_dir / f"group_{i + 1:03d}.mp4")
+    return time.perf_counter() - start
+
+
+def run_batched(ffmpeg: FFmpegConcat, groups, out_dir: Path, batch_size: int) -> float:
+    jobs = [(group, out_dir / f"group_{i + 1:03d}.mp4") for i, group in enumerate(groups)]
+    start = time.perf_counter()
+    for batch_start in range(0, len(jobs), batch_size):
+        results = ffmpeg.concat_batch(jobs[batch_start:batch_start + batch_size])
+        if not all(results):
+            print(f"  warning: batch starting at group {batch_start + 1} had failures")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ffmpeg", default=shutil.which("ffmpeg") or "ffmpeg")
+    parser.add_argument("--input-dir", type=Path, help="Use existing clips instead of generating them")
+    parser.add_argument("--clips", type=int, default=60, help="Number of clips to generate")
+    parser.add_argument("--seconds", type=float, default=4.0, help="Length of generated clips")
+    parser.add_argument("--group-size", type=int, default=3)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="vmc_bench_"))
+    try:
+        input_dir = args.input_dir
+        if input_dir is None:
+            input_dir = work_dir / "clips"
+            input_dir.mkdir()
+            print(f"Generating {args.clips} clips of {args.seconds:g}s...")
+            generate_clips(args.ffmpeg, input_dir, args.clips, args.seconds)
+
+        groups, _ = group_files(scan_video_files(input_dir), args.group_size, SortMode.FILENAME)
+        print(f"{len(groups)} groups of {args.group_size}")
+        ffmpeg = FFmpegConcat(args.ffmpeg)
+
+        out_dir = work_dir / "out"
+        out_dir.mkdir()
+        baseline = run_per_group(ffmpeg, groups, out_dir)
+        print(f"per-group processes : {baseline:8.2f}s  ({baseline / len(groups) * 1000:.0f} ms/group)")
+
+        for batch_size in args.batch_sizes:
+            shutil.rmtree(out_dir)
+            out_dir.mkdir()
+            elapsed = run_batched(ffmpeg, groups, out_dir, batch_size)
+            print(
+                f"batch size {batch_size:<3}       : {elapsed:8.2f}s  "
+                f"({elapsed / len(groups) * 1000:.0f} ms/group, {baseline / elapsed:.2f}x)"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: cost of one status update in the main window widgets.
+
+Compares the old way of updating ProgressWidget and the video count
+label (re-render the SVG icon and call setStyleSheet() on every update)
+with the current one (cached icon pixmaps and "state" dynamic properties
+selected by a stylesheet that is set once).
+
+Run from the desktop_app directory:
+    python -m benchmarks.bench_status_update --updates 2000
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_status_update
+"""
+import argparse
+import time
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel
+from PySide6.QtGui import QPixmap, QPainter
+from PySide6.QtCore import Qt
+from app.ui.icon_helper import get_icon_path, set_icon_to_label, clear_icon_cache
+from app.ui.style_helper import set_style_state
+from app.ui.widgets import ProgressWidget
+
+
+# Colors ProgressWidget.set_progress() used to build a stylesheet from on every call
+LEGACY_COLORS = {"idle": "#8957e5", "running": "#58a6ff", "done": "#3fb950"}
+LEGACY_ICONS = {"idle": "hourglass", "running": "lightning", "done": "check"}
+
+# Main window rules for the video count label (a larger sheet makes each re-polish cost more)
+WINDOW_STYLESHEET = """
+    QLabel { color: #c9d1d9; }
+    QLabel#videoCountLabel { color: #6e7681; font-size: 11px; font-style: italic; }
+    QLabel#videoCountLabel[state="found"] { color: #3fb950; font-weight: bold; font-style: normal; }
+    QLabel#videoCountLabel[state="error"] { color: #f85149; font-style: normal; }
+"""
+
+
+def legacy_set_icon(label: QLabel, icon_name: str, size: int):
+    """Old set_icon_to_label(): parse and rasterize the SVG on every call."""
+    from PySide6.QtSvg import QSvgRenderer
+    renderer = QSvgRenderer(str(get_icon_path(icon_name)))
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    renderer.render(painter)
+    painter.end()
+    label.setPixmap(pixmap)
+    label.setFixedSize(size, size)
+
+
+def legacy_set_progress(widget: ProgressWidget, value: int):
+    """Old ProgressWidget.set_progress(): icon render plus two setStyleSheet() calls."""
+    state = "idle" if value == 0 else "running" if value < 100 else "done"
+    color = LEGACY_COLORS[state]
+    widget.progress_bar.setValue(value)
+    widget.percent_label.setText(f"{value}%")
+    legacy_set_icon(widget.status_icon, LEGACY_ICONS[state], 14)
+    widget.percent_label.setStyleSheet(f"color: {color}; font-size: 13px; font-weight: bold; background: transparent;")
+    widget.progress_bar.setStyleSheet(f"""
+        QProgressBar {{ border: none; border-radius: 6px; background-color: #21262d; }}
+        QProgressBar::chunk {{ background-color: {color}; border-radius: 6px; }}
+    """)
+
+
+def legacy_set_count(icon: QLabel, label: QLabel, count: int):
+    """Old _update_video_count() body for an existing folder."""
+    legacy_set_icon(icon, "video", 12)
+    label.setText(f"{count} videos found" if count else "No videos found")
+    if count:
+        label.setStyleSheet("color: #3fb950; font-size: 11px; font-weight: bold;")
+    else:
+        label.setStyleSheet("color: #f85149; font-size: 11px;")
+
+
+def current_set_count(icon: QLabel, label: QLabel, count: int):
+    """Current _update_video_count() body for an existing folder."""
+    set_icon_to_label(icon, "video", 12)
+    label.setText(f"{count} videos found" if count else "No videos found")
+    set_style_state(label, "found" if count else "error")
+
+
+def time_updates(app: QApplication, updates: int, update) -> float:
+    """Run update(i) updates times, letting Qt process events in between; ms per update."""
+    started = time.perf_counter()
+    for i in range(updates):
+        update(i)
+        app.processEvents()
+    return (time.perf_counter() - started) * 1000 / updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=1000, help="updates per scenario (default 1000)")
+    args = parser.parse_args()
+    
+    app = QApplication.instance() or QApplication([])
+    window = QWidget()
+    window.setStyleSheet(WINDOW_STYLESHEET)
+    layout = QVBoxLayout(window)
+    progress = ProgressWidget()
+    count_icon = QLabel()
+    count_label = QLabel()
+    count_label.setObjectName("videoCountLabel")
+    layout.addWidget(progress)
+    layout.addWidget(count_icon)
+    layout.addWidget(count_label)
+    window.show()
+    app.processEvents()
+    
+    # Progress ticks while a batch runs (the state rarely changes)
+    def tick(i):
+        return (i % 99) + 1
+    
+    scenarios = [
+        (
+            "progress tick",
+            lambda i: legacy_set_progress(progress, tick(i)),
+            lambda i: progress.set_progress(tick(i))
+        ),
+        (
+            "video count (keystroke)",
+            lambda i: legacy_set_count(count_icon, count_label, i % 3),
+            lambda i: current_set_count(count_icon, count_label, i % 3)
+        ),
+    ]
+    
+    print(f"{args.updates} updates per scenario")
+    for name, legacy, current in scenarios:
+        before = time_updates(app, args.updates, legacy)
+        clear_icon_cache()
+        after = time_updates(app, args.updates, current)
+        print(f"{name:<24}: before {before * 1000:8.1f} us/update, after {after * 1000:8.1f} us/update "
+              f"({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
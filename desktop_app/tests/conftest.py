@@ -0,0 +1,10 @@
+"""Shared fixtures: keep tests away from the real app data directory."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def app_data(tmp_path, monkeypatch):
+    """Point APPDATA (config, caches, logs) at a temporary directory."""
+    app_data = tmp_path / "appdata"
+    monkeypatch.setenv("APPDATA", str(app_data))
+    return app_data / "VideoMixerConcat"
@@ -0,0 +1,40 @@
+"""Selection of the auto-tuned encoder profile."""
+from pathlib import Path
+from app.core.autotune import AutoTuneResult, EncoderAutoTuner, EncoderProfile
+
+PROFILES = [EncoderProfile("libx264", preset) for preset in ("ultrafast", "veryfast", "medium")]
+# (seconds, SSIM) per preset: ultrafast misses the floor
+MEASUREMENTS = {"ultrafast": (1.0, 0.90), "veryfast": (2.0, 0.96), "medium": (4.0, 0.98)}
+
+
+def _tuner(monkeypatch, measured):
+    tuner = EncoderAutoTuner("ffmpeg", quality_floor=0.95)
+    monkeypatch.setattr(tuner, "candidates", lambda: list(PROFILES))
+    monkeypatch.setattr(tuner, "_cut_sample", lambda source, sample_file: True)
+    
+    def measure(profile, sample_file, work_dir):
+        measured.append(profile.preset)
+        elapsed, ssim = MEASUREMENTS[profile.preset]
+        return AutoTuneResult(profile, elapsed, 125, ssim, None)
+    
+    monkeypatch.setattr(tuner, "_measure", measure)
+    return tuner
+
+
+def test_fastest_profile_meeting_the_floor_wins(monkeypatch):
+    measured = []
+    profile, results = _tuner(monkeypatch, measured).run([Path("a.mp4")])
+    assert profile.preset == "veryfast"
+    assert measured == ["ultrafast", "veryfast", "medium"]
+    assert len(results) == 3
+
+
+def test_cancelled_run_selects_nothing(monkeypatch):
+    measured = []
+    messages = []
+    profile, results = _tuner(monkeypatch, measured).run(
+        [Path("a.mp4")], messages.append, is_cancelled=lambda: len(measured) == 2
+    )
+    assert profile is None
+    assert [result.profile.preset for result in results] == ["ultrafast", "veryfast"]
+    assert messages[-1] == "Auto-tune cancelled, the previous profile is kept"
@@ -0,0 +1,112 @@
+"""Bumper variants: encoding, reuse, stream copy checks and the cache limit."""
+import os
+from pathlib import Path
+from app.core.bumpers import BumperLibrary
+
+VARIANT_BYTES = 400
+
+
+def _info(codec, width=320):
+    return {
+        "duration": 10.0,
+        "video": {"codec": codec, "width": width, "height": 240, "fps": 25.0},
+        "audio": None
+    }
+
+
+class FakeProbe:
+    """Footage is named after its codec; variants get variant_sets as parameter sets."""
+    
+    def __init__(self, footage_sets="footage-sets", variant_sets="variant-sets"):
+        self.footage_sets = footage_sets
+        self.variant_sets = variant_sets
+    
+    def probe(self, path):
+        if path.name.startswith("intro"):
+            return {"duration": 2.0, "video": {"codec": "h264"}, "audio": None}
+        return _info(path.stem.split("_")[0], int(path.stem.split("_")[1]) if "_" in path.stem else 320)
+    
+    def parameter_sets(self, path, cache=True):
+        return self.variant_sets if path.suffix == ".mp4" and path.parent.name == "cache" else self.footage_sets
+
+
+class FakeResult:
+    def __init__(self, returncode=0):
+        self.returncode = returncode
+        self.stderr = ""
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.commands = []
+        self.cancelled = False
+    
+    def run(self, cmd, timeout=None):
+        self.commands.append(cmd)
+        Path(cmd[-1]).write_bytes(b"v" * VARIANT_BYTES)
+        return FakeResult()
+
+
+def _library(tmp_path, probe=None, max_bytes=None):
+    intro = tmp_path / "intro.mp4"
+    if not intro.exists():
+        intro.write_bytes(b"intro")
+    return BumperLibrary(
+        "ffmpeg", probe or FakeProbe(), intro, processes=FakeEncoder(),
+        cache_dir=tmp_path / "cache", max_bytes=max_bytes
+    )
+
+
+def test_variants_are_encoded_once_and_reused(tmp_path):
+    library = _library(tmp_path)
+    footage = _info("h264")
+    variant = library.variant(library.intro, footage)
+    assert variant.exists()
+    assert library.variant(library.intro, footage) == variant
+    assert library.variant(library.intro, _info("h264", 640)) != variant
+    assert library.variant(library.intro, _info("vp9")) is None  # Cannot be matched
+    assert (library.stats.encoded, library.stats.reused) == (2, 0)
+    assert len(library.processes.commands) == 2
+    
+    later = _library(tmp_path)
+    assert later.variant(later.intro, footage) == variant
+    assert (later.stats.encoded, later.stats.reused) == (0, 1)
+    assert later.processes.commands == []
+
+
+def test_copy_safe_with_matching_and_differing_parameter_sets(tmp_path):
+    group = [Path("h264.mp4")]
+    matching = _library(tmp_path, FakeProbe(variant_sets="footage-sets"))
+    assert matching.copy_safe(group)
+    assert matching.inband_tag(group) is None
+    
+    differing = _library(tmp_path)
+    assert differing.inband_tag(group) == "avc3"
+    assert differing.copy_safe(group)
+    assert not differing.copy_safe([Path("h264_640.mp4")], inband=False)  # Footage after the intro is no IDR
+    assert not differing.copy_safe([Path("hevc.mp4")])  # No in-band parameter sets for HEVC
+    assert differing.copy_safe(group)  # Counted once per group
+    assert (differing.stats.inband, differing.stats.reencoded) == (1, 2)
+    assert "1 groups stream-copied with in-band parameter sets" in differing.stats.summary()
+    
+    # Footage no variant can be made for is joined without bumpers
+    assert differing.wrap([Path("vp9.mp4")]) == (None, None)
+    assert differing.copy_safe([Path("vp9.mp4")])
+    assert differing.stats.unmatched == 1
+
+
+def test_cache_evicts_least_recently_used_variants_not_in_use(tmp_path):
+    library = _library(tmp_path, max_bytes=3 * VARIANT_BYTES)
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    old = cache / "old.mp4"
+    old.write_bytes(b"o" * VARIANT_BYTES)
+    os.utime(old, (1_000_000, 1_000_000))
+    first = library.variant(library.intro, _info("h264", 320))
+    os.utime(first, (0, 0))  # Least recently used, but needed by this run
+    second = library.variant(library.intro, _info("h264", 640))
+    assert first.exists() and second.exists() and old.exists()  # Exactly at the limit
+    
+    third = library.variant(library.intro, _info("h264", 800))
+    assert not old.exists()
+    assert first.exists() and second.exists() and third.exists()
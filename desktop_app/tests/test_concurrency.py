@@ -0,0 +1,30 @@
+"""Adaptive concurrency decisions and their log levels."""
+import logging
+from app.core.concurrency import AdaptiveConcurrencyController, SystemSample
+
+
+class FakeSampler:
+    def __init__(self, cpu_percent):
+        self.cpu_percent = cpu_percent
+
+    def sample(self):
+        return SystemSample(self.cpu_percent, 0.0, 50.0)
+
+
+def test_only_limit_changes_are_logged_at_info(caplog):
+    caplog.set_level(logging.DEBUG)
+    sampler = FakeSampler(20.0)
+    controller = AdaptiveConcurrencyController(1, 2, interval=0, sampler=sampler)
+
+    assert controller.tick(running=1, waiting=3) == 2
+    assert controller.tick(running=2, waiting=3) == 2  # At max_jobs: hold
+    sampler.cpu_percent = 95.0
+    assert controller.tick(running=2, waiting=3) == 1
+
+    decisions = [(record.levelno, record.getMessage().split(" (")[0])
+                 for record in caplog.records if record.getMessage().startswith("Concurrency")]
+    assert decisions == [
+        (logging.INFO, "Concurrency raise 1->2"),
+        (logging.DEBUG, "Concurrency hold 2->2"),
+        (logging.INFO, "Concurrency lower 2->1"),
+    ]
@@ -0,0 +1,68 @@
+"""Difference hashes and duplicate clustering."""
+import os
+from app.core.dedup import HASH_HEIGHT, HASH_WIDTH, DedupPolicy, dhash, find_duplicates, hamming
+
+
+class FakeFingerprinter:
+    def __init__(self, fingerprints):
+        self.fingerprints = fingerprints
+    
+    def fingerprint(self, path):
+        return self.fingerprints.get(path.name)
+
+
+def _files(tmp_path, sizes):
+    paths = []
+    for name, size in sizes.items():
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        paths.append(path)
+    return paths
+
+
+def test_dhash_compares_adjacent_pixels():
+    falling = bytes(range(HASH_WIDTH, 0, -1)) * HASH_HEIGHT
+    rising = bytes(range(HASH_WIDTH)) * HASH_HEIGHT
+    assert dhash(falling) == (1 << 64) - 1
+    assert dhash(rising) == 0
+    
+    # Brightness changes keep the hash, one changed pixel flips at most two bits
+    assert dhash(bytes(value + 50 for value in falling)) == dhash(falling)
+    edited = bytearray(falling)
+    edited[3] = 0
+    assert 0 < hamming(dhash(bytes(edited)), dhash(falling)) <= 2
+
+
+def test_find_duplicates_keeps_policy_choice_in_order(tmp_path):
+    files = _files(tmp_path, {"a.mp4": 100, "b.mp4": 300, "c.mp4": 200, "d.mp4": 100, "e.mp4": 100})
+    fingerprinter = FakeFingerprinter({
+        "a.mp4": {"duration": 60.0, "hashes": [0b1111, 0]},
+        "b.mp4": {"duration": 60.2, "hashes": [0b0111, 0]},  # Re-export of a
+        "c.mp4": {"duration": 60.1, "hashes": [0b1111, 1]},  # Re-export of a
+        "d.mp4": {"duration": 90.0, "hashes": [0b1111, 0]},  # Other length
+        # e.mp4 has no fingerprint and is never a duplicate
+    })
+    
+    kept, clusters = find_duplicates(files, DedupPolicy.KEEP_LARGEST, fingerprinter, workers=2)
+    assert [path.name for path in kept] == ["b.mp4", "d.mp4", "e.mp4"]
+    assert len(clusters) == 1
+    assert clusters[0].kept.name == "b.mp4"
+    assert sorted(path.name for path in clusters[0].dropped) == ["a.mp4", "c.mp4"]
+    
+    kept, _ = find_duplicates(files, DedupPolicy.KEEP_FIRST, fingerprinter)
+    assert [path.name for path in kept] == ["a.mp4", "d.mp4", "e.mp4"]
+    
+    os.utime(files[2], (0, 2_000_000_000))
+    kept, _ = find_duplicates(files, DedupPolicy.KEEP_NEWEST, fingerprinter)
+    assert [path.name for path in kept] == ["c.mp4", "d.mp4", "e.mp4"]
+    
+    assert find_duplicates(files, DedupPolicy.OFF, fingerprinter) == (files, [])
+
+
+def test_hashes_beyond_max_distance_are_not_duplicates(tmp_path):
+    files = _files(tmp_path, {"a.mp4": 100, "b.mp4": 100})
+    fingerprinter = FakeFingerprinter({
+        "a.mp4": {"duration": 60.0, "hashes": [0]},
+        "b.mp4": {"duration": 60.0, "hashes": [(1 << 11) - 1]}  # 11 bits apart
+    })
+    assert find_duplicates(files, DedupPolicy.KEEP_FIRST, fingerprinter) == (files, [])
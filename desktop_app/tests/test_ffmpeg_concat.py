@@ -0,0 +1,63 @@
+"""Batch concatenation of trimmed groups."""
+import logging
+from pathlib import Path
+from app.core.ffmpeg_concat import FFmpegConcat
+from app.core.trim import ClipTrim
+
+
+class FakeTrimmer:
+    """Keeps the middle of every clip, or nothing of clips named "short*"."""
+    
+    def trim_group(self, input_files):
+        return [
+            ClipTrim(path, 1.0, 9.0, (1.0, 0.96), (9.0, 8.96))
+            for path in input_files if not path.name.startswith("short")
+        ]
+    
+    def copy_safe(self, input_files):
+        return True
+    
+    def fingerprint(self):
+        return "trim"
+
+
+class FailingResult:
+    returncode = 1
+    stderr = "failed"
+
+
+class FailingProcesses:
+    def __init__(self):
+        self.commands = []
+        self.cancelled = False
+    
+    def run(self, cmd, timeout=None):
+        self.commands.append(cmd)
+        return FailingResult()
+
+
+def _concat():
+    return FFmpegConcat("ffmpeg", processes=FailingProcesses(), trimmer=FakeTrimmer())
+
+
+def test_batch_with_nothing_left_after_trimming_runs_nothing(tmp_path, caplog):
+    caplog.set_level(logging.INFO)
+    concat = _concat()
+    jobs = [([Path("short_a.mp4")], tmp_path / "a.mp4"), ([Path("short_b.mp4")], tmp_path / "b.mp4")]
+    assert concat.concat_batch(jobs) == [False, False]
+    assert concat.processes.commands == []
+    assert "Batch copy failed" not in caplog.text
+
+
+def test_trims_are_reported_once_when_the_batch_falls_back(tmp_path):
+    concat = _concat()
+    messages = []
+    jobs = [([Path("a1.mp4"), Path("a2.mp4")], tmp_path / "a.mp4"), ([Path("b1.mp4")], tmp_path / "b.mp4")]
+    assert concat.concat_batch(jobs, messages.append) == [False, False]
+    trimmed = [message for message in messages if message.startswith("Trimmed")]
+    assert trimmed == [
+        "Trimmed 2/2 clips for a.mp4: 16.0 s copied, 0.0 s re-encoded",
+        "Trimmed 1/1 clips for b.mp4: 8.0 s copied, 0.0 s re-encoded"
+    ]
+    # One batch run, then copy and re-encode per group
+    assert len(concat.processes.commands) == 5
@@ -0,0 +1,154 @@
+"""Persistence of the job queue."""
+import json
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+from app.core import job_queue
+from app.core.job_queue import JobQueue, JobQueueRunner, JobStatus, QueuedJob
+
+
+def _job(name, **kwargs):
+    return QueuedJob(f"/videos/{name}", f"/out/{name}", {"group_size": 3}, **kwargs)
+
+
+def test_jobs_survive_a_reload_in_order(tmp_path):
+    queue_file = tmp_path / "job_queue.json"
+    queue = JobQueue(queue_file)
+    first, second = _job("a"), _job("b")
+    queue.add(first)
+    queue.add(second)
+    queue.update(first, status=JobStatus.COMPLETED, completed_groups=4, total_groups=4)
+    
+    reloaded = JobQueue(queue_file)
+    assert [job.job_id for job in reloaded.jobs()] == [first.job_id, second.job_id]
+    job = reloaded.get(first.job_id)
+    assert job.status == JobStatus.COMPLETED
+    assert (job.completed_groups, job.total_groups) == (4, 4)
+    assert job.settings == {"group_size": 3}
+    assert job.name == "a"
+    assert reloaded.next_queued().job_id == second.job_id
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_running_jobs_are_requeued_on_load(tmp_path):
+    queue_file = tmp_path / "job_queue.json"
+    queue = JobQueue(queue_file)
+    job = _job("a")
+    queue.add(job)
+    queue.update(job, status=JobStatus.RUNNING)
+    assert not queue.remove(job.job_id)  # Running jobs stay
+    
+    reloaded = JobQueue(queue_file).get(job.job_id)
+    assert reloaded.status == JobStatus.QUEUED
+    assert reloaded.message == "Interrupted, will restart"
+
+
+def test_unsaved_updates_are_not_persisted(tmp_path):
+    queue_file = tmp_path / "job_queue.json"
+    queue = JobQueue(queue_file)
+    job = _job("a")
+    queue.add(job)
+    queue.update(job, save=False, completed_groups=2)
+    assert JobQueue(queue_file).get(job.job_id).completed_groups == 0
+
+
+def test_finished_jobs_are_cleared_and_requeued(tmp_path):
+    queue_file = tmp_path / "job_queue.json"
+    queue = JobQueue(queue_file)
+    done, failed, waiting = _job("a"), _job("b"), _job("c")
+    for job in (done, failed, waiting):
+        queue.add(job)
+    queue.update(done, status=JobStatus.COMPLETED)
+    queue.update(failed, status=JobStatus.FAILED, message="2 groups failed", completed_groups=1)
+    
+    assert queue.requeue(failed.job_id)
+    assert not queue.requeue(waiting.job_id)
+    assert (failed.status, failed.message, failed.completed_groups) == (JobStatus.QUEUED, "", 0)
+    queue.clear_finished()
+    assert [job.job_id for job in JobQueue(queue_file).jobs()] == [failed.job_id, waiting.job_id]
+
+
+@pytest.mark.parametrize("content", ["not json", json.dumps({"jobs": [{"status": "queued"}]}), "[]"])
+def test_unreadable_file_gives_an_empty_queue(tmp_path, content):
+    queue_file = tmp_path / "job_queue.json"
+    queue_file.write_text(content, encoding="utf-8")
+    assert JobQueue(queue_file).jobs() == []
+
+
+def test_unknown_status_falls_back_to_queued():
+    job = QueuedJob.from_dict({"input_dir": "/videos/a", "output_dir": "/out/a", "status": "paused"})
+    assert job.status == JobStatus.QUEUED
+    assert QueuedJob.from_dict(job.to_dict()).to_dict() == job.to_dict()
+
+
+class FakeWorker(QtCore.QObject):
+    progress = QtCore.Signal(str)
+    group_complete = QtCore.Signal(int, int, bool)
+    finished = QtCore.Signal(bool)
+    
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+    
+    def __getattr__(self, name):
+        if name in ("start", "cancel", "wait", "pause", "resume"):
+            return lambda: self.calls.append(name)
+        raise AttributeError(name)
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    workers = []
+    
+    def create_worker(*args, **kwargs):
+        workers.append(FakeWorker())
+        return workers[-1]
+    
+    monkeypatch.setattr(job_queue, "create_worker", create_worker)
+    queue = JobQueue(tmp_path / "job_queue.json")
+    for name in ("a", "b"):
+        queue.add(QueuedJob(str(tmp_path), str(tmp_path), {}, job_id=name))
+    runner = JobQueueRunner(queue)
+    runner.finished_count = 0
+    runner.queue_finished.connect(lambda: setattr(runner, "finished_count", runner.finished_count + 1))
+    runner.workers = workers
+    return runner
+
+
+def test_pause_between_jobs_keeps_the_queue_running(runner):
+    assert runner.start("ffmpeg")
+    runner.pause()
+    runner.workers[0].finished.emit(True)
+    assert runner.is_running()
+    assert runner.finished_count == 0
+    assert len(runner.workers) == 1
+    
+    runner.resume()
+    assert len(runner.workers) == 2
+    assert runner.queue.get("b").status == JobStatus.RUNNING
+    runner.workers[1].finished.emit(True)
+    assert not runner.is_running()
+    assert runner.finished_count == 1
+
+
+def test_stop_does_not_wait_for_workers(runner):
+    assert runner.start("ffmpeg")
+    runner.stop()
+    assert runner.workers[0].calls == ["start", "cancel"]
+    assert runner.is_running() and runner.finished_count == 0
+    
+    runner.workers[0].finished.emit(False)
+    assert not runner.is_running()
+    assert runner.finished_count == 1
+    assert runner.queue.get("a").status == JobStatus.CANCELLED
+    assert runner.queue.get("b").status == JobStatus.QUEUED
+
+
+def test_stop_while_paused_between_jobs_finishes_the_queue(runner):
+    assert runner.start("ffmpeg")
+    runner.pause()
+    runner.workers[0].finished.emit(True)
+    runner.stop()
+    assert not runner.is_running()
+    assert runner.finished_count == 1
+    assert runner.queue.get("b").status == JobStatus.QUEUED
@@ -0,0 +1,63 @@
+"""Shared license validation and the blocking caller's time limit."""
+import threading
+import time
+from datetime import datetime
+import pytest
+from app.services import license_guard as guard_module
+from app.services.api_client import APIClient
+from app.services.license_guard import LicenseGuard
+
+
+class FakeConfig:
+    def get_activation_token(self):
+        return "token"
+    
+    def get_last_validation_time(self):
+        return datetime.utcnow().isoformat()
+
+
+@pytest.fixture
+def guard(monkeypatch):
+    monkeypatch.setattr(guard_module, "config_service", FakeConfig())
+    return LicenseGuard()
+
+
+def _slow_background_refresh(guard, monkeypatch):
+    """Start a refresh whose server answer arrives only when release is set."""
+    started, release = threading.Event(), threading.Event()
+    
+    def validate(token, blocking=False):
+        started.set()
+        release.wait(5)
+        return (True, None), LicenseGuard.CACHE_TTL_SECONDS
+    
+    monkeypatch.setattr(guard, "_validate", validate)
+    thread = threading.Thread(target=guard._refresh)
+    thread.start()
+    assert started.wait(5)
+    return release, thread
+
+
+def test_blocking_caller_falls_back_to_grace_period(guard, monkeypatch):
+    monkeypatch.setattr(APIClient, "CONNECT_TIMEOUT", 0.05)
+    monkeypatch.setattr(APIClient, "READ_TIMEOUT", 0.05)
+    release, thread = _slow_background_refresh(guard, monkeypatch)
+    try:
+        begin = time.monotonic()
+        valid, reason = guard.is_license_valid()
+        assert time.monotonic() - begin < 2
+        assert valid and reason.startswith("Offline mode")
+    finally:
+        release.set()
+        thread.join()
+    assert guard.is_license_valid() == (True, None)  # The refresh filled the cache
+
+
+def test_blocking_caller_joins_a_request_that_answers_in_time(guard, monkeypatch):
+    release, thread = _slow_background_refresh(guard, monkeypatch)
+    threading.Timer(0.1, release.set).start()
+    try:
+        assert guard.is_license_valid() == (True, None)
+    finally:
+        release.set()
+        thread.join()
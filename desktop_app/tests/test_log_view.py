@@ -0,0 +1,72 @@
+"""Buffering and capping of the processing log model."""
+import logging
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+from app.ui.log_view import LogFilterProxy, LogModel, classify_message, parse_group
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def _texts(model):
+    return [model.entry(row).text for row in range(model.rowCount())]
+
+
+def test_append_is_buffered_until_flush(app):
+    model = LogModel()
+    model.append("Group 1 completed")
+    assert model.rowCount() == 0
+    model.flush()
+    assert _texts(model) == ["Group 1 completed"]
+    model.flush()  # Nothing pending
+    assert model.rowCount() == 1
+
+
+def test_flush_keeps_newest_max_lines(app, monkeypatch):
+    monkeypatch.setattr(LogModel, "MAX_LINES", 5)
+    model = LogModel()
+    removed = []
+    model.rowsAboutToBeRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    for n in range(3):
+        model.append(f"line {n}")
+    model.flush()
+    for n in range(3, 7):
+        model.append(f"line {n}")
+    model.flush()
+    assert _texts(model) == [f"line {n}" for n in range(2, 7)]
+    assert removed == [(0, 1)]
+    
+    # A batch larger than the cap replaces everything with its newest lines
+    for n in range(7, 20):
+        model.append(f"line {n}")
+    model.flush()
+    assert _texts(model) == [f"line {n}" for n in range(15, 20)]
+    
+    model.append("pending")
+    model.clear()
+    model.flush()
+    assert model.rowCount() == 0
+
+
+def test_levels_groups_and_filter(app):
+    assert classify_message("✗ Group 2 failed") == logging.ERROR
+    assert classify_message("Warning: low disk space") == logging.WARNING
+    assert classify_message("Group 12 completed") == logging.INFO
+    assert parse_group("Group 12 completed") == 12
+    assert parse_group("Grouping files") is None
+    
+    model = LogModel()
+    for message in ("Group 1 completed", "✗ Group 2 failed", "Warning: Group 1 slow", "Done"):
+        model.append(message)
+    model.flush()
+    proxy = LogFilterProxy()
+    proxy.setSourceModel(model)
+    proxy.set_min_level(logging.WARNING)
+    assert proxy.rowCount() == 2
+    proxy.set_group(1)
+    assert proxy.rowCount() == 1
+    proxy.set_min_level(logging.NOTSET)
+    assert proxy.rowCount() == 2
@@ -0,0 +1,45 @@
+"""OutputStore keys and least-recently-used eviction."""
+import time
+from app.core.output_cache import OutputStore
+
+
+def _output(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(name.encode("ascii")[:1] * size)
+    return path
+
+
+def test_group_key_without_compute_needs_memoized_hashes(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    clip = _output(tmp_path, "a.mp4", 1000)
+    assert store.group_key([clip], "fp", compute=False) is None
+    key = store.group_key([clip], "fp")
+    assert key is not None
+    assert store.group_key([clip], "fp", compute=False) == key
+    assert store.group_key([clip], "other-fp") != key
+
+
+def test_memoized_hashes_survive_a_reload(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    clip = _output(tmp_path, "a.mp4", 1000)
+    key = store.group_key([clip], "fp")
+    store.save()
+    assert OutputStore(tmp_path / "store").group_key([clip], "fp", compute=False) == key
+
+
+def test_put_evicts_least_recently_used(tmp_path):
+    store = OutputStore(tmp_path / "store", max_bytes=2500)
+    outputs = [_output(tmp_path, f"{name}.mp4", 1000) for name in "abc"]
+    store.put("a", outputs[0], 1.0)
+    time.sleep(0.01)
+    store.put("b", outputs[1], 1.0)
+    time.sleep(0.01)
+    assert store.materialize("a", tmp_path / "restored_a.mp4")  # "b" is now least recently used
+    time.sleep(0.01)
+    store.put("c", outputs[2], 1.0)
+
+    assert store.materialize("b", tmp_path / "restored_b.mp4") is None
+    assert store.materialize("a", tmp_path / "again_a.mp4")
+    assert store.materialize("c", tmp_path / "restored_c.mp4")
+    assert (tmp_path / "again_a.mp4").read_bytes() == outputs[0].read_bytes()
+    assert store.hits == 3
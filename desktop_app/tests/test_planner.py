@@ -0,0 +1,87 @@
+"""Output and temp space estimates of the disk space planner."""
+import pytest
+from app.core.planner import DiskSpacePlanner, InsufficientSpaceError
+from app.core.trim import TrimMode, TrimSettings
+
+MP4_HEADER = b"\x00\x00\x00\x18ftypisom"
+# 100 s of 32x24 at 10 fps: 100 * 32 * 24 * 10 * 0.10 bpp / 8 = 9600 bytes re-encoded
+INFO = {
+    "duration": 100.0,
+    "format": "mov,mp4,m4a,3gp,3g2,mj2",
+    "video": {"width": 32, "height": 24, "fps": 10.0},
+    "audio": None
+}
+REENCODED = 9600
+
+
+class FakeProbe:
+    def probe(self, path):
+        return INFO
+    
+    def duration(self, path):
+        return INFO["duration"]
+
+
+def _clip(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(MP4_HEADER + b"\x00" * (size - len(MP4_HEADER)))
+    return path
+
+
+def _planner(tmp_path, **kwargs):
+    return DiskSpacePlanner(tmp_path / "out", FakeProbe(), temp_dir=tmp_path, **kwargs)
+
+
+def test_single_mp4_counts_as_a_clone(tmp_path):
+    clip = _clip(tmp_path, "a.mp4", 20000)
+    assert _planner(tmp_path).estimate_group([clip]) == 20000
+
+
+def test_group_uses_larger_of_copy_and_reencode(tmp_path):
+    small = [_clip(tmp_path, "a.mp4", 4000), _clip(tmp_path, "b.mp4", 4000)]
+    large = [_clip(tmp_path, "c.mp4", 20000), _clip(tmp_path, "d.mp4", 20000)]
+    planner = _planner(tmp_path)
+    assert planner.estimate_group(small) == int(2 * REENCODED * DiskSpacePlanner.SAFETY_FACTOR)
+    assert planner.estimate_group(large) == int(40000 * DiskSpacePlanner.SAFETY_FACTOR)
+
+
+def test_trim_and_bumpers_change_the_estimate(tmp_path):
+    clip = _clip(tmp_path, "a.mp4", 20000)
+    bumper = _clip(tmp_path, "intro.mp4", 4000)
+    
+    # Trimming 10 s of 100 s keeps 90% and the single file is no longer cloned
+    trimmed = _planner(tmp_path, trim=TrimSettings(head=5.0, tail=5.0))
+    assert trimmed.estimate_group([clip]) == int(18000 * DiskSpacePlanner.SAFETY_FACTOR)
+    
+    bumpered = _planner(tmp_path, bumpers=[bumper])
+    assert bumpered.estimate_group([clip]) == int((20000 + REENCODED) * DiskSpacePlanner.SAFETY_FACTOR)
+
+
+def test_temp_space_only_for_frame_accurate_trims(tmp_path):
+    clip = _clip(tmp_path, "a.mp4", 20000)
+    assert _planner(tmp_path, trim=TrimSettings(head=5.0)).estimate_temp([clip]) == 0
+    frame = _planner(tmp_path, trim=TrimSettings(head=5.0, mode=TrimMode.FRAME))
+    pieces = 2 * DiskSpacePlanner.TRIM_PIECE_SECONDS / INFO["duration"]
+    assert frame.estimate_temp([clip]) == int(20000 * pieces * DiskSpacePlanner.SAFETY_FACTOR)
+
+
+def test_plan_refuses_a_batch_that_does_not_fit(tmp_path, monkeypatch):
+    groups = [[_clip(tmp_path, "a.mp4", 20000)], [_clip(tmp_path, "b.mp4", 20000)]]
+    planner = _planner(tmp_path)
+    free = {planner.output_dir: 50000, planner.temp_dir: 10 * 1024 * 1024}
+    monkeypatch.setattr(planner, "free_bytes", lambda path: DiskSpacePlanner.MIN_FREE_BYTES + free[path])
+    assert planner.plan(groups) == [20000, 20000]
+    free[planner.output_dir] = 30000
+    with pytest.raises(InsufficientSpaceError, match="Not enough space in"):
+        planner.plan(groups)
+    free[planner.output_dir] = 50000
+    free[planner.temp_dir] = 1000
+    with pytest.raises(InsufficientSpaceError, match="temporary files"):
+        planner.plan(groups)
+    
+    free[planner.output_dir] = 30000
+    
+    assert planner.reserve(20000)
+    assert not planner.reserve(20000)
+    planner.release(20000)
+    assert planner.reserve(20000)
@@ -0,0 +1,36 @@
+"""MediaProbe cache persistence."""
+import json
+from app.core.probe import MediaProbe
+
+
+def test_save_merges_entries_of_other_instances(tmp_path):
+    clip_a = tmp_path / "a.mp4"
+    clip_b = tmp_path / "b.mp4"
+    clip_a.write_bytes(b"a" * 100)
+    clip_b.write_bytes(b"b" * 100)
+    cache_file = tmp_path / "probe_cache.json"
+    first = MediaProbe("ffmpeg", cache_file)
+    second = MediaProbe("ffmpeg", cache_file)
+
+    first.set_extra(clip_a, "loudness", -20.0)
+    second.set_extra(clip_a, "keyframes", [0.0])
+    second.set_extra(clip_b, "loudness", -18.0)
+    first.save()
+    second.save()
+
+    reloaded = MediaProbe("ffmpeg", cache_file)
+    assert reloaded.get_extra(clip_a, "loudness") == -20.0
+    assert reloaded.get_extra(clip_a, "keyframes") == [0.0]
+    assert reloaded.get_extra(clip_b, "loudness") == -18.0
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+
+
+def test_save_is_a_no_op_without_changes(tmp_path):
+    cache_file = tmp_path / "probe_cache.json"
+    MediaProbe("ffmpeg", cache_file).save()
+    assert not cache_file.exists()
+
+    cache_file.write_text(json.dumps({"x|1|2": {"info": None}}), encoding="utf-8")
+    probe = MediaProbe("ffmpeg", cache_file)
+    probe.save()
+    assert json.loads(cache_file.read_text(encoding="utf-8")) == {"x|1|2": {"info": None}}
@@ -0,0 +1,36 @@
+"""Importing the entry point must not touch the disk, the network or threads."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+DESKTOP_APP = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import threading
+import app.main
+from app.services.config_service import config_service
+from app.services.license_guard import license_guard
+from app.utils.lazy import is_initialized
+print(is_initialized(config_service), is_initialized(license_guard), threading.active_count())
+"""
+
+
+def test_import_main_has_no_side_effects(tmp_path):
+    env = dict(os.environ, APPDATA=str(tmp_path / "appdata"), QT_QPA_PLATFORM="offscreen")
+    env["PYTHONPATH"] = str(DESKTOP_APP)
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=DESKTOP_APP, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "False", "1"]
+    # No config file, log directory or caches were created
+    assert not (tmp_path / "appdata").exists()
+
+
+def test_logger_has_no_handlers_until_configured():
+    import logging.handlers
+    from app.services import logging_service
+    assert logging_service.logger.name == "VideoMixer"
+    assert logging_service._listener is None
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in logging.getLogger().handlers)
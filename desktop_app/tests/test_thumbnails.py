@@ -0,0 +1,43 @@
+"""Thumbnail cache keys and the negative cache of failed grabs."""
+import threading
+from app.core.thumbnails import CONTACT_SHEET, ThumbnailCache, ThumbnailService
+
+
+def test_keys_follow_content_timestamp_and_width(tmp_path):
+    cache = ThumbnailCache(tmp_path / "cache")
+    clip = tmp_path / "a.mp4"
+    clip.write_bytes(b"a" * 1000)
+    copy = tmp_path / "copy.mp4"
+    copy.write_bytes(b"a" * 1000)
+
+    key = cache.key(clip, 1.0, 240)
+    assert key == cache.key(copy, 1.0, 240)  # Same content, same thumbnail
+    assert key != cache.key(clip, 2.0, 240)
+    assert key != cache.key(clip, 1.0, 160)
+    assert cache.key(clip, CONTACT_SHEET, 160).endswith("_sheet_160")
+    assert cache.key(tmp_path / "missing.mp4", 1.0, 240) is None
+
+
+def test_failed_grab_is_not_repeated(tmp_path):
+    clip = tmp_path / "broken.mp4"
+    clip.write_bytes(b"not a video" * 100)
+    service = ThumbnailService("ffmpeg", ThumbnailCache(tmp_path / "cache"), workers=1)
+    runs = []
+
+    class FailingRun:
+        def __init__(self, cmd, timeout=None):
+            runs.append(cmd)
+            self.returncode, self.stderr = 1, "Invalid data"
+
+    service.processes.run = FailingRun
+    try:
+        for _ in range(2):
+            done = threading.Event()
+            results = []
+            service.request(clip, 1.0, lambda path, timestamp, image: (results.append(image), done.set()))
+            assert done.wait(10)
+            assert results == [None]
+        assert len(runs) == 1
+        assert service.failed(clip, 1.0)
+    finally:
+        service.stop()
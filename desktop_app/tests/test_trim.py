@@ -0,0 +1,191 @@
+"""Keyframe parsing and concat entries of trimmed clips."""
+from pathlib import Path
+from app.core.probe import MediaProbe
+from app.core.trim import ClipTrim, SmartTrimmer, TrimMode, TrimSettings
+
+# framecrc output of "-c copy": plain keyframes print no flags
+FRAMECRC = """#extradata 0:       46, 0x34b10f92
+#software: Lavf61.1.100
+#tb 0: 1/12800
+#media_type 0: video
+#codec_id 0: h264
+#dimensions 0: 320x240
+0,      -1024,          0,      512,     5171, 0xb3cfad6f
+0,       -512,       2048,      512,     2477, 0x9870d926, F=0x0
+0,          0,       1024,      512,     1399, 0xb1a4b4e9, F=0x0
+0,      24576,      25600,      512,     4120, 0x1c2d3e4f, F=0x1
+0,      25088,      26624,      512,      987, 0x5692f8c8, F=0x4
+0,      25600,      27136,      512,     5012, 0x0a0b0c0d, F=0x5
+"""
+
+
+class FakeResult:
+    def __init__(self, stdout, returncode=0):
+        self.stdout = stdout
+        self.stderr = ""
+        self.returncode = returncode
+
+
+class FakeProcesses:
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.commands = []
+    
+    def run(self, cmd, timeout=None):
+        self.commands.append(cmd)
+        return FakeResult(self.stdout)
+
+
+def _trimmer(tmp_path, stdout):
+    probe = MediaProbe("ffmpeg", tmp_path / "probe_cache.json")
+    return SmartTrimmer("ffmpeg", probe, TrimSettings(head=1.0), FakeProcesses(stdout))
+
+
+def test_scan_reads_keyframe_flags_and_timestamps(tmp_path):
+    keyframes = _trimmer(tmp_path, FRAMECRC)._scan_keyframes(Path("clip.mp4"), 0.0, 30.0)
+    assert keyframes == [(0.0, -0.08), (2.0, 1.92), (2.12, 2.0)]
+
+
+def test_keyframes_are_cached_per_scanned_window(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"x" * 100)
+    trimmer = _trimmer(tmp_path, FRAMECRC)
+    assert trimmer.keyframe_after(clip, 1.0, 30.0) == (2.0, 1.92)
+    assert trimmer.keyframe_before(clip, 2.1) == (2.0, 1.92)
+    assert len(trimmer.processes.commands) == 2
+    assert trimmer.keyframe_after(clip, 1.0, 30.0) == (2.0, 1.92)  # Window already scanned
+    assert trimmer.keyframe_before(clip, 1.0) == (0.0, -0.08)
+    assert len(trimmer.processes.commands) == 2
+
+
+def test_failed_scan_finds_no_keyframes(tmp_path):
+    assert _trimmer(tmp_path, "Invalid data")._scan_keyframes(Path("clip.mp4"), 0.0, 30.0) is None
+
+
+def test_entries_of_copied_part_and_pieces():
+    clip = Path("clip.mp4")
+    copy_only = ClipTrim(clip, 2.0, 10.0, copy_start=(2.0, 1.92), copy_end=(10.0, 9.92))
+    assert copy_only.entries() == [(clip, 2.0, 9.92, 8.0)]
+    assert copy_only.reencoded_seconds == 0.0
+    
+    to_end = ClipTrim(clip, 0.0, 30.0, copy_start=(0.0, -0.08))
+    assert to_end.entries() == [(clip, None, None, None)]
+    
+    head, tail = Path("head.mp4"), Path("tail.mp4")
+    exact = ClipTrim(clip, 1.0, 9.5, (2.0, 1.92), (8.0, 7.92), head_piece=head, tail_piece=tail)
+    assert exact.entries() == [(head, None, None, None), (clip, 2.0, 7.92, 6.0), (tail, None, None, None)]
+    assert exact.copied_seconds == 6.0
+    assert exact.reencoded_seconds == 2.5
+    
+    reencoded = ClipTrim(clip, 1.0, 1.5, head_piece=head)
+    assert reencoded.entries() == [(head, None, None, None)]
+    assert reencoded.copied_seconds == 0.0
+
+
+# Keyframes every 4 s of a 10 s clip
+KEYFRAMES = """#tb 0: 1/12800
+0,      -1024,          0,      512,     5171, 0xb3cfad6f
+0,      50176,      51200,      512,     5012, 0x0a0b0c0d
+0,     101376,     102400,      512,     5012, 0x0a0b0c0e
+"""
+
+
+class FakeProbe:
+    """Probe of a 10 s H.264 clip; pieces get piece_sets as parameter sets."""
+    
+    def __init__(self, piece_sets):
+        self.piece_sets = piece_sets
+        self.extras = {}
+    
+    def probe(self, path):
+        return {"duration": 10.0, "video": {"codec": "h264", "fps": 25.0}, "audio": None}
+    
+    def get_extra(self, path, name):
+        return self.extras.get((path, name))
+    
+    def set_extra(self, path, name, value):
+        self.extras[(path, name)] = value
+    
+    def parameter_sets(self, path, cache=True):
+        return "clip-sets" if cache else self.piece_sets
+
+
+class FakeEncoder(FakeProcesses):
+    """Answers keyframe scans and writes every encoded piece (unless failing)."""
+    
+    def __init__(self, fail=False):
+        super().__init__(KEYFRAMES)
+        self.fail = fail
+        self.cancelled = False
+    
+    def run(self, cmd, timeout=None):
+        self.commands.append(cmd)
+        if "framecrc" in cmd:
+            return FakeResult(self.stdout)
+        if self.fail:
+            return FakeResult("", returncode=1)
+        Path(cmd[-1]).write_bytes(b"piece")
+        return FakeResult("")
+
+
+def _plan(head, tail, mode, piece_sets="clip-sets", fail=False):
+    trimmer = SmartTrimmer("ffmpeg", FakeProbe(piece_sets), TrimSettings(head, tail, mode), FakeEncoder(fail))
+    clip = Path("clip.mp4")
+    trim = trimmer.trim_clip(clip)
+    encodes = [cmd for cmd in trimmer.processes.commands if "framecrc" not in cmd]
+    return trimmer, trim, encodes
+
+
+def test_keyframe_mode_keeps_the_gops_around_cuts_without_keyframe_between():
+    trimmer, trim, encodes = _plan(4.5, 4.5, TrimMode.KEYFRAME)
+    try:
+        assert (trim.start, trim.end) == (4.0, 8.0)
+        assert trim.entries() == [(Path("clip.mp4"), 4.0, 7.92, 4.0)]
+        assert encodes == []
+        assert trimmer.stats.skipped == 0
+    finally:
+        trimmer.cleanup()
+
+
+def test_frame_mode_without_keyframe_between_cuts_reencodes_the_kept_part():
+    for piece_sets, copy_safe in (("clip-sets", True), ("other-sets", False)):
+        trimmer, trim, encodes = _plan(4.5, 4.5, TrimMode.FRAME, piece_sets)
+        try:
+            assert (trim.start, trim.end) == (4.48, 5.52)  # Rounded to frames
+            assert trim.head_piece is not None and trim.copy_start is None
+            assert len(encodes) == 1
+            assert trim.copy_safe is copy_safe
+            assert trimmer.copy_safe([Path("clip.mp4")]) is copy_safe
+        finally:
+            trimmer.cleanup()
+
+
+def test_mismatching_pieces_keep_exact_cuts_and_mark_the_group():
+    trimmer, trim, encodes = _plan(1.0, 1.0, TrimMode.FRAME, "other-sets")
+    try:
+        assert (trim.start, trim.end) == (1.0, 9.0)
+        assert trim.head_piece.exists() and trim.tail_piece.exists()
+        assert len(encodes) == 2
+        assert not trim.copy_safe
+        assert trimmer.stats.unmatched == 1
+        assert "re-encoding their group" in trimmer.stats.summary()
+    finally:
+        trimmer.cleanup()
+    
+    trimmer, trim, _ = _plan(1.0, 1.0, TrimMode.FRAME)
+    try:
+        assert (trim.start, trim.end) == (1.0, 9.0)
+        assert trim.copy_safe and trimmer.stats.unmatched == 0
+    finally:
+        trimmer.cleanup()
+
+
+def test_failed_piece_encode_snaps_to_keyframes():
+    trimmer, trim, encodes = _plan(1.0, 1.0, TrimMode.FRAME, fail=True)
+    try:
+        assert (trim.start, trim.end) == (4.0, 8.0)
+        assert trim.head_piece is None and trim.tail_piece is None
+        assert trim.copy_safe
+        assert len(encodes) == 2
+    finally:
+        trimmer.cleanup()
@@ -1,6 +1,7 @@
 """Public API endpoints for desktop app."""
+import hashlib
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, status, Request, Depends
+from fastapi import APIRouter, HTTPException, status, Request, Response, Depends
 from app.models.activation import (
     ActivationRequest,
     ActivationResponse,
@@ -332,13 +333,40 @@ async def deactivate_license(http_request: Request = None):
     return {"success": True, "message": "Activation deactivated successfully"}
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against etag (weak comparison, as RFC 9110 requires)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _conditional_json(request: Request, payload: LatestReleaseResponse) -> Response:
+    """
+    Serialize payload with a strong ETag (hash of the body).
+    
+    Answers 304 without a body when the client's If-None-Match matches.
+    """
+    body = payload.model_dump_json()
+    etag = f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/releases/latest", response_model=LatestReleaseResponse)
 async def get_latest_release(
+    request: Request,
     platform: str = "windows",
     current_version: str = "0.0.0"
 ):
     """
     Get latest release information for update checking.
+    
+    The response carries an ETag; clients that send it back in
+    If-None-Match get 304 Not Modified while nothing changed.
     """
     supabase: Client = get_supabase_client()
     
@@ -351,16 +379,11 @@ async def get_latest_release(
         error_msg = str(e)
         if "PGRST205" in error_msg or "schema cache" in error_msg.lower():
             # Return no update available if schema cache not ready
-            return ReleaseResponse(
-                update_available=False,
-                latest_version=current_version,
-                release_notes="",
-                download_url=""
-            )
+            return _conditional_json(request, LatestReleaseResponse(update_available=False))
         raise
     
     if not response.data or len(response.data) == 0:
-        return LatestReleaseResponse(update_available=False)
+        return _conditional_json(request, LatestReleaseResponse(update_available=False))
     
     latest_release = response.data[0]
     latest_version = latest_release.get("version", "0.0.0")
@@ -384,9 +407,9 @@ async def get_latest_release(
     
     update_available = compare_versions(latest_version, current_version) > 0
     
-    return LatestReleaseResponse(
+    return _conditional_json(request, LatestReleaseResponse(
         update_available=update_available,
         latest_version=latest_version if update_available else None,
         release_notes=latest_release.get("release_notes") if update_available else None,
         download_url=latest_release.get("download_url") if update_available else None
-    )
+    ))
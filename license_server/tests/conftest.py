@@ -0,0 +1,6 @@
+"""Test settings: the app reads its configuration from the environment on import."""
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-role-key")
+os.environ.setdefault("JWT_SIGNING_SECRET", "test-signing-secret")
@@ -0,0 +1,81 @@
+"""Conditional requests on /releases/latest."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers import public
+
+LATEST = {"version": "1.2.0", "release_notes": "Fixes", "download_url": "https://example.com/app.exe"}
+
+
+class _Query:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def select(self, *args):
+        return self
+    
+    def eq(self, *args):
+        return self
+    
+    def execute(self):
+        return type("Result", (), {"data": self.rows})()
+
+
+class _Supabase:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def table(self, name):
+        return _Query(self.rows)
+
+
+@pytest.fixture
+def releases(monkeypatch):
+    rows = [dict(LATEST)]
+    monkeypatch.setattr(public, "get_supabase_client", lambda: _Supabase(rows))
+    app = FastAPI()
+    app.include_router(public.router, prefix="/api/v1")
+    return TestClient(app), rows
+
+
+def _get(client, **headers):
+    return client.get("/api/v1/releases/latest", params={"current_version": "1.0.0"}, headers=headers)
+
+
+def test_response_has_strong_etag(releases):
+    client, _ = releases
+    response = _get(client)
+    assert response.status_code == 200
+    assert response.json()["latest_version"] == "1.2.0"
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert _get(client).headers["ETag"] == etag
+
+
+def test_matching_etag_returns_304(releases):
+    client, _ = releases
+    etag = _get(client).headers["ETag"]
+    response = _get(client, **{"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert _get(client, **{"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+
+
+def test_changed_release_returns_new_body(releases):
+    client, rows = releases
+    etag = _get(client).headers["ETag"]
+    rows[0]["version"] = "1.3.0"
+    response = _get(client, **{"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["latest_version"] == "1.3.0"
+    assert response.headers["ETag"] != etag
+
+
+def test_no_release(releases):
+    client, rows = releases
+    rows.clear()
+    response = _get(client)
+    assert response.status_code == 200
+    assert response.json()["update_available"] is False
+    assert _get(client, **{"If-None-Match": response.headers["ETag"]}).status_code == 304